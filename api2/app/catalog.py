@@ -310,6 +310,11 @@ CATALOG = {
         {
           "ticket_type": "Loan Tape",
           "description": "",
+          "summary_template": [
+            "{vendor_name} rerun ({type_of_rerun}, {request_date})",
+            "{vendor_name} rerun ({type_of_rerun})",
+            "{vendor_name} rerun"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -338,6 +343,7 @@ CATALOG = {
         {
           "ticket_type": "Investor Reporting Incident",
           "description": "",
+          "summary_template": "Investor reporting incident: {description}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -359,6 +365,10 @@ CATALOG = {
         {
           "ticket_type": "Investor Reports Manual Rerun",
           "description": "",
+          "summary_template": [
+            "Investor reports rerun {start_date} to {end_date}",
+            "Investor reports rerun for {start_date}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "start_date", "type": "date", "description": "" },
@@ -386,6 +396,10 @@ CATALOG = {
         {
           "ticket_type": "Manual Loan Verifications",
           "description": "",
+          "summary_template": [
+            "Loan verification: {from_investor} to {to_recipient}",
+            "Loan verification for {from_investor}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             {
@@ -407,6 +421,7 @@ CATALOG = {
         {
           "ticket_type": "SFTP Requests",
           "description": "",
+          "summary_template": "SFTP transfer: {from_investor} to {to_recipient}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             {
@@ -431,6 +446,10 @@ CATALOG = {
         {
           "ticket_type": "Generic Document Verification DR",
           "description": "",
+          "summary_template": [
+            "Document verification for {investor_name} ({run_date})",
+            "Document verification for {investor_name}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -455,6 +474,10 @@ CATALOG = {
         {
           "ticket_type": "Datadog Log Rehydration",
           "description": "Use this request to retrieve logs in Datadog that are older than 7 days.",
+          "summary_template": [
+            "Log rehydration: {service_field} {start_date} to {end_date}",
+            "Log rehydration for {service_field}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -481,6 +504,10 @@ CATALOG = {
         {
           "ticket_type": "Datadog Log Setup/Troubleshooting",
           "description": "Intake for general log setup/troubleshooting requests. This covers issues with logs not showing in Datadog platform or setting up some new logs.",
+          "summary_template": [
+            "Log setup for {service_field}: {scope_of_work}",
+            "Log setup for {service_field}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -502,6 +529,10 @@ CATALOG = {
         {
           "ticket_type": "Datadog Monitors and Dashboards",
           "description": "For configuration or assistance with Datadog features (logging, tracing etc.). Also to request a Datadog monitor, alert, or dashboard.",
+          "summary_template": [
+            "Datadog monitor for {service_name} ({env})",
+            "Datadog monitor for {service_name}"
+          ],
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -521,6 +552,7 @@ CATALOG = {
         {
           "ticket_type": "GoAnywhere File Transfer Ad Hoc Request",
           "description": "This form is intended to streamline requests for ad hoc file transfers using GoAnywhere Managed File Transfer solution. It collects all necessary information to facilitate secure and efficient file transfers between internal and external parties.",
+          "summary_template": "GoAnywhere ad hoc run: {job_title}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -537,6 +569,7 @@ CATALOG = {
         {
           "ticket_type": "GoAnywhere Request PRD",
           "description": "For assistance with new or existing GoAnywhere Managed File Transfer project(s). Also for support and monitoring for a GoAnywhere Managed File Transfer file transfer",
+          "summary_template": "GoAnywhere PRD {sftp_or_s3} job: {job_name}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -547,6 +580,7 @@ CATALOG = {
         {
           "ticket_type": "GoAnywhere Request UAT",
           "description": "For assistance with new or existing GoAnywhere User Acceptance Testing Managed File Transfer project(s). Also for support for a GoAnywhere Managed File Transfer file transfer",
+          "summary_template": "GoAnywhere UAT {sftp_or_s3} job: {job_name}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -557,6 +591,7 @@ CATALOG = {
         {
           "ticket_type": "JAMS Batch Job Request",
           "description": "Support for monitoring and/or configuration of a new or existing job. Also for assistance with JAMS licensing and configurations. This request type is used to initiate modifictaions to Batch Operations Jobs or Sequences, including but not limited to: adding new jobs, placing jobs on hold, deleting existing jobs, or making updates to scheduling parameters. Please provide detailed information regarding the specific change needed to ensure timely and accurate processing.",
+          "summary_template": "JAMS {request_type}: {job_name}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -577,6 +612,7 @@ CATALOG = {
         {
           "ticket_type": "Request for global Configuration YAML File Update",
           "description": "Use this form to request changes to global configuration YAML files. Provide details about the modification, environment, and any potential impact. Include a rollback plan and attach relevant files for approval and processing.",
+          "summary_template": "Config YAML {change_type}: {description_of_change}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -591,6 +627,7 @@ CATALOG = {
         {
           "ticket_type": "SFTP Migration",
           "description": "Use this form to request the migration of an existing SFTP connection to a new server. Please provide details for both the old and new servers, authentication methods, and encryption settings. Include a timeline for testing and any additional information to ensure smooth transition.",
+          "summary_template": "SFTP migration for {investor_name}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -619,6 +656,7 @@ CATALOG = {
         {
           "ticket_type": "SFTP New Connectivity",
           "description": "To establish SFTP connectivity between Marlette and external vendors.",
+          "summary_template": "SFTP connectivity for {investor_name}",
           "fields": [
             { "name": "email", "type": "string", "description": "" },
             { "name": "summary", "type": "string", "description": "" },
@@ -41,15 +41,76 @@ class Settings(BaseSettings):
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL") or "http://localhost:11434"
     openai_base_url: str = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
     openai_api_key: Optional[str] = None
+    ollama_keep_alive: Optional[str] = "30m"   # keep the model and its prompt cache loaded between calls
     
     # LLM Generation settings
     default_temperature: float = DEFAULT_TEMPERATURE
     default_max_tokens: int = DEFAULT_MAX_TOKENS
+    llm_batch_calls: bool = False           # one prefill / summary call for all items of a plan instead of one per item
+
+    # Catalog settings
+    catalog_path: Optional[str] = None      # JSON/YAML catalog file; built-in app/catalog.py when unset
+    catalog_poll_seconds: float = 0         # poll the catalog file's mtime; 0 disables polling
+    catalog_history_size: int = 5           # old catalog versions kept for in-flight sessions
+    catalog_retrieval_top_k: int = 5        # ticket types sent to the planner per request
+    catalog_embedding_model: Optional[str] = None  # provider embedding model (e.g. nomic-embed-text); local TF-IDF when unset
+    catalog_embedding_timeout: float = 2.0
+    catalog_router_confident_ratio: float = 0.6   # a routing stage keeps one branch when the runner-up scores below this share of the best
+    catalog_router_max_branches: int = 3          # ...otherwise up to this many departments/categories
+    catalog_router_cache_size: int = 256          # routed requests remembered per catalog version
+    catalog_router_min_score: float = 0.08        # below this best department score a request is too vague to route; the planner gets the whole catalog
+
+    # Choice options loaded through FieldDef.options_source
+    options_cache_ttl_seconds: float = 300          # after this, serve stale options and refresh in the background
+    options_http_timeout: float = 5.0
+    options_retry_seconds: float = 30               # after a failed load with nothing cached, wait this long before fetching again
+    options_http_standin_dir: Optional[str] = None  # serve http(s) options sources from local JSON files instead
+    question_options_inline_limit: int = 15         # larger option sets are truncated in questions and searched instead
+    question_mode: str = "single"                   # "single": one field per turn; "form": a ticket's missing fields in one turn
+    question_form_group_size: int = 0               # max fields per form; 0 = all missing fields of the ticket
+    plan_history_size: int = 8                      # plan versions kept per session for JSON Patch deltas
+    intent_ticket_threshold: float = 0.7            # messages at or above this ticket-intent confidence start the agent
+    intent_clarify_threshold: float = 0.4           # ...between the two, a clarifying turn asks first
+    intent_examples_path: Optional[str] = None      # JSONL of labeled messages for the intent classifier; clarifying answers are appended
+
+    # Local choice matching (answers only go to the LLM when the match is ambiguous)
+    choice_match_accept_score: float = 0.85   # accept the best option at or above this score
+    choice_match_min_margin: float = 0.25     # ...or when it beats the runner-up by this much (score >= 0.6)
+    choice_match_min_score: float = 0.45      # options below this are not even LLM candidates
+
+    # Deterministic prefill rules run before the LLM prefiller; values at or above this confidence are kept
+    rule_prefill_min_confidence: float = 0.8
+    prefill_option_encoding: str = "text"   # "index": list choice options as numbers and have the LLM answer with numbers
+
+    # Repeat requests reuse their plan (keyed on normalized text, catalog version and, for dated requests, the day)
+    plan_cache_ttl_seconds: float = 3600    # 0 disables the plan cache
+    plan_cache_max_entries: int = 512
+
+    # A new request that closely matches one the same user completed recently asks before re-planning
+    duplicate_window_seconds: float = 900           # 0 disables duplicate detection
+    duplicate_similarity_threshold: float = 0.5     # estimated Jaccard similarity of the request texts
+
+    # Dates in answers ("tomorrow", "next friday") are resolved against today in this IANA zone; server local time when unset
+    default_timezone: Optional[str] = None
+
+    # JSON encoder for responses and SSE frames: "orjson", "stdlib" or "auto" (orjson when installed)
+    json_serializer: str = "auto"
+
+    # Frontend files up to this size are served from memory (with gzip/brotli variants); larger ones from disk
+    static_cache_max_bytes: int = 2 * 1024 * 1024
+
+    # Config/startup/stub endpoints are served precomputed with an ETag and this max-age (0: revalidate every time)
+    http_cache_max_age_seconds: int = 300
 
     # JWT settings
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 days (7 * 24 * 60)
+    auth_user_cache_ttl_seconds: float = 60     # resolved tokens skip decoding and the user query this long; 0 disables
+    auth_user_cache_max_entries: int = 4096
+    bcrypt_rounds: int = 12                      # stored hashes with fewer rounds are rehashed on login
+    password_hash_workers: int = 2               # bcrypt runs on this many threads, off the event loop
+    password_hash_max_queue: int = 32            # hashing requests waiting beyond this get a 503
     
     # File upload settings
     upload_dir: str = "uploads"
@@ -66,5 +127,12 @@ class Settings(BaseSettings):
 # Create settings instance
 settings = Settings()
 
+def reload_settings() -> Settings:
+    """Re-read the environment and .env into the shared settings instance (modules hold a reference to it)."""
+    fresh = Settings()
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(fresh, name))
+    return settings
+
 # Ensure upload directory exists
 os.makedirs(settings.upload_dir, exist_ok=True) 
\ No newline at end of file
@@ -17,6 +17,7 @@ Base = declarative_base()
 from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
+from app.models.plan_snapshot import PlanSnapshot
 
 # Dependency to get database session
 def get_db():
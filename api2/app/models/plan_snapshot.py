@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.models import Base
+
+class PlanSnapshot(Base):
+    """The final plan of a completed agent session, linked from its completion message."""
+    __tablename__ = "plan_snapshots"
+
+    id = Column(String(32), primary_key=True)          # random; stable across restarts and reused session ids
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), index=True, nullable=True)
+    session_id = Column(String(255))
+    plan_version = Column(Integer)
+    plan = Column(Text)                                 # JSON dump of the TicketPlan
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
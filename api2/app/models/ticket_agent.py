@@ -29,11 +29,14 @@ class TicketItem(BaseModel):
     description: str       # concise context for the executor/assignee
     form: Dict[str, Any] = {}   # collected answers keyed by FieldDef.name
     labels: List[str] = []      # e.g., ["needs-triage"]
+    field_sources: Dict[str, Dict[str, Any]] = {}  # how prefilled values were found: {"urgency": {"source": "rule", "rule": "urgency", "confidence": 0.95}}
+    summary_draft: Optional[Dict[str, Any]] = None  # summary generated before completion: {"text", "source", "fingerprint" of its inputs}; just {"fingerprint"} while it runs
 
 # ---- TicketPlan is the full plan the agent intends to execute ----
 class TicketPlan(BaseModel):
     items: List[TicketItem]
     meta: Dict[str, Any]       # audit info: {"request_text": "...", ...}
+    catalog_version: Optional[str] = None  # catalog version the plan was built against
 
 # ---- MissingField links a specific TicketItem to a field that needs value ----
 class MissingField(BaseModel):
@@ -52,3 +55,9 @@ class ConversationState(BaseModel):
     plan: Optional[TicketPlan] = None
     pending: List[MissingField] = []   # queue of unanswered fields
     completed: bool = False
+    duplicate_of: Optional[str] = None   # recent request this one looks like; waiting for a yes/no before planning
+    duplicate_request_text: Optional[str] = None   # the request that matched; planned if the user says yes
+    clarify_text: Optional[str] = None   # ambiguous message waiting for "do you want a ticket?" before planning
+    plan_version: int = 0                # bumped whenever the plan changes between turns
+    plan_snapshots: Dict[int, Dict[str, Any]] = {}   # recent versions, for patches against what the client has
+    plan_version_sent: Optional[int] = None          # last version sent to the client
@@ -6,7 +6,8 @@ from app.models.ticket_agent import ConversationState, ChatTurn
 from app.schemas.agent_io import StartSessionOut, ChatMessageIn, ChatMessageOut, QuestionOut
 from app.services.planner_service import plan_from_text
 from app.services.validator_service import find_missing_fields, render_question, apply_answer
-from app.services.summary_service import generate_summaries_for_plan
+from app.services.summary_service import start_early_summaries
+from app.services.agent_completion import complete_agent_session
 from app.utils.session_store import put, get
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -70,6 +71,8 @@ async def chat_message(sid: str, payload: ChatMessageIn):
     state.pending = missing
 
     if missing:
+        start_early_summaries(state.plan, missing)
+
         # Ask for the next field and return it to the UI
         q = render_question(missing[0], state.plan)
         state.turns.append(ChatTurn(role="assistant", text=q["text"]))
@@ -82,27 +85,11 @@ async def chat_message(sid: str, payload: ChatMessageIn):
         )
 
     # Otherwise, we have a complete plan—generate summaries and "create" tickets (mock)
-    print(f"📝 AGENT: All fields filled, generating summaries...")
-    state.plan = await generate_summaries_for_plan(state.plan)
-    
-    state.completed = True
-    created = [
-        {
-            "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
-            "service_area": it.service_area,
-            "category": it.category,
-            "ticket_type": it.ticket_type,
-            "title": it.title,
-            "form": it.form
-        }
-        for i, it in enumerate(state.plan.items)
-    ]
-    state.turns.append(ChatTurn(role="assistant", text="Tickets created with auto-generated summaries."))
-    put(state)
+    completed = await complete_agent_session(state, payload.user_email)
 
     return ChatMessageOut(
         session_id=sid,
         status="done",
-        result={"created": created},
-        plan=state.plan.model_dump()
+        result={"created": completed["tickets"]},
+        plan=completed["plan"]
     )
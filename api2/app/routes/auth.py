@@ -14,8 +14,13 @@ from app.utils.email import send_verification_email
 from app.utils.auth_utils import (
     verify_password,
     get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
     create_access_token,
     get_current_user,
+    get_user_from_token,
+    bump_token_version,
+    AuthUser,
     generate_verification_token,
     decode_token,
     create_refresh_token,
@@ -47,7 +52,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             username=user_data.username if user_data.username else None,
             email=user_data.email,
@@ -74,6 +79,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             message="User registered successfully"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         # Rollback the transaction in case of error
         db.rollback()
@@ -85,12 +92,17 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login")
 async def login(data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, getattr(user, "password")):
+    valid, new_hash = await verify_and_update_password(data.password, getattr(user, "password")) if user else (False, None)
+    if not valid:
         return ApiResponse.create_error(
             message="Incorrect email or password",
             error_type="AUTHENTICATION_FAILED",
             error_code=401,
         )
+    if new_hash:
+        # Stored with outdated hashing parameters; upgrade while we have the plain password
+        user.password = new_hash
+        db.commit()
 
     # commented out since not checking for email_verified
     # if not user.email_verified:
@@ -98,7 +110,7 @@ async def login(data: LoginRequest, db: Session = Depends(get_db)):
 
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "ver": user.token_version or 0}, expires_delta=access_token_expires
     )
 
     user_response = UserResponse.model_validate(user)
@@ -114,21 +126,33 @@ async def login(data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @router.get("/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    user_response = UserResponse.model_validate(current_user)
+async def get_current_user_info(current_user: AuthUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    user_response = UserResponse.model_validate(user)
     return ApiResponse.create_success(
         data={"user": user_response},
         message="User information retrieved successfully"
     )
 
 @router.post("/logout")
-async def logout():
-    # In a stateless JWT setup, logout is handled client-side
-    # You might want to implement a token blacklist for additional security
+async def logout(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    # The client drops its token; bumping token_version also revokes every token issued
+    # to this user so far, on all devices
+    if token:
+        try:
+            current_user = get_user_from_token(token, db)
+        except HTTPException:
+            current_user = None     # already invalid; nothing to revoke
+        if current_user:
+            user = db.query(User).filter(User.id == current_user.id).first()
+            if user:
+                bump_token_version(user, db)
     return {"message": "Logout successful"}
 
 @router.post("/refresh")
-async def refresh_token(token: Optional[str] = Depends(oauth2_scheme)):
+async def refresh_token(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Refresh the access token"""
     if not token:
         # No token provided, return a response indicating this
@@ -157,7 +181,6 @@ async def refresh_token(token: Optional[str] = Depends(oauth2_scheme)):
         )
     
     # Get user from database
-    db = next(get_db())
     user = db.query(User).filter(User.id == int(user_id)).first()
     if user is None:
         raise HTTPException(
@@ -165,11 +188,18 @@ async def refresh_token(token: Optional[str] = Depends(oauth2_scheme)):
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # A token revoked by logout can't be refreshed
+    if payload.get("ver", 0) != (user.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token is invalid or expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     # Create new access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "ver": user.token_version or 0}, expires_delta=access_token_expires
     )
     
     user_response = UserResponse.model_validate(user)
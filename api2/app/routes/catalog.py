@@ -0,0 +1,90 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response
+from app.utils.auth_utils import AuthUser
+from app.routes.auth import get_current_user
+from app.utils.response_utils import ApiResponse
+from app.services.catalog_service import get_catalog_snapshot, reload_catalog
+from app.services.option_providers import get_option_source_stats
+from app.services.option_index import find_field_option_index
+from app.services.prompt_fragments import get_prompt_fragment_stats
+
+router = APIRouter()
+
+def require_admin(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
+    """Dependency that only lets ADMIN users through"""
+    if (current_user.role or "").upper() != "ADMIN":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+@router.get("/catalog")
+async def get_catalog(request: Request):
+    """Get the live ticket catalog, tagged with its version as an ETag"""
+    snapshot = get_catalog_snapshot()
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers={"ETag": snapshot.etag})
+
+    response = ApiResponse.create_success(
+        data={"version": snapshot.version, "catalog": snapshot.data},
+        message="Catalog retrieved successfully"
+    )
+    return JSONResponse(content=response.model_dump(mode="json"), headers={"ETag": snapshot.etag})
+
+@router.get("/catalog/version")
+async def get_catalog_version_info():
+    """Get the live catalog version, source and load time"""
+    return ApiResponse.create_success(
+        data=get_catalog_snapshot().info(),
+        message="Catalog version retrieved successfully"
+    )
+
+@router.post("/catalog/reload")
+async def reload_catalog_endpoint(force: bool = False, current_user: AuthUser = Depends(require_admin)):
+    """Re-read the catalog file and atomically activate it if it changed (admin only)"""
+    import asyncio
+    try:
+        # Parsing and index building can take a while; keep it off the event loop
+        snapshot, changed = await asyncio.to_thread(reload_catalog, force)
+    except ValueError as e:
+        return ApiResponse.create_error(
+            message=str(e),
+            error_type="CATALOG_INVALID"
+        )
+    return ApiResponse.create_success(
+        data={**snapshot.info(), "changed": changed},
+        message="Catalog reloaded" if changed else "Catalog unchanged"
+    )
+
+@router.get("/catalog/option-sources")
+async def get_option_sources(current_user: AuthUser = Depends(require_admin)):
+    """Get cache state for every options_source seen so far (admin only)"""
+    return ApiResponse.create_success(
+        data={"sources": get_option_source_stats()},
+        message="Option sources retrieved successfully"
+    )
+
+@router.get("/catalog/prompt-fragments")
+async def get_prompt_fragments(current_user: AuthUser = Depends(require_admin)):
+    """Get cache and token stats for the precomputed planner/prefill prompt fragments (admin only)"""
+    return ApiResponse.create_success(
+        data={"fragments": get_prompt_fragment_stats()},
+        message="Prompt fragment stats retrieved successfully"
+    )
+
+@router.get("/catalog/fields/{ticket_type:path}/{field_name}/options")
+async def search_field_options(
+    ticket_type: str,
+    field_name: str,
+    q: str = "",
+    limit: int = Query(20, ge=1, le=200),
+    version: Optional[str] = None,
+):
+    """Typeahead search over a choice field's options, served from the precomputed option index"""
+    index = find_field_option_index(ticket_type, field_name, version)
+    if index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No choice field '{field_name}' on '{ticket_type}'")
+    options, total = index.search(q, limit)
+    return ApiResponse.create_success(
+        data={"options": options, "total": total, "query": q},
+        message="Options retrieved successfully"
+    )
@@ -1,14 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from app.utils.auth_utils import AuthUser
+from app.routes.catalog import require_admin
 from app.utils.response_utils import ApiResponse
+from app.utils.http_cache import cached_response, invalidate_http_cache
+from app.services.catalog_service import on_catalog_reload
 from app.constants import ACTIVE_MODEL
-from app.config import settings
+from app.config import reload_settings, settings
 
 router = APIRouter()
 
-@router.get("/config")
-async def get_config():
-    """Get application configuration"""
-    config_data = {
+def _frontend_config() -> dict:
+    return {
         "appTitle": "Ticket Orchestration Chat",
         "appDescription": "BestEgg Support Ticket Orchestration Chat",
         "version": "1.0.0",
@@ -33,39 +35,32 @@ async def get_config():
             "azure": False
         }
     }
-    return ApiResponse.create_success(
-        data=config_data,
+
+@router.get("/config")
+async def get_config(request: Request):
+    """Get application configuration"""
+    return cached_response(request, "config", lambda: ApiResponse.create_success(
+        data=_frontend_config(),
         message="Configuration retrieved successfully"
-    )
+    ))
 
 @router.get("/startup")
-async def get_startup_config():
+async def get_startup_config(request: Request):
     """Get startup configuration for the frontend"""
-    startup_config = {
-        "appTitle": "Ticket Orchestration Chat",
-        "appDescription": "BestEgg Support Ticket Orchestration Chat",
-        "version": "1.0.0",
-        "emailLoginEnabled": True,
-        "registrationEnabled": True,
-        "socialLoginEnabled": False,
-        "passwordResetEnabled": True,
-        "activeModel": ACTIVE_MODEL,
-        "activeProvider": settings.llm_provider,
-        "features": {
-            "registration": True,
-            "socialLogin": False,
-            "fileUpload": True,
-            "multiUser": True
-        },
-        "endpoints": {
-            "custom": True,
-            "openAI": False,
-            "anthropic": False,
-            "google": False,
-            "azure": False
-        }
-    }
-    return ApiResponse.create_success(
-        data=startup_config,
+    return cached_response(request, "startup", lambda: ApiResponse.create_success(
+        data=_frontend_config(),
         message="Startup configuration retrieved successfully"
-    ) 
\ No newline at end of file
+    ))
+
+@router.post("/config/reload")
+async def reload_config(current_user: AuthUser = Depends(require_admin)):
+    """Re-read settings from the environment and .env and drop precomputed responses (admin only)"""
+    reload_settings()
+    invalidate_http_cache()
+    return ApiResponse.create_success(
+        data={"activeProvider": settings.llm_provider, "activeModel": settings.llm_model},
+        message="Configuration reloaded"
+    )
+
+# Cached responses may embed catalog-derived values
+on_catalog_reload(invalidate_http_cache)
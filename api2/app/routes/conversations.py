@@ -4,7 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 from app.models import get_db
-from app.models.user import User
+from app.utils.auth_utils import AuthUser
 from app.schemas.conversation import ConversationResponse
 from app.routes.auth import get_current_user
 from app.services.conversation_service import ConversationService
@@ -24,7 +24,7 @@ router = APIRouter(tags=["Conversations"])
 @router.get("")
 @router.get("/")
 async def get_conversations(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
@@ -69,7 +69,7 @@ async def get_conversations(
 @router.post("/")
 async def create_conversation(
     title: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -98,7 +98,7 @@ async def create_conversation(
 @router.get("/{conversation_id}")
 async def get_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -131,7 +131,7 @@ async def update_conversation(
     conversation_id: int,
     title: Optional[str] = None,
     is_archived: Optional[bool] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -159,7 +159,7 @@ async def update_conversation(
 @router.post("/update")
 async def update_conversation_post(
     request: UpdateConversationRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -209,7 +209,7 @@ async def update_conversation_post(
 @router.post("/{conversation_id}/archive")
 async def archive_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -235,7 +235,7 @@ async def archive_conversation(
 @router.post("/{conversation_id}/unarchive")
 async def unarchive_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -261,7 +261,7 @@ async def unarchive_conversation(
 @router.get("/{conversation_id}/stats")
 async def get_conversation_stats(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -287,7 +287,7 @@ async def get_conversation_stats(
 @router.post("/gen_title")
 async def generate_title(
     conversationId: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -318,7 +318,7 @@ async def delete_conversations(
     thread_id: Optional[str] = Query(None),
     endpoint: Optional[str] = Query(None),
     request_body: Optional[DeleteConversationRequest] = Body(None),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -396,7 +396,7 @@ async def delete_conversations(
 @router.delete("/id/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -421,7 +421,7 @@ async def delete_conversation(
 
 @router.delete("/all")
 async def delete_all_conversations(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
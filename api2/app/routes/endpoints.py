@@ -2,73 +2,147 @@ from fastapi import APIRouter, Request, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.models import get_db
-from app.models.user import User
+from app.utils.auth_utils import AuthUser
 from app.models.conversation import Conversation
 from app.models.message import Message
+from app.models.plan_snapshot import PlanSnapshot
 from app.routes.auth import get_current_user
+from app.routes.catalog import require_admin
 import uuid
+import json
+from typing import Optional, Tuple
 import asyncio
 from datetime import datetime
-import json
 import logging
 from app.utils.response_utils import ApiResponse
+from app.utils.http_cache import cached_response
+from app.utils.fast_json import SSEFrame, sse_event
 from app.config import settings
 from app.constants import ACTIVE_MODEL, ACTIVE_PROVIDER
 
 # Import agentic ticket creation components
 from app.services.planner_service import plan_from_text, plan_from_text_async
-from app.services.validator_service import find_missing_fields, render_question, apply_answer, apply_answer_async
-from app.services.summary_service import generate_summaries_for_plan
+from app.services.validator_service import (
+    apply_answer,
+    apply_answer_async,
+    apply_answers_async,
+    find_missing_fields,
+    parse_form_answer,
+    question_group,
+    render_form,
+    render_question,
+)
+from app.services.summary_service import start_early_summaries
+from app.services.agent_completion import complete_agent_session, drop_agent_session, open_agent_session
+from app.services.duplicate_detector import (
+    describe_duplicate,
+    find_duplicate_request,
+    get_duplicate_entry,
+    parse_confirmation,
+)
+from app.services.plan_versions import get_plan_version, plan_update
 from app.models.ticket_agent import ConversationState, ChatTurn
+from app.services.intent_router import CLARIFY_QUESTION, classify_intent, log_intent_example
 from app.utils.session_store import put, get
 
 logger = logging.getLogger(__name__)
 
-def is_ticket_request(content: str, conversation_id: int = None) -> bool:
-    """Detect if the user message is requesting ticket creation or continuing an agent session"""
-    # First check if there's an active agent session for this conversation
-    if conversation_id is not None:
-        session_id = f"conv_{conversation_id}"
-        state = get(session_id)
-        if state and not state.completed:
-            print(f"🎯 AGENT: Found active session {session_id} with {len(state.pending)} pending questions")
-            return True
-    
-    # Then check for ticket-related keywords
-    ticket_keywords = [
-        "create ticket", "new ticket", "submit ticket", "open ticket",
-        "support request", "help request", "incident report", "bug report",
-        "datadog", "sftp", "jams", "monitoring", "alert", "dashboard",
-        "loan tape", "investor", "rerun", "verification"
-    ]
-    content_lower = content.lower()
-    return any(keyword in content_lower for keyword in ticket_keywords)
+def route_ticket_intent(content: str, conversation_id: int) -> Tuple[str, str]:
+    """
+    Decide what a chat message starts: ("agent", request text), ("clarify", text) or ("chat", text).
+    - An active agent session keeps receiving messages.
+    - After a clarifying turn, "yes" plans the message that was being clarified and "no"
+      goes back to chat; both answers are logged as labeled intent examples.
+    - Otherwise the intent router decides; only confident ticket intents start the agent.
+    """
+    session_id = f"conv_{conversation_id}"
+    state = get(session_id)
+    if state and state.clarify_text is not None:
+        pending = state.clarify_text
+        answer = parse_confirmation(content)
+        drop_agent_session(session_id)
+        if answer is not None:
+            log_intent_example(pending, "ticket" if answer else "chat")
+            return ("agent", pending) if answer else ("chat", content)
+    elif state and not state.completed:
+        print(f"🎯 AGENT: Found active session {session_id} with {len(state.pending)} pending questions")
+        return "agent", content
 
-async def handle_agentic_ticket_creation(content: str, conversation_id: int, user_email: str = None) -> dict:
-    """Handle ticket creation using the agentic flow"""
+    intent = classify_intent(content)
+    if intent.label == "ticket":
+        return "agent", content
+    if intent.label == "unclear":
+        return "clarify", content
+    return "chat", content
+
+def ask_ticket_clarification(content: str, conversation_id: int) -> dict:
+    """A cheap turn for ambiguous messages: ask before starting the planner."""
+    session_id = f"conv_{conversation_id}"
+    put(ConversationState(session_id=session_id, clarify_text=content, turns=[
+        ChatTurn(role="user", text=content),
+        ChatTurn(role="assistant", text=CLARIFY_QUESTION),
+    ]))
+    return {"type": "agent_clarify", "content": CLARIFY_QUESTION, "session_id": session_id}
+
+async def handle_agentic_ticket_creation(content: str, conversation_id: int, user_email: str = None, known_plan_version: Optional[int] = None) -> dict:
+    """
+    Handle ticket creation using the agentic flow.
+    `known_plan_version` is the plan version the client has; turns carry a patch against it.
+    """
     print(f"🎯 AGENT: Starting agentic ticket creation for conversation {conversation_id}")
     print(f"💬 AGENT: User content: '{content}'")
     
-    # Create or get session for this conversation
+    # Create or get session for this conversation; a completed one starts over
     session_id = f"conv_{conversation_id}"
-    state = get(session_id)
-    
-    if not state:
-        print(f"🆕 AGENT: Creating new session: {session_id}")
-        state = ConversationState(session_id=session_id)
-        put(state)
-    else:
-        print(f"📂 AGENT: Using existing session: {session_id}")
+    state = open_agent_session(session_id)
     
     # Record the user turn
     state.turns.append(ChatTurn(role="user", text=content))
     print(f"📝 AGENT: Recorded user turn, total turns: {len(state.turns)}")
     
+    request_text = content
+    if state.plan is None and state.duplicate_of:
+        # The user is answering "this looks like ticket X, create another one anyway?"
+        answer = parse_confirmation(content)
+        duplicate = get_duplicate_entry(state.duplicate_of)
+        if answer is None:
+            question = "Please answer yes to create another ticket or no to keep the existing one."
+            state.turns.append(ChatTurn(role="assistant", text=question))
+            put(state)
+            return {"type": "agent_duplicate", "content": question, "session_id": session_id}
+        if not answer:
+            existing = duplicate.tickets if duplicate else []
+            message = "OK, no new ticket was created." + (
+                " Existing: " + ", ".join(f"{t['title']} ({t['pseudo_id']})" for t in existing) if existing else ""
+            )
+            # Done with this request; the next message starts a fresh session
+            drop_agent_session(session_id)
+            print(f"🔁 AGENT: User kept the existing ticket, nothing created")
+            return {"type": "agent_duplicate", "content": message, "session_id": session_id, "tickets": existing}
+        # Plan the request that triggered the check, not the "yes"
+        request_text = state.duplicate_request_text or content
+        state.duplicate_of = None
+        state.duplicate_request_text = None
+    elif state.plan is None:
+        duplicate = find_duplicate_request(user_email, content)
+        if duplicate:
+            state.duplicate_of = duplicate.entry.entry_id
+            state.duplicate_request_text = content
+            question = describe_duplicate(duplicate)
+            state.turns.append(ChatTurn(role="assistant", text=question))
+            put(state)
+            return {
+                "type": "agent_duplicate",
+                "content": question,
+                "session_id": session_id,
+                "duplicate_of": duplicate.entry.tickets,
+            }
+
     # If no plan yet, create one
     if state.plan is None:
         print(f"📋 AGENT: No plan exists, creating new plan...")
-        state.plan = await plan_from_text_async(content, user_email)
-        state.plan.meta = {"request_text": content, "conversation_id": conversation_id}
+        state.plan = await plan_from_text_async(request_text, user_email)
+        state.plan.meta = {"request_text": request_text, "conversation_id": conversation_id}
          
         # Email is already set by the field prefiller, but double-check
         if user_email:
@@ -82,7 +156,14 @@ async def handle_agentic_ticket_creation(content: str, conversation_id: int, use
     else:
         print(f"📋 AGENT: Using existing plan with {len(state.plan.items)} items")
         # User is answering a question, so apply the answer
-        if state.pending:
+        if state.pending and settings.question_mode == "form":
+            group = question_group(state.pending)
+            answers = parse_form_answer(content, group)
+            print(f"📝 AGENT: User answered form fields: {list(answers)}")
+            state.plan = await apply_answers_async(
+                state.plan, [(m.item_index, m.field.name, answers[m.field.name]) for m in group if m.field.name in answers]
+            )
+        elif state.pending:
             print(f"📝 AGENT: User is answering question for field: {state.pending[0].field.name}")
             missing_field = state.pending[0]
             state.plan = await apply_answer_async(state.plan, missing_field.item_index, missing_field.field.name, content)
@@ -96,81 +177,58 @@ async def handle_agentic_ticket_creation(content: str, conversation_id: int, use
     print(f"📊 AGENT: Found {len(missing)} missing fields")
     
     if missing:
-        # Ask for next field
-        print(f"❓ AGENT: Asking for field: {missing[0].field.name}")
-        question = render_question(missing[0], state.plan)
-        state.turns.append(ChatTurn(role="assistant", text=question["text"]))
+        # Items that are already complete get their summaries started now
+        start_early_summaries(state.plan, missing)
+        return _ask_next(state, missing, session_id, as_form=settings.question_mode == "form", known_plan_version=known_plan_version)
+    return await complete_agent_session(state, user_email)
+
+def _ask_next(state: ConversationState, missing: list, session_id: str, as_form: bool = False, known_plan_version: Optional[int] = None) -> dict:
+    """The next question turn: one field, or the ticket's missing fields as one form."""
+    if as_form:
+        group = question_group(missing)
+        print(f"❓ AGENT: Asking for fields: {[m.field.name for m in group]}")
+        form = render_form(group, state.plan)
+        state.turns.append(ChatTurn(role="assistant", text=form["text"]))
+        plan_fields = plan_update(state, known_plan_version)
         put(state)
-        
-        print(f"✅ AGENT: Returning agent question")
         return {
-            "type": "agent_question",
-            "content": question["text"],
-            "question": question,
-            "plan_preview": state.plan.model_dump(),
+            "type": "agent_form",
+            "content": form["text"],
+            "form": form,
+            **plan_fields,
             "session_id": session_id
         }
-    else:
-        # Complete - generate summaries and create tickets
-        print(f"🎉 AGENT: All fields complete, generating summaries...")
-        state.plan = await generate_summaries_for_plan(state.plan)
-        
-        state.completed = True
-        created = [
-            {
-                "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
-                "service_area": it.service_area,
-                "category": it.category,
-                "ticket_type": it.ticket_type,
-                "title": it.title,
-                "form": it.form
-            }
-            for i, it in enumerate(state.plan.items)
-        ]
-        state.turns.append(ChatTurn(role="assistant", text="Tickets created successfully with auto-generated summaries!"))
-        put(state)
-        
-        print(f"✅ AGENT: Created {len(created)} tickets")
-        
-        # Create detailed content with full JSON
-        content_lines = [f"✅ Created {len(created)} ticket(s):"]
-        for i, ticket in enumerate(created):
-            content_lines.append(f"\n**Ticket {i+1}: {ticket['title']} ({ticket['pseudo_id']})**")
-            content_lines.append(f"Service Area: {ticket['service_area']}")
-            content_lines.append(f"Category: {ticket['category']}")
-            content_lines.append(f"Type: {ticket['ticket_type']}")
-            content_lines.append("Form Data:")
-            content_lines.append("```json")
-            content_lines.append(json.dumps(ticket['form'], indent=2))
-            content_lines.append("```")
-        
-        content_lines.append(f"\n**Complete Plan JSON:**")
-        content_lines.append("```json")
-        content_lines.append(json.dumps(state.plan.model_dump(), indent=2))
-        content_lines.append("```")
-        
-        return {
-            "type": "agent_complete",
-            "content": "\n".join(content_lines),
-            "tickets": created,
-            "plan": state.plan.model_dump()
-        }
+
+    # Ask for next field
+    print(f"❓ AGENT: Asking for field: {missing[0].field.name}")
+    question = render_question(missing[0], state.plan)
+    state.turns.append(ChatTurn(role="assistant", text=question["text"]))
+    plan_fields = plan_update(state, known_plan_version)
+    put(state)
+    
+    print(f"✅ AGENT: Returning agent question")
+    return {
+        "type": "agent_question",
+        "content": question["text"],
+        "question": question,
+        **plan_fields,
+        "session_id": session_id
+    }
 
 router = APIRouter()
 
 @router.get("/endpoints")
-async def get_endpoints():
+async def get_endpoints(request: Request):
     """Get available endpoints configuration - simplified for single model"""
     # Use "custom" as the endpoint key for compatibility
     endpoint_key = "custom"
-    endpoints_data = {
+    return cached_response(request, "endpoints", lambda: {
         endpoint_key: {
             "enabled": True,
             "available": True,
             "models": [settings.llm_model]  # Only the active model
         }
-    }
-    return endpoints_data
+    })
 
 @router.get("/test")
 async def test_endpoint():
@@ -196,6 +254,12 @@ async def llm_health_check():
             "llm_provider": llm_service.provider
         }
 
+@router.get("/metrics")
+async def get_metrics(current_user: AuthUser = Depends(require_admin)):
+    """In-process counters and timings (e.g. how choice answers were matched); admins only"""
+    from app.utils import metrics
+    return metrics.snapshot()
+
 @router.get("/llm/models")
 async def list_llm_models():
     """List available LLM models - simplified for single model"""
@@ -213,7 +277,7 @@ async def list_llm_models():
         }
 
 @router.get("/messages/{conversation_id}")
-async def get_messages(conversation_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_messages(conversation_id: str, db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
     """Get messages for a conversation"""
     # Convert conversation_id to int if it's a number
     try:
@@ -251,7 +315,7 @@ async def get_messages(conversation_id: str, db: Session = Depends(get_db), curr
     return result
 
 @router.post("/ask/{provider}")
-async def ask_provider(provider: str, request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def ask_provider(provider: str, request: Request, db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
     """Ask the configured LLM provider - simplified for single model"""
     # Accept "custom" as a valid provider that maps to the configured provider
     if provider == "custom":
@@ -309,11 +373,15 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
         user_message = messages[-1]["content"] if messages else ""
         
         # Check if this is a ticket request and handle with agentic flow
-        if is_ticket_request(user_message, conversation.id):
-            logger.info(f"🎫 Detected ticket request: '{user_message}'")
+        intent, request_text = route_ticket_intent(user_message, conversation.id)
+        if intent != "chat":
+            logger.info(f"🎫 Detected ticket request ({intent}): '{user_message}'")
             
-            # Handle with agentic ticket creation
-            agent_response = await handle_agentic_ticket_creation(user_message, conversation.id, current_user.email)
+            if intent == "clarify":
+                agent_response = ask_ticket_clarification(user_message, conversation.id)
+            else:
+                # Handle with agentic ticket creation
+                agent_response = await handle_agentic_ticket_creation(request_text, conversation.id, current_user.email, data.get("plan_version"))
             
             # Create the user message in database
             user_message_id = str(uuid.uuid4())
@@ -356,7 +424,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                     "created": True,
                     "message": request_message
                 }
-                yield f"event: message\ndata: {json.dumps(created_data)}\n\n"
+                yield sse_event(created_data)
                 
                 # Create the assistant message for agentic response
                 assistant_msg = Message(
@@ -394,7 +462,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                      # Removed agent_data to make it appear as regular chat
                  }
                 
-                yield f"event: message\ndata: {json.dumps(agentic_response)}\n\n"
+                yield sse_event(agentic_response)
                 
                 # Send final response data
                 final_data = {
@@ -415,7 +483,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                     "responseMessage": agentic_response
                 }
                 
-                yield f"event: message\ndata: {json.dumps(final_data)}\n\n"
+                yield sse_event(final_data)
                 yield "data: [DONE]\n\n"
             
             return StreamingResponse(
@@ -525,7 +593,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                 "created": True,
                 "message": request_message
             }
-            yield f"event: message\ndata: {json.dumps(created_data)}\n\n"
+            yield sse_event(created_data)
             
             # Initialize response content
             response_content = ""
@@ -542,6 +610,23 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
             
             # Don't send assistant message creation event - let messageHandler handle it
             
+            # Streamed frames only differ in text and updatedAt; the rest is serialized once
+            # The frontend messageHandler expects the full text to replace the message
+            chunk_frame = SSEFrame({
+                "message": True,  # This triggers the messageHandler
+                "messageId": assistant_message_id,
+                "conversationId": str(conversation.id),
+                "parentMessageId": user_message_id,
+                "sender": "Ticket Bot",
+                "isCreatedByUser": False,
+                "createdAt": assistant_msg.created_at.isoformat() if assistant_msg.created_at else datetime.now().isoformat(),
+                "model": model,
+                "endpoint": "custom",  # Use "custom" for compatibility
+                "unfinished": True,  # Mark as unfinished during streaming
+                "error": False,
+                "isEdited": False
+            }, changing=("text", "updatedAt"))
+            
             try:
                 # Stream the LLM response
                 async for chunk in llm_service.generate_response(
@@ -553,27 +638,8 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                     # Add chunk to accumulated content for final storage
                     response_content += chunk
                     
-                    # Create streaming response message with accumulated content
-                    # The frontend messageHandler expects the full text to replace the message
-                    streaming_response = {
-                        "message": True,  # This triggers the messageHandler
-                        "messageId": assistant_message_id,
-                        "conversationId": str(conversation.id),
-                        "parentMessageId": user_message_id,
-                        "sender": "Ticket Bot",
-                        "text": response_content,  # Send accumulated content (frontend expects this)
-                        "isCreatedByUser": False,
-                        "createdAt": assistant_msg.created_at.isoformat() if assistant_msg.created_at else datetime.now().isoformat(),
-                        "updatedAt": datetime.now().isoformat(),
-                        "model": model,
-                        "endpoint": "custom",  # Use "custom" for compatibility
-                        "unfinished": True,  # Mark as unfinished during streaming
-                        "error": False,
-                        "isEdited": False
-                    }
-                    
-                    # Send immediately without buffering
-                    yield f"event: message\ndata: {json.dumps(streaming_response)}\n\n"
+                    # Send accumulated content immediately without buffering
+                    yield chunk_frame.render(response_content, datetime.now().isoformat())
                     # Add a small delay to prevent overwhelming the frontend
                     await asyncio.sleep(0.01)
                 
@@ -622,7 +688,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                     "responseMessage": final_response
                 }
                 
-                yield f"event: message\ndata: {json.dumps(final_data)}\n\n"
+                yield sse_event(final_data)
                 yield "data: [DONE]\n\n"
                     
             except Exception as e:
@@ -643,7 +709,7 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
                     "error": True,
                     "isEdited": False
                 }
-                yield f"event: message\ndata: {json.dumps(error_response)}\n\n"
+                yield sse_event(error_response)
                 yield "data: [DONE]\n\n"
 
         return StreamingResponse(
@@ -669,12 +735,12 @@ async def ask_provider(provider: str, request: Request, db: Session = Depends(ge
 
 # Keep the old endpoint for backward compatibility
 @router.post("/ask/custom")
-async def ask_custom(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def ask_custom(request: Request, db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
     """Legacy endpoint - redirects to the configured provider"""
     return await ask_provider(settings.llm_provider, request, db, current_user)
 
 @router.post("/agent-answer")
-async def answer_agent_question(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def answer_agent_question(request: Request, db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
     """Answer a question from the agentic ticket creation flow"""
     try:
         data = await request.json()
@@ -713,58 +779,23 @@ async def answer_agent_question(request: Request, db: Session = Depends(get_db),
         state.pending = missing
         
         if missing:
+            start_early_summaries(state.plan, missing)
             # Ask next question
             question = render_question(missing[0], state.plan)
             state.turns.append(ChatTurn(role="assistant", text=question["text"]))
+            plan_fields = plan_update(state, data.get("plan_version"))
             put(state)
             
             return {
                 "type": "agent_question",
                 "content": question["text"],
                 "question": question,
-                "plan_preview": state.plan.model_dump()
+                **plan_fields
             }
-        else:
-            # Complete - create tickets
-            state.completed = True
-            created = [
-                {
-                    "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
-                    "service_area": it.service_area,
-                    "category": it.category,
-                    "ticket_type": it.ticket_type,
-                    "title": it.title,
-                    "form": it.form
-                }
-                for i, it in enumerate(state.plan.items)
-            ]
-            state.turns.append(ChatTurn(role="assistant", text="Tickets created successfully!"))
-            put(state)
-            
-            # Create detailed content with full JSON
-            content_lines = [f"✅ Created {len(created)} ticket(s):"]
-            for i, ticket in enumerate(created):
-                content_lines.append(f"\n**Ticket {i+1}: {ticket['title']} ({ticket['pseudo_id']})**")
-                content_lines.append(f"Service Area: {ticket['service_area']}")
-                content_lines.append(f"Category: {ticket['category']}")
-                content_lines.append(f"Type: {ticket['ticket_type']}")
-                content_lines.append("Form Data:")
-                content_lines.append("```json")
-                content_lines.append(json.dumps(ticket['form'], indent=2))
-                content_lines.append("```")
-            
-            content_lines.append(f"\n**Complete Plan JSON:**")
-            content_lines.append("```json")
-            content_lines.append(json.dumps(state.plan.model_dump(), indent=2))
-            content_lines.append("```")
-            
-            return {
-                "type": "agent_complete",
-                "content": "\n".join(content_lines),
-                "tickets": created,
-                "plan": state.plan.model_dump()
-            }
-            
+        
+        # Complete - summaries, tickets, duplicate index
+        return await complete_agent_session(state, current_user.email, db)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -772,4 +803,122 @@ async def answer_agent_question(request: Request, db: Session = Depends(get_db),
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error handling agent answer: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/agent-answer/batch")
+async def answer_agent_questions_batch(request: Request, db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
+    """
+    Answer several pending fields of an agentic session at once (the "agent_form" payload).
+    `answers` is either {field_name: value} for the ticket the form asked about, or a list
+    of {"item_index", "field_name", "value"}. Values are processed concurrently; the reply
+    is the next form or the completed tickets.
+    """
+    try:
+        data = await request.json()
+        session_id = data.get("session_id")
+        answers = data.get("answers")
+        
+        if not session_id or not answers or not isinstance(answers, (dict, list)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing required fields: session_id, answers"
+            )
+        
+        state = get(session_id)
+        if not state:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Agent session not found"
+            )
+        if not state.pending:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No pending questions"
+            )
+        
+        if isinstance(answers, dict):
+            item_index = question_group(state.pending)[0].item_index
+            answers = [{"item_index": item_index, "field_name": k, "value": v} for k, v in answers.items()]
+        pending = {(m.item_index, m.field.name) for m in state.pending}
+        updates = []
+        for answer in answers:
+            key = (answer.get("item_index"), answer.get("field_name"))
+            if key not in pending:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Field '{key[1]}' of ticket {key[0]} is not pending"
+                )
+            updates.append((key[0], key[1], answer.get("value")))
+        
+        print(f"📝 AGENT: Applying {len(updates)} answers for session {session_id}")
+        state.plan = await apply_answers_async(state.plan, updates)
+        state.turns.append(ChatTurn(role="user", text="\n".join(f"{name}: {value}" for _, name, value in updates)))
+        
+        missing = find_missing_fields(state.plan)
+        state.pending = missing
+        if missing:
+            start_early_summaries(state.plan, missing)
+            return _ask_next(state, missing, session_id, as_form=True, known_plan_version=data.get("plan_version"))
+        return await complete_agent_session(state, current_user.email, db)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling agent answers: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error handling agent answers: {str(e)}"
+        )
+
+@router.get("/agent-sessions/{session_id}/plan")
+async def get_agent_plan(
+    session_id: str,
+    version: Optional[int] = None,
+    since: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    """
+    A plan version of an agent session (the current one by default). With `since`, the
+    RFC 6902 patch from that version instead, when it is still kept.
+    """
+    state = get(session_id)
+    if session_id.startswith("conv_"):
+        try:
+            owned = db.query(Conversation).filter(
+                Conversation.id == int(session_id[len("conv_"):]),
+                Conversation.user_id == current_user.id
+            ).first()
+        except ValueError:
+            owned = None
+        if not owned:
+            state = None
+    if not state or state.plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent session not found")
+    
+    plan = get_plan_version(state, version)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan version {version} is no longer available")
+    if since is not None and version is None:
+        return {"session_id": session_id, **plan_update(state, since)}
+    return {"session_id": session_id, "plan_version": version or state.plan_version, "plan": plan}
+
+@router.get("/plans/{snapshot_id}")
+async def get_final_plan(
+    snapshot_id: str,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    """The persisted final plan of a completed agent session, as linked from its completion message."""
+    snapshot = db.query(PlanSnapshot).join(Conversation, PlanSnapshot.conversation_id == Conversation.id).filter(
+        PlanSnapshot.id == snapshot_id,
+        Conversation.user_id == current_user.id
+    ).first()
+    if not snapshot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return {
+        "plan_id": snapshot.id,
+        "session_id": snapshot.session_id,
+        "plan_version": snapshot.plan_version,
+        "plan": json.loads(snapshot.plan),
+    }
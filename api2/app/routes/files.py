@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.utils.response_utils import ApiResponse
+from app.utils.http_cache import cached_response
+from app.config import settings
 
 router = APIRouter()
 
@@ -12,24 +14,24 @@ async def get_files():
     )
 
 @router.get("/files/speech/config/get")
-async def get_speech_config():
+async def get_speech_config(request: Request):
     """Get speech configuration - stub implementation"""
-    return ApiResponse.create_success(
+    return cached_response(request, "speech_config", lambda: ApiResponse.create_success(
         data={
             "enabled": False,
             "provider": "none"
         },
         message="Speech config retrieved successfully"
-    )
+    ))
 
 @router.get("/files/config")
-async def get_files_config():
+async def get_files_config(request: Request):
     """Get file upload configuration - stub implementation"""
-    return ApiResponse.create_success(
+    return cached_response(request, "files_config", lambda: ApiResponse.create_success(
         data={
             "enabled": True,
-            "maxSize": 10485760,  # 10MB
+            "maxSize": settings.max_file_size,
             "allowedTypes": ["image/*", "text/*", "application/pdf"]
         },
         message="Files config retrieved successfully"
-    ) 
\ No newline at end of file
+    )) 
\ No newline at end of file
@@ -4,7 +4,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.models import get_db
-from app.models.user import User
+from app.utils.auth_utils import AuthUser
 from app.services.memory_service import MemoryService
 from app.routes.auth import get_current_user
 
@@ -15,7 +15,7 @@ async def get_conversation_context(
     conversation_id: int,
     max_messages: int = Query(20, ge=1, le=100),
     include_system_messages: bool = Query(True),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -56,7 +56,7 @@ async def get_conversation_context(
 @router.get("/summary/{conversation_id}")
 async def get_conversation_summary(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -88,7 +88,7 @@ async def get_conversation_summary(
 @router.get("/user/memory")
 async def get_user_memory(
     limit: int = Query(10, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -119,7 +119,7 @@ async def get_user_memory(
 async def search_memory(
     query: str = Query(..., min_length=1, max_length=200),
     limit: int = Query(10, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -149,7 +149,7 @@ async def search_memory(
 @router.get("/timeline/{conversation_id}")
 async def get_conversation_timeline(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -185,7 +185,7 @@ async def get_conversation_timeline(
 @router.post("/cleanup")
 async def cleanup_old_conversations(
     days_old: int = Query(30, ge=1, le=365),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -212,7 +212,7 @@ async def cleanup_old_conversations(
 
 @router.get("/stats")
 async def get_memory_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
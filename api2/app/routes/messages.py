@@ -4,7 +4,7 @@ from typing import List, Optional
 import uuid
 
 from app.models import get_db
-from app.models.user import User
+from app.utils.auth_utils import AuthUser
 from app.schemas.message import MessageResponse, MessageCreate, MessageUpdate, MessageListResponse
 from app.routes.auth import get_current_user
 from app.services.message_service import MessageService
@@ -12,32 +12,20 @@ from app.services.message_service import MessageService
 # Import agentic ticket creation components
 from app.services.planner_service import plan_from_text
 from app.services.validator_service import find_missing_fields, render_question, apply_answer
-from app.services.summary_service import generate_summaries_for_plan
-from app.models.ticket_agent import ConversationState, ChatTurn
+from app.services.summary_service import start_early_summaries
+from app.services.agent_completion import complete_agent_session, open_agent_session
+from app.services.plan_versions import plan_update
+from app.services.intent_router import classify_intent
+from app.models.ticket_agent import ChatTurn
 from app.utils.session_store import put, get
 
 router = APIRouter(tags=["Messages"])
 
-def is_ticket_request(content: str) -> bool:
-    """Detect if the user message is requesting ticket creation"""
-    ticket_keywords = [
-        "create ticket", "new ticket", "submit ticket", "open ticket",
-        "support request", "help request", "incident report", "bug report",
-        "datadog", "sftp", "jams", "monitoring", "alert", "dashboard",
-        "loan tape", "investor", "rerun", "verification"
-    ]
-    content_lower = content.lower()
-    return any(keyword in content_lower for keyword in ticket_keywords)
-
 async def handle_agentic_ticket_creation(content: str, conversation_id: int, user_email: str = None) -> dict:
     """Handle ticket creation using the agentic flow"""
-    # Create or get session for this conversation
+    # Create or get session for this conversation; a completed one starts over
     session_id = f"conv_{conversation_id}"
-    state = get(session_id)
-    
-    if not state:
-        state = ConversationState(session_id=session_id)
-        put(state)
+    state = open_agent_session(session_id)
     
     # Record the user turn
     state.turns.append(ChatTurn(role="user", text=content))
@@ -60,48 +48,27 @@ async def handle_agentic_ticket_creation(content: str, conversation_id: int, use
     state.pending = missing
     
     if missing:
+        start_early_summaries(state.plan, missing)
+
         # Ask for next field
         question = render_question(missing[0], state.plan)
         state.turns.append(ChatTurn(role="assistant", text=question["text"]))
+        plan_fields = plan_update(state)
         put(state)
         
         return {
             "type": "agent_question",
             "content": question["text"],
             "question": question,
-            "plan_preview": state.plan.model_dump(),
+            **plan_fields,
             "session_id": session_id
         }
-    else:
-        # Complete - generate summaries and create tickets
-        state.plan = await generate_summaries_for_plan(state.plan)
-        
-        state.completed = True
-        created = [
-            {
-                "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
-                "service_area": it.service_area,
-                "category": it.category,
-                "ticket_type": it.ticket_type,
-                "title": it.title,
-                "form": it.form
-            }
-            for i, it in enumerate(state.plan.items)
-        ]
-        state.turns.append(ChatTurn(role="assistant", text="Tickets created successfully with auto-generated summaries!"))
-        put(state)
-        
-        return {
-            "type": "agent_complete",
-            "content": f"✅ Created {len(created)} ticket(s):\n" + "\n".join([f"• {t['title']} ({t['pseudo_id']})" for t in created]),
-            "tickets": created,
-            "plan": state.plan.model_dump()
-        }
+    return await complete_agent_session(state, user_email)
 
 @router.get("/{conversation_id}/messages", response_model=MessageListResponse)
 async def get_conversation_messages(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100)
@@ -136,7 +103,7 @@ async def get_conversation_messages(
 async def create_message(
     conversation_id: int,
     message: MessageCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -145,7 +112,7 @@ async def create_message(
     """
     try:
         # Check if this is a ticket request
-        if is_ticket_request(message.content):
+        if classify_intent(message.content).is_ticket:
             # Handle with agentic ticket creation
             agent_response = await handle_agentic_ticket_creation(message.content, conversation_id, current_user.email)
             
@@ -199,7 +166,7 @@ async def create_message(
 @router.get("/messages/{message_id}", response_model=MessageResponse)
 async def get_message(
     message_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -223,7 +190,7 @@ async def get_message(
 async def update_message(
     message_id: str,
     message_update: MessageUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -248,7 +215,7 @@ async def update_message(
 @router.delete("/messages/{message_id}")
 async def delete_message(
     message_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -272,7 +239,7 @@ async def delete_message(
 async def answer_agent_question(
     conversation_id: int,
     answer_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -310,41 +277,23 @@ async def answer_agent_question(
         state.pending = missing
         
         if missing:
+            start_early_summaries(state.plan, missing)
             # Ask for next field
             next_question = render_question(missing[0], state.plan)
             state.turns.append(ChatTurn(role="assistant", text=next_question["text"]))
+            plan_fields = plan_update(state, answer_data.get("plan_version"))
             put(state)
             
             return {
                 "type": "agent_question",
                 "content": next_question["text"],
                 "question": next_question,
-                "plan_preview": state.plan.model_dump(),
+                **plan_fields,
                 "session_id": session_id
             }
-        else:
-            # Complete - create tickets
-            state.completed = True
-            created = [
-                {
-                    "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
-                    "service_area": it.service_area,
-                    "category": it.category,
-                    "ticket_type": it.ticket_type,
-                    "title": it.title,
-                    "form": it.form
-                }
-                for i, it in enumerate(state.plan.items)
-            ]
-            state.turns.append(ChatTurn(role="assistant", text="Tickets created successfully!"))
-            put(state)
-            
-            return {
-                "type": "agent_complete",
-                "content": f"✅ Created {len(created)} ticket(s):\n" + "\n".join([f"• {t['title']} ({t['pseudo_id']})" for t in created]),
-                "tickets": created,
-                "plan": state.plan.model_dump()
-            }
+        
+        # Complete - summaries, tickets, duplicate index
+        return await complete_agent_session(state, current_user.email, db)
         
     except HTTPException:
         raise
@@ -2,19 +2,20 @@
 Placeholders for the actual implementation of the routes.
 '''
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.utils.response_utils import ApiResponse
+from app.utils.http_cache import cached_response
 
 router = APIRouter()
 
 # PRESETS
 @router.get("/presets")
-async def get_presets():
+async def get_presets(request: Request):
     """Get chat presets - stub implementation"""
-    return ApiResponse.create_success(
+    return cached_response(request, "presets", lambda: ApiResponse.create_success(
         data=[],
         message="Presets retrieved successfully"
-    )
+    ))
 
 # KEYS
 @router.get("/keys")
@@ -65,28 +66,28 @@ async def get_user_roles():
 
 # SEARCH
 @router.get("/search/enable")
-async def get_search_enable():
+async def get_search_enable(request: Request):
     """Get search functionality status - stub implementation"""
-    return ApiResponse.create_success(
+    return cached_response(request, "search_enable", lambda: ApiResponse.create_success(
         data={
             "enabled": False,
             "provider": "none"
         },
         message="Search status retrieved"
-    )
+    ))
 
 # BANNER
 @router.get("/banner")
-async def get_banner():
+async def get_banner(request: Request):
     """Get application banner information"""
-    return ApiResponse.create_success(
+    return cached_response(request, "banner", lambda: ApiResponse.create_success(
         data={
             "enabled": False,
             "message": "",
             "type": "info"
         },
         message="Banner information retrieved"
-    )
+    ))
 
 # SHARE
 @router.get("/share/link/{link_id}")
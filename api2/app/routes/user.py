@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models import get_db
 from app.models.user import User
 from app.routes.auth import get_current_user, generate_verification_token
+from app.utils.auth_utils import AuthUser
 from app.utils.email import send_verification_email
 
 router = APIRouter()
@@ -11,9 +12,12 @@ from app.schemas.user import UserResponse
 from app.utils.response_utils import ApiResponse
 
 @router.get("/user")
-async def get_user(current_user: User = Depends(get_current_user)):
+async def get_user(current_user: AuthUser = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get current user information"""
-    user_response = UserResponse.model_validate(current_user)
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    user_response = UserResponse.model_validate(user)
     
     # Return standardized response format for consistency
     return ApiResponse.create_success(
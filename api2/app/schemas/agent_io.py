@@ -19,6 +19,8 @@ class QuestionOut(BaseModel):
     text: str
     type: str
     options: Optional[list] = None
+    options_total: Optional[int] = None
+    options_search: Optional[str] = None
     item_index: int
     field_name: str
     description: str
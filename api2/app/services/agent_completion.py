@@ -0,0 +1,87 @@
+# app/services/agent_completion.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.ticket_agent import ChatTurn, ConversationState
+from app.services.duplicate_detector import record_completed_request
+from app.services.plan_versions import commit_plan_version, final_plan_reference, persist_final_plan, plan_reference
+from app.services.summary_service import generate_summaries_for_plan, release_early_summaries
+from app.utils.session_store import delete, get, put
+
+# The one place an agent session turns into tickets. Every completion path (chat
+# messages, /agent-answer, /agent-answer/batch, the /agents chat loop) goes through
+# complete_agent_session(), so all of them generate summaries (reusing and releasing
+# the early summary tasks), persist the final plan and index the request for the
+# duplicate check.
+
+def created_tickets(state: ConversationState) -> List[Dict[str, Any]]:
+    return [
+        {
+            "pseudo_id": f"{it.service_area.split()[0][:3].upper()}-{1000+i}",
+            "service_area": it.service_area,
+            "category": it.category,
+            "ticket_type": it.ticket_type,
+            "title": it.title,
+            "form": it.form
+        }
+        for i, it in enumerate(state.plan.items)
+    ]
+
+def completion_content(created: list, session_id: str, plan_version: int, snapshot_id: Optional[str] = None) -> str:
+    """
+    The stored chat message for created tickets. Form values and the plan are not
+    embedded; the message links to the persisted final plan instead (to the in-session
+    plan version only when persisting it failed).
+    """
+    content_lines = [f"✅ Created {len(created)} ticket(s):"]
+    for i, ticket in enumerate(created):
+        content_lines.append(f"\n**Ticket {i+1}: {ticket['title']} ({ticket['pseudo_id']})**")
+        content_lines.append(f"Service Area: {ticket['service_area']}")
+        content_lines.append(f"Category: {ticket['category']}")
+        content_lines.append(f"Type: {ticket['ticket_type']}")
+    link = final_plan_reference(snapshot_id) if snapshot_id else plan_reference(session_id, plan_version)
+    content_lines.append(f"\nPlan: [v{plan_version}]({link})")
+    return "\n".join(content_lines)
+
+async def complete_agent_session(state: ConversationState, user_email: Optional[str] = None, db: Optional[Session] = None) -> dict:
+    """Generate summaries, create the tickets and record the request; returns the agent_complete reply."""
+    print(f"🎉 AGENT: All fields complete, generating summaries...")
+    state.plan = await generate_summaries_for_plan(state.plan)
+
+    state.completed = True
+    state.pending = []
+    created = created_tickets(state)
+    state.turns.append(ChatTurn(role="assistant", text="Tickets created successfully with auto-generated summaries!"))
+    version = commit_plan_version(state)
+    snapshot_id = persist_final_plan(state, db)
+    put(state)
+    record_completed_request(user_email, state.plan.meta.get("request_text", ""), state.plan, created)
+
+    print(f"✅ AGENT: Created {len(created)} tickets")
+    return {
+        "type": "agent_complete",
+        "content": completion_content(created, state.session_id, version, snapshot_id),
+        "tickets": created,
+        "plan": state.plan.model_dump(),
+        "plan_version": version,
+        "session_id": state.session_id,
+    }
+
+def drop_agent_session(session_id: str) -> None:
+    """Forget a session, releasing background summaries its plan still holds."""
+    state = get(session_id)
+    if state is not None:
+        release_early_summaries(state.plan)
+    delete(session_id)
+
+def open_agent_session(session_id: str) -> ConversationState:
+    """The session a new message continues; a completed one is replaced by a fresh session."""
+    state = get(session_id)
+    if state is None or state.completed:
+        print(f"🆕 AGENT: Creating new session: {session_id}")
+        drop_agent_session(session_id)
+        state = ConversationState(session_id=session_id)
+        put(state)
+    else:
+        print(f"📂 AGENT: Using existing session: {session_id}")
+    return state
@@ -0,0 +1,195 @@
+# app/services/catalog_retrieval.py
+from __future__ import annotations
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import httpx
+import numpy as np
+from app.config import settings
+from app.services.catalog_service import (
+    CatalogSnapshot,
+    SpecKey,
+    get_catalog_index,
+    get_catalog_snapshot,
+    register_catalog_index,
+    resolve_field_options,
+)
+from app.utils import metrics
+
+# Retrieval index over ticket types, built once per catalog version.
+# Each ticket type becomes one document (name, description, field names/descriptions and
+# choice options, weighted in that order); the planner prompt then only carries the top-k
+# ticket types for a request instead of whole service areas.
+# Provider embeddings are optional: calls are bounded by CATALOG_EMBEDDING_TIMEOUT, any
+# failure leaves the local TF-IDF index in charge, and after a failed query embedding the
+# provider is skipped for PROVIDER_RETRY_SECONDS so a dead provider doesn't slow every request.
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in", "is", "it", "me",
+    "my", "need", "of", "on", "or", "please", "the", "this", "to", "use", "want", "we", "with", "you", "your",
+}
+# Section weights inside a ticket-type document
+TITLE_WEIGHT, DESCRIPTION_WEIGHT, FIELD_WEIGHT, OPTION_WEIGHT = 3.0, 2.0, 1.0, 0.5
+PROVIDER_RETRY_SECONDS = 30.0
+
+def _terms(text: str) -> List[str]:
+    words = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+             for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+class HashingEmbedder:
+    """
+    Local TF-IDF embedding: unigrams and bigrams hashed into a fixed number of buckets,
+    sublinear term frequency, IDF fitted on the catalog documents. No model, no network.
+    """
+    name = "hashing"
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _bucket(self, term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) % self.dim
+
+    def _counts(self, sections: Sequence[Tuple[str, float]]) -> np.ndarray:
+        row = np.zeros(self.dim, dtype=np.float32)
+        for text, weight in sections:
+            for term in _terms(text):
+                row[self._bucket(term)] += weight
+        return np.log1p(row)
+
+    def fit(self, documents: List[Sequence[Tuple[str, float]]]) -> np.ndarray:
+        counts = np.vstack([self._counts(doc) for doc in documents]) if documents else np.zeros((0, self.dim), np.float32)
+        doc_freq = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(documents)) / (1 + doc_freq)) + 1).astype(np.float32)
+        return _normalize_rows(counts * self.idf)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return _normalize_rows((self._counts([(text, 1.0)]) * self.idf)[None, :])[0]
+
+class ProviderEmbedder:
+    """Embeddings from the configured LLM provider (Ollama /api/embed or OpenAI /embeddings)."""
+    name = "provider"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        timeout = settings.catalog_embedding_timeout
+        if settings.llm_provider == "openai":
+            response = httpx.post(
+                f"{settings.openai_base_url}/embeddings",
+                json={"model": self.model, "input": texts},
+                headers={"Authorization": f"Bearer {settings.openai_api_key}"},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            vectors = [item["embedding"] for item in response.json()["data"]]
+        else:
+            response = httpx.post(
+                f"{settings.ollama_base_url}/api/embed",
+                json={"model": self.model, "input": texts},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            vectors = response.json()["embeddings"]
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise ValueError(f"expected {len(texts)} embeddings, got shape {matrix.shape}")
+        return _normalize_rows(matrix)
+
+def _document(area: str, category: str, spec: dict) -> List[Tuple[str, float]]:
+    sections = [(spec["ticket_type"], TITLE_WEIGHT), (f"{category} {area}", FIELD_WEIGHT)]
+    if spec.get("description"):
+        sections.append((spec["description"], DESCRIPTION_WEIGHT))
+    for raw in spec.get("fields", []):
+        sections.append((f"{raw.get('name', '').replace('_', ' ')} {raw.get('description', '')}", FIELD_WEIGHT))
+        if raw.get("type") in ("choice", "multi_choice"):
+            sections.append((" ".join(resolve_field_options(raw)), OPTION_WEIGHT))
+    return sections
+
+class CatalogRetrievalIndex:
+    """Ticket-type vectors for one catalog version; search is one matrix-vector product."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.keys: List[SpecKey] = list(snapshot.specs)
+        documents = [_document(area, category, snapshot.specs[(area, category, t)]) for area, category, t in self.keys]
+        self.hashing = HashingEmbedder()
+        self.matrix = self.hashing.fit(documents)
+
+        self.provider: Optional[ProviderEmbedder] = None
+        self.provider_matrix: Optional[np.ndarray] = None
+        self.provider_down_until = 0.0
+        if settings.catalog_embedding_model and self.keys:
+            provider = ProviderEmbedder(settings.catalog_embedding_model)
+            try:
+                texts = [" ".join(text for text, _ in doc if text) for doc in documents]
+                self.provider_matrix = provider.embed(texts)
+                self.provider = provider
+            except Exception as e:       # a bad provider must never fail the catalog load
+                metrics.incr("catalog_retrieval.provider_unavailable")
+                print(f"⚠️ CATALOG_RETRIEVAL: Provider embeddings unavailable ({e}), using local TF-IDF")
+
+    @property
+    def embedder(self) -> str:
+        return self.provider.name if self.provider else self.hashing.name
+
+    def embed_query(self, query: str) -> Tuple[str, np.ndarray]:
+        """(space, query vector); the space says which document matrix it compares against."""
+        if self.provider is not None and time.monotonic() >= self.provider_down_until:
+            try:
+                vector = self.provider.embed([query])[0]
+                if vector.shape != self.provider_matrix.shape[1:]:
+                    raise ValueError(f"query embedding has shape {vector.shape}, index has {self.provider_matrix.shape[1:]}")
+                return self.provider.name, vector
+            except Exception as e:
+                self.provider_down_until = time.monotonic() + PROVIDER_RETRY_SECONDS
+                metrics.incr("catalog_retrieval.provider_fallback")
+                print(f"⚠️ CATALOG_RETRIEVAL: Query embedding failed ({e}), using local TF-IDF for {PROVIDER_RETRY_SECONDS:.0f}s")
+        return self.hashing.name, self.hashing.embed_query(query)
+
+    def matrix_for(self, space: str) -> np.ndarray:
+        return self.provider_matrix if space == ProviderEmbedder.name else self.matrix
+
+    def _scores(self, query: str) -> np.ndarray:
+        space, vector = self.embed_query(query)
+        return self.matrix_for(space) @ vector
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[SpecKey, float]]:
+        """Top-k ticket types by cosine similarity, best first."""
+        if not self.keys or k <= 0:
+            return []
+        scores = self._scores(query)
+        k = min(k, len(self.keys))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+def _build_retrieval_index(snapshot: CatalogSnapshot) -> CatalogRetrievalIndex:
+    index = CatalogRetrievalIndex(snapshot)
+    print(f"🧭 CATALOG_RETRIEVAL: Indexed {len(index.keys)} ticket types ({index.embedder})")
+    return index
+
+register_catalog_index("catalog_retrieval", _build_retrieval_index)
+
+def retrieve_ticket_types(user_text: str, k: Optional[int] = None, version: Optional[str] = None) -> List[Tuple[SpecKey, float]]:
+    index: CatalogRetrievalIndex = get_catalog_index("catalog_retrieval", version)
+    return index.search(user_text, k or settings.catalog_retrieval_top_k)
+
+def ranked_catalog_slice(user_text: str, k: Optional[int] = None, version: Optional[str] = None) -> Dict[str, Dict[str, list]]:
+    """
+    The top-k ticket types for a request in the planner's catalog shape
+    ({service_area: {category: [spec, ...]}}), areas/categories/specs in rank order.
+    """
+    specs = get_catalog_snapshot(version).specs
+    sliced: Dict[str, Dict[str, list]] = {}
+    for key, _ in retrieve_ticket_types(user_text, k, version):
+        area, category, _ = key
+        sliced.setdefault(area, {}).setdefault(category, []).append(specs[key])
+    return sliced
@@ -0,0 +1,187 @@
+# app/services/catalog_router.py
+from __future__ import annotations
+import asyncio
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.services.catalog_retrieval import CatalogRetrievalIndex
+from app.services.catalog_service import (
+    CatalogSnapshot,
+    SpecKey,
+    get_catalog_index,
+    get_catalog_snapshot,
+    register_catalog_index,
+)
+from app.utils import metrics
+
+# Staged routing for the planner: department -> category -> ticket type.
+# Departments and categories are scored against centroids of their ticket-type vectors,
+# so each stage only compares the request with its own slice and the work per request
+# grows with the number of departments plus the chosen branches, not with the catalog.
+# A request too vague to route (no department scores CATALOG_ROUTER_MIN_SCORE) gets the
+# whole catalog instead of whichever branches happen to come first.
+
+@dataclass
+class RouteResult:
+    departments: List[Tuple[str, float]]
+    categories: List[Tuple[Tuple[str, str], float]]
+    ticket_types: List[Tuple[SpecKey, float]]
+    confident_stages: List[str] = field(default_factory=list)  # stages that kept a single branch
+    scored: int = 0                                             # ticket types compared in the last stage
+    full_catalog: bool = False                                  # too vague to route: every ticket type is kept
+
+    def catalog_slice(self, version: Optional[str] = None) -> Dict[str, Dict[str, list]]:
+        """The chosen ticket types in the planner's { area: { category: [specs] } } shape, best first."""
+        specs = get_catalog_snapshot(version).specs
+        sliced: Dict[str, Dict[str, list]] = {}
+        for key, _ in self.ticket_types:
+            area, category, _ = key
+            sliced.setdefault(area, {}).setdefault(category, []).append(specs[key])
+        return sliced
+
+def _centroids(matrix: np.ndarray, groups: List[np.ndarray]) -> np.ndarray:
+    if not groups:
+        return np.zeros((0, matrix.shape[1]), dtype=np.float32)
+    centroids = np.vstack([matrix[rows].mean(axis=0) for rows in groups])
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    return centroids / np.where(norms == 0, 1.0, norms)
+
+def _narrow(scores: np.ndarray) -> np.ndarray:
+    """
+    Branches worth keeping, best first. A stage is confident when the runner-up scores
+    below CATALOG_ROUTER_CONFIDENT_RATIO of the best; otherwise close runners-up are kept too.
+    """
+    order = np.argsort(-scores, kind="stable")
+    if len(order) <= 1 or scores[order[0]] <= 0:
+        return order[:max(1, settings.catalog_router_max_branches)]
+    cutoff = scores[order[0]] * settings.catalog_router_confident_ratio
+    kept = [i for i in order[:max(1, settings.catalog_router_max_branches)] if scores[i] >= cutoff]
+    return np.asarray(kept)
+
+class CatalogRouter:
+    """Department and category centroids over the retrieval index of one catalog version."""
+
+    def __init__(self, snapshot: CatalogSnapshot, retrieval: CatalogRetrievalIndex):
+        self.retrieval = retrieval
+        self.departments: List[str] = []
+        self.categories: List[Tuple[str, str]] = []
+        self._department_categories: List[np.ndarray] = []
+        self._category_rows: List[np.ndarray] = []
+
+        rows_by_category: Dict[Tuple[str, str], List[int]] = {}
+        for row, (area, category, _) in enumerate(retrieval.keys):
+            rows_by_category.setdefault((area, category), []).append(row)
+        for area in dict.fromkeys(area for area, _ in rows_by_category):
+            members = [i for i, key in enumerate(rows_by_category) if key[0] == area]
+            self.departments.append(area)
+            self._department_categories.append(np.asarray(members))
+        self.categories = list(rows_by_category)
+        self._category_rows = [np.asarray(rows) for rows in rows_by_category.values()]
+        self._department_rows = [np.concatenate([self._category_rows[c] for c in cats]) for cats in self._department_categories]
+
+        # Centroids per embedding space, so provider and local vectors are never mixed
+        self._centroids: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        spaces = [retrieval.hashing.name] + ([retrieval.provider.name] if retrieval.provider else [])
+        for space in spaces:
+            matrix = retrieval.matrix_for(space)
+            self._centroids[space] = (_centroids(matrix, self._department_rows), _centroids(matrix, self._category_rows))
+
+        self._cache: "OrderedDict[Tuple[str, int], RouteResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _full_catalog(self, space: str, vector: np.ndarray, department_scores: np.ndarray) -> RouteResult:
+        """Every ticket type, best first, for requests no department matches."""
+        _, category_centroids = self._centroids[space]
+        category_scores = category_centroids @ vector
+        type_scores = self.retrieval.matrix_for(space) @ vector
+        return RouteResult(
+            departments=[(self.departments[d], float(department_scores[d])) for d in np.argsort(-department_scores, kind="stable")],
+            categories=[(self.categories[c], float(category_scores[c])) for c in np.argsort(-category_scores, kind="stable")],
+            ticket_types=[(self.retrieval.keys[i], float(type_scores[i])) for i in np.argsort(-type_scores, kind="stable")],
+            scored=len(type_scores),
+            full_catalog=True,
+        )
+
+    def _route(self, space: str, vector: np.ndarray, k: int) -> RouteResult:
+        department_centroids, category_centroids = self._centroids[space]
+        confident: List[str] = []
+
+        # Stage 1: departments
+        department_scores = department_centroids @ vector
+        if department_scores.max() < settings.catalog_router_min_score:
+            return self._full_catalog(space, vector, department_scores)
+        kept_departments = _narrow(department_scores)
+        if len(kept_departments) == 1:
+            confident.append("department")
+
+        # Stage 2: categories of the kept departments only
+        candidates = np.concatenate([self._department_categories[d] for d in kept_departments])
+        category_scores = category_centroids[candidates] @ vector
+        kept_categories = candidates[_narrow(category_scores)]
+        if len(kept_categories) == 1:
+            confident.append("category")
+
+        # Stage 3: ticket types of the kept categories only
+        rows = np.concatenate([self._category_rows[c] for c in kept_categories])
+        type_scores = self.retrieval.matrix_for(space)[rows] @ vector
+        top = np.argsort(-type_scores, kind="stable")[:k]
+
+        category_score_by_id = dict(zip(candidates.tolist(), category_scores.tolist()))
+        return RouteResult(
+            departments=[(self.departments[d], float(department_scores[d])) for d in kept_departments],
+            categories=[(self.categories[c], float(category_score_by_id[c])) for c in kept_categories],
+            ticket_types=[(self.retrieval.keys[rows[i]], float(type_scores[i])) for i in top],
+            confident_stages=confident,
+            scored=len(rows),
+        )
+
+    def route(self, user_text: str, k: Optional[int] = None) -> RouteResult:
+        k = k or settings.catalog_retrieval_top_k
+        cache_key = (re.sub(r"\s+", " ", user_text.strip().lower()), k)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                metrics.incr("planner_route.cache_hit")
+                return cached
+        if not self.retrieval.keys:
+            return RouteResult([], [], [])
+
+        space, vector = self.retrieval.embed_query(user_text)
+        result = self._route(space, vector, k)
+        metrics.incr("planner_route.routed")
+        if result.full_catalog:
+            metrics.incr("planner_route.full_catalog")
+        for stage in result.confident_stages:
+            metrics.incr(f"planner_route.confident_{stage}")
+        if space != self.retrieval.embedder:
+            return result                 # local fallback while the provider is down: not cached
+        with self._lock:
+            self._cache[cache_key] = result
+            while len(self._cache) > settings.catalog_router_cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+def _build_router(snapshot: CatalogSnapshot) -> CatalogRouter:
+    retrieval = snapshot.indexes.get("catalog_retrieval") or CatalogRetrievalIndex(snapshot)
+    return CatalogRouter(snapshot, retrieval)
+
+register_catalog_index("catalog_router", _build_router)
+
+def route_catalog(user_text: str, version: Optional[str] = None, k: Optional[int] = None) -> RouteResult:
+    router: CatalogRouter = get_catalog_index("catalog_router", version)
+    result = router.route(user_text, k)
+    print(f"🧭 CATALOG_ROUTER: {[d for d, _ in result.departments]} -> "
+          f"{[c for _, c in (key for key, _ in result.categories)]} -> {len(result.ticket_types)} ticket types "
+          f"(confident: {result.confident_stages or 'none'}{', full catalog' if result.full_catalog else ''})")
+    return result
+
+async def route_catalog_async(user_text: str, version: Optional[str] = None, k: Optional[int] = None) -> RouteResult:
+    """Provider embeddings are a blocking HTTP call, so route off the event loop when they are on."""
+    if settings.catalog_embedding_model:
+        return await asyncio.to_thread(route_catalog, user_text, version, k)
+    return route_catalog(user_text, version, k)
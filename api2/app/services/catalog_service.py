@@ -1,17 +1,264 @@
 # app/services/catalog_service.py
 from __future__ import annotations
-from typing import Dict, List, Optional
-from pydantic import BaseModel
+import asyncio
+import hashlib
+import importlib
+import json
+import logging
+import os
+import string
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import ValidationError
 from app.catalog import CATALOG
+from app.config import settings
+from app.models.ticket_agent import FieldDef
 
-def get_service_area_categories() -> Dict[str, Dict[str, list]]:
+logger = logging.getLogger(__name__)
+
+# (service_area, category, ticket_type) uniquely identifies a ticket spec
+SpecKey = Tuple[str, str, str]
+
+BUILTIN_SOURCE = "builtin:app.catalog"
+
+@dataclass
+class CatalogSnapshot:
+    """
+    One immutable version of the catalog plus everything derived from it.
+    A reload builds a brand new snapshot and swaps it in with a single assignment,
+    so readers never see a half-built catalog.
+    """
+    data: dict
+    version: str
+    source: str
+    loaded_at: float
+    mtime: Optional[float] = None
+    specs: Dict[SpecKey, dict] = field(default_factory=dict)
+    indexes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    @property
+    def departments(self) -> List[str]:
+        return list(self.data.get("department", []))
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "etag": self.etag,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "ticket_types": len(self.specs),
+        }
+
+# Derived-index builders run whenever a snapshot is built (at startup or on reload),
+# never on the request path. Reload listeners run after the new snapshot is live.
+_INDEX_BUILDERS: Dict[str, Callable[[CatalogSnapshot], Any]] = {}
+_RELOAD_LISTENERS: List[Callable[[CatalogSnapshot], None]] = []
+
+# Modules that register catalog indexes. They import this module, so they are loaded by
+# load_catalog_indexes() (at startup and before a reload) rather than at import time.
+_INDEX_MODULES = (
+    "option_providers", "option_index", "choice_matcher", "entity_extractor",
+    "catalog_retrieval", "catalog_router", "intent_router",
+)
+_indexes_loaded = False
+
+_reload_lock = threading.Lock()
+_history: "OrderedDict[str, CatalogSnapshot]" = OrderedDict()
+_current: Optional[CatalogSnapshot] = None
+
+def _compute_version(data: dict) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def _read_catalog_file(path: str) -> dict:
+    """Read a catalog from a JSON or YAML file with the same shape as app.catalog.CATALOG."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required to load a YAML catalog; install pyyaml or use JSON")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def _check_summary_template(spec: dict) -> None:
+    """summary_template is a str.format template (or a list of them) over the spec's own fields."""
+    templates = spec.get("summary_template")
+    if templates is None:
+        return
+    if isinstance(templates, str):
+        templates = [templates]
+    if not isinstance(templates, list) or not all(isinstance(t, str) for t in templates):
+        raise ValueError(f"'summary_template' of '{spec['ticket_type']}' must be a string or a list of strings")
+    names = {raw.get("name") for raw in spec.get("fields", [])}
+    for template in templates:
+        try:
+            used = {name for _, name, _, _ in string.Formatter().parse(template) if name is not None}
+        except ValueError as e:
+            raise ValueError(f"Invalid summary_template of '{spec['ticket_type']}': {e}")
+        unknown = used - names
+        if unknown:
+            raise ValueError(f"summary_template of '{spec['ticket_type']}' uses unknown fields: {sorted(unknown)}")
+
+def _index_specs(data: dict) -> Dict[SpecKey, dict]:
+    """Validate the catalog structure and index every spec by (area, category, ticket_type)."""
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), dict):
+        raise ValueError("Catalog must be an object with a 'categories' mapping")
+
+    specs: Dict[SpecKey, dict] = {}
+    for area, categories in data["categories"].items():
+        if not isinstance(categories, dict):
+            raise ValueError(f"Service area '{area}' must map category names to ticket lists")
+        for category, ticket_specs in categories.items():
+            for spec in ticket_specs:
+                ticket_type = spec.get("ticket_type")
+                if not ticket_type:
+                    raise ValueError(f"Ticket spec in '{area}/{category}' is missing 'ticket_type'")
+                try:
+                    for raw in spec.get("fields", []):
+                        FieldDef(**raw)
+                except ValidationError as e:
+                    raise ValueError(f"Invalid field in '{ticket_type}': {e}")
+                _check_summary_template(spec)
+                specs[(area, category, ticket_type)] = spec
+    return specs
+
+def _build_snapshot(data: dict, source: str, mtime: Optional[float] = None) -> CatalogSnapshot:
+    snapshot = CatalogSnapshot(
+        data=data,
+        version=_compute_version(data),
+        source=source,
+        loaded_at=time.time(),
+        mtime=mtime,
+        specs=_index_specs(data),
+    )
+    for name, builder in list(_INDEX_BUILDERS.items()):
+        snapshot.indexes[name] = builder(snapshot)
+    return snapshot
+
+def _load_from_source() -> CatalogSnapshot:
+    path = settings.catalog_path
+    if path:
+        mtime = os.path.getmtime(path)
+        return _build_snapshot(_read_catalog_file(path), path, mtime)
+    return _build_snapshot(CATALOG, BUILTIN_SOURCE)
+
+def _activate(snapshot: CatalogSnapshot) -> None:
+    global _current
+    _history[snapshot.version] = snapshot
+    _history.move_to_end(snapshot.version)
+    while len(_history) > max(1, settings.catalog_history_size):
+        _history.popitem(last=False)
+    _current = snapshot
+
+def get_catalog_snapshot(version: Optional[str] = None) -> CatalogSnapshot:
+    """
+    Returns the live catalog snapshot, or a retained older one when `version` is given.
+    Sessions pin the version they started with; if it has aged out of the history we
+    fall back to the live catalog.
+    """
+    if version and version in _history:
+        return _history[version]
+    if version and version != _current.version:
+        print(f"⚠️ CATALOG: Version {version} no longer retained, using {_current.version}")
+    return _current
+
+def get_catalog_version() -> str:
+    return _current.version
+
+def reload_catalog(force: bool = False) -> Tuple[CatalogSnapshot, bool]:
+    """
+    Re-read the catalog source and atomically swap it in if it changed.
+    Returns (live snapshot, changed). A file that fails to parse or validate raises
+    ValueError and leaves the current catalog in place.
+    """
+    load_catalog_indexes()          # so the new snapshot gets every index built
+    with _reload_lock:
+        current = _current
+        path = settings.catalog_path
+        try:
+            if path and not force and current.source == path and current.mtime == os.path.getmtime(path):
+                return current, False
+            snapshot = _load_from_source()
+        except (OSError, ValueError) as e:
+            logger.error(f"Catalog reload failed, keeping version {current.version}: {e}")
+            raise ValueError(f"Catalog reload failed: {e}")
+
+        if snapshot.version == current.version and snapshot.source == current.source:
+            current.mtime = snapshot.mtime
+            return current, False
+
+        _activate(snapshot)
+        print(f"📚 CATALOG: Activated version {snapshot.version} from {snapshot.source} ({len(snapshot.specs)} ticket types)")
+
+    for listener in list(_RELOAD_LISTENERS):
+        try:
+            listener(snapshot)
+        except Exception as e:
+            logger.error(f"Catalog reload listener failed: {e}")
+    return snapshot, True
+
+def check_for_catalog_changes() -> bool:
+    """Reload when the catalog file's mtime moved. Safe to call from a worker thread."""
+    if not settings.catalog_path:
+        return False
+    try:
+        _, changed = reload_catalog()
+        return changed
+    except (OSError, ValueError):
+        return False
+
+async def watch_catalog_file(interval: float) -> None:
+    """Background task: poll the catalog file and reload it off the event loop."""
+    print(f"👀 CATALOG: Watching {settings.catalog_path} every {interval}s")
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(check_for_catalog_changes)
+
+def register_catalog_index(name: str, builder: Callable[[CatalogSnapshot], Any]) -> None:
+    """
+    Register a derived index that is rebuilt with every catalog version.
+    The index for the live snapshot is built immediately so callers never build it lazily.
+    """
+    _INDEX_BUILDERS[name] = builder
+    if _current is not None and name not in _current.indexes:
+        _current.indexes[name] = builder(_current)
+
+def load_catalog_indexes() -> None:
+    """Import the index modules, which registers and builds their indexes for the live catalog."""
+    global _indexes_loaded
+    if _indexes_loaded:
+        return
+    for module in _INDEX_MODULES:
+        importlib.import_module(f"app.services.{module}")
+    _indexes_loaded = True
+
+def get_catalog_index(name: str, version: Optional[str] = None) -> Any:
+    snapshot = get_catalog_snapshot(version)
+    if name not in snapshot.indexes and name in _INDEX_BUILDERS:
+        snapshot.indexes[name] = _INDEX_BUILDERS[name](snapshot)
+    return snapshot.indexes.get(name)
+
+def on_catalog_reload(listener: Callable[[CatalogSnapshot], None]) -> None:
+    """Call `listener(snapshot)` after each successful reload (e.g. to drop caches)."""
+    _RELOAD_LISTENERS.append(listener)
+
+def get_service_area_categories(version: Optional[str] = None) -> Dict[str, Dict[str, list]]:
     """
     Returns the 'categories' dict from your catalog so we can navigate:
     { "SRE/Production Support": { "IT Service Requests": [...], ... }, ... }
     """
-    return CATALOG["categories"]
+    return get_catalog_snapshot(version).data["categories"]
 
-def find_ticket_spec(service_area: str, category: str, ticket_type: str) -> Optional[dict]:
+def find_ticket_spec(service_area: str, category: str, ticket_type: str, version: Optional[str] = None) -> Optional[dict]:
     """
     Returns the raw spec dict for a ticket type:
     {
@@ -19,58 +266,46 @@ def find_ticket_spec(service_area: str, category: str, ticket_type: str) -> Opti
       "description": "...",
       "fields": [ {name,type,options/options_source, ... }, ... ]
     }
+    Pass `version` to resolve against the catalog version a session started with.
     """
-    cats = get_service_area_categories()
-    if service_area not in cats:
-        return None
-    if category not in cats[service_area]:
-        return None
-    for spec in cats[service_area][category]:
-        if spec["ticket_type"] == ticket_type:
-            return spec
-    return None
+    return get_catalog_snapshot(version).specs.get((service_area, category, ticket_type))
 
 def resolve_field_options(field_dict: dict) -> List[str]:
     """
     Given a field definition, return its choice list.
+    - If "options_source" is set, resolve it through the cached option providers
+      (never blocks on a refresh); inline "options" serve as the fallback until it loads.
     - Returns the "options" list if present.
     - If no options, return [].
     """
-    if "options" in field_dict and isinstance(field_dict["options"], list):
-        return field_dict["options"]
-    return []
-
-def slice_catalog_for_prompt(user_text: str) -> dict:
-    """
-    Return a smaller chunk of the catalog based on naive keywords in the
-    user's message so the LLM has fewer irrelevant choices.
-    You can replace this with a smarter first-pass LLM classifier later.
-    """
-    cats = get_service_area_categories()
-    focus_area = "SRE/Production Support"   # start here since that's where your examples are
-    area_block = cats.get(focus_area, {})
-    likely = {}
-
-    keywords = {
-        "datadog": "IT Service Requests",
-        "sftp": "IT Service Requests",
-        "yaml": "IT Service Requests",
-        "jams": "IT Service Requests",
-        "incident": "Report an Incident",
-        "loan": "Financial Service Request",
-        "investor": "Financial Service Request",
-        "rerun": "Financial Service Request",
-    }
+    inline = field_dict.get("options") if isinstance(field_dict.get("options"), list) else None
+    source = field_dict.get("options_source")
+    if source:
+        from app.services.option_providers import resolve_options_source
+        resolved = resolve_options_source(source, fallback=inline)
+        if resolved:
+            return resolved
+    return inline or []
 
-    chosen = {cat for kw, cat in keywords.items() if kw in user_text.lower()}
-    if not chosen:
-        # no hints—include all categories for this service area
-        chosen = set(area_block.keys())
+def slice_catalog_for_prompt(user_text: str, version: Optional[str] = None) -> dict:
+    """
+    Return the part of the catalog the planner needs for this message, in the usual
+    { service_area: { category: [specs] } } shape, best match first.
+    Routing is staged (department -> category -> ticket type, see
+    app/services/catalog_router.py) so only the top CATALOG_RETRIEVAL_TOP_K ticket
+    types of the most likely branches are sent, however large the catalog gets.
+    """
+    from app.services.catalog_router import route_catalog
+    return route_catalog(user_text, version).catalog_slice(version)
 
-    for cat in chosen:
-        if cat in area_block:
-            # copy the list of ticket specs for this category
-            likely[cat] = area_block[cat]
+async def slice_catalog_for_prompt_async(user_text: str, version: Optional[str] = None) -> dict:
+    from app.services.catalog_router import route_catalog_async
+    return (await route_catalog_async(user_text, version)).catalog_slice(version)
 
-    # Output shape the planner prompt expects
-    return {focus_area: likely}
+# Load the initial catalog at import time. A broken catalog file should not take the
+# API down, so fall back to the built-in catalog and log loudly.
+try:
+    _activate(_load_from_source())
+except (OSError, ValueError) as e:
+    logger.error(f"Could not load catalog from {settings.catalog_path}: {e}; using built-in catalog")
+    _activate(_build_snapshot(CATALOG, BUILTIN_SOURCE))
@@ -0,0 +1,192 @@
+# app/services/choice_matcher.py
+from __future__ import annotations
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from app.config import settings
+from app.services.catalog_service import CatalogSnapshot, register_catalog_index, resolve_field_options
+from app.services.option_index import OptionSetCache
+from app.utils import metrics
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Shorthand people type for options; each key expands to the words it stands for.
+# Acronyms of multi-word options ("Morgan Stanley Standard" -> "mss", "ms") are derived automatically.
+ABBREVIATIONS: Dict[str, List[str]] = {
+    "ms": ["morgan", "stanley"],
+    "gs": ["goldman"],
+    "cs": ["credit", "suisse"],
+    "dk": ["davidson", "kempner"],
+    "dp": ["duff", "phelps"],
+    "stoneridge": ["stone", "ridge"],
+    "prod": ["prd"],
+    "production": ["prd"],
+    "sandbox": ["sbx"],
+    "staging": ["uat"],
+    "k8s": ["kubernetes"],
+    "kube": ["kubernetes"],
+    "dd": ["datadog"],
+    "cloudwatch": ["cloud", "watch"],
+    "cw": ["cloud", "watch"],
+    "sshkey": ["ssh", "key"],
+    "pw": ["password"],
+    "crit": ["critical"],
+    "med": ["medium"],
+    "hi": ["high"],
+    "lo": ["low"],
+}
+
+def register_abbreviation(abbreviation: str, expansion: str) -> None:
+    """Teach the matcher a new shorthand, e.g. register_abbreviation("bofa", "bank of america")."""
+    ABBREVIATIONS[abbreviation.lower()] = _tokens(expansion)
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower().replace("&", " and "))
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+@dataclass
+class MatchResult:
+    option: Optional[str]
+    score: float
+    source: str                    # "exact" | "local" | "ambiguous" | "none"
+    candidates: List[str]          # best options first; what the LLM gets when ambiguous
+
+class _OptionEntry:
+    __slots__ = ("option", "normalized", "tokens", "token_grams", "squashed_grams", "acronyms")
+
+    def __init__(self, option: str):
+        tokens = _tokens(option)
+        self.option = option
+        self.normalized = " ".join(tokens)
+        self.tokens = tokens
+        self.token_grams = [_trigrams(t) for t in tokens]
+        self.squashed_grams = _trigrams("".join(tokens))
+        words = [t for t in tokens if not t.isdigit()]
+        self.acronyms = {"".join(w[0] for w in words)} if len(words) > 1 else set()
+        if len(words) > 2:
+            self.acronyms.add(words[0][0] + words[1][0])
+
+class ChoiceMatcher:
+    """
+    Scores free-text answers against one option set without calling the LLM.
+    The score blends token-set similarity (each answer word against its best option word,
+    prefixes and typo-tolerant trigram matches included) with a character-trigram comparison
+    of the whole strings, after expanding known abbreviations. Scores are in [0, 1].
+    """
+    def __init__(self, options: List[str]):
+        self.options = list(options)
+        self._entries = [_OptionEntry(o) for o in self.options]
+        self._by_normalized = {e.normalized: e.option for e in self._entries}
+        self._by_acronym: Dict[str, List[str]] = {}
+        for e in self._entries:
+            for acronym in e.acronyms:
+                self._by_acronym.setdefault(acronym, []).append(e.option)
+
+    @staticmethod
+    def _word_similarity(word: str, word_grams: Set[str], entry: _OptionEntry) -> float:
+        best = 0.0
+        for token, grams in zip(entry.tokens, entry.token_grams):
+            if word == token:
+                return 1.0
+            if len(word) >= 3 and token.startswith(word):
+                best = max(best, 0.9)
+            elif len(word) >= 4 and not word.isdigit():
+                best = max(best, _dice(word_grams, grams))
+        return best
+
+    def _score_tokens(self, words: List[str], entry: _OptionEntry) -> float:
+        if not words or not entry.tokens:
+            return 0.0
+        word_grams = [_trigrams(w) for w in words]
+        sims = [self._word_similarity(w, g, entry) for w, g in zip(words, word_grams)]
+        answer_coverage = sum(sims) / len(sims)
+        # Share of the option's words that the answer mentions
+        covered = sum(1 for t in entry.tokens if any(t == w or (len(w) >= 3 and t.startswith(w)) for w in words))
+        option_coverage = covered / len(entry.tokens)
+        return 0.7 * answer_coverage + 0.3 * option_coverage
+
+    @staticmethod
+    def _variants(text: str) -> List[List[str]]:
+        words = _tokens(text)
+        expanded: List[str] = []
+        for w in words:
+            expanded.extend(ABBREVIATIONS.get(w, [w]))
+        return [words, expanded] if expanded != words else [words]
+
+    def _score(self, variants: List[List[str]], entry: _OptionEntry) -> float:
+        best = 0.0
+        for words in variants:
+            best = max(best, self._score_tokens(words, entry))
+            squashed = "".join(words)
+            if len(squashed) >= 4:
+                grams = _trigrams(squashed)
+                best = max(best, 0.9 * _dice(grams, entry.squashed_grams))
+        return min(best, 1.0)
+
+    def match(self, text: str, limit: int = 5) -> MatchResult:
+        normalized = " ".join(_tokens(text))
+        if not normalized:
+            return MatchResult(None, 0.0, "none", [])
+        if normalized in self._by_normalized:
+            return MatchResult(self._by_normalized[normalized], 1.0, "exact", [self._by_normalized[normalized]])
+
+        acronym_hits = self._by_acronym.get(normalized.replace(" ", ""), [])
+        if len(acronym_hits) == 1 and normalized not in ABBREVIATIONS:
+            return MatchResult(acronym_hits[0], 0.95, "local", acronym_hits)
+
+        variants = self._variants(text)
+        scored = sorted(
+            ((self._score(variants, e), i) for i, e in enumerate(self._entries)),
+            key=lambda si: (-si[0], si[1]),
+        )
+        candidates = [self.options[i] for s, i in scored[:limit] if s >= settings.choice_match_min_score]
+        if not candidates:
+            return MatchResult(None, scored[0][0] if scored else 0.0, "none", [])
+
+        best_score = scored[0][0]
+        runner_up = scored[1][0] if len(scored) > 1 else 0.0
+        margin = best_score - runner_up
+        if best_score >= settings.choice_match_accept_score and margin >= 0.05:
+            return MatchResult(candidates[0], best_score, "local", candidates)
+        if best_score >= 0.6 and margin >= settings.choice_match_min_margin:
+            # Not a great score, but nothing else comes close
+            return MatchResult(candidates[0], best_score, "local", candidates)
+        return MatchResult(None, best_score, "ambiguous", candidates)
+
+_matchers = OptionSetCache(ChoiceMatcher)
+
+def get_choice_matcher(options: List[str]) -> ChoiceMatcher:
+    """Matchers are cached by option-set content so each set is prepared once."""
+    return _matchers.get(options)
+
+def match_choice(user_input: str, options: List[str]) -> MatchResult:
+    """Match an answer against options locally and record which path resolved it."""
+    started = time.perf_counter()
+    result = get_choice_matcher(options).match(user_input)
+    metrics.observe("choice_match.local_ms", (time.perf_counter() - started) * 1000)
+    metrics.incr(f"choice_match.{result.source}")
+    print(f"🎯 CHOICE_MATCHER: '{user_input}' -> {result.option!r} ({result.source}, score={result.score:.2f})")
+    return result
+
+def _warm_choice_matchers(snapshot: CatalogSnapshot) -> int:
+    """Prepare a matcher for every choice field when a catalog version loads."""
+    count = 0
+    for spec in snapshot.specs.values():
+        for raw in spec.get("fields", []):
+            if raw.get("type") in ("choice", "multi_choice"):
+                options = resolve_field_options(raw)
+                if options:
+                    get_choice_matcher(options)
+                    count += 1
+    return count
+
+register_catalog_index("choice_matchers", _warm_choice_matchers)
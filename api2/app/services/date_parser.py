@@ -0,0 +1,233 @@
+# app/services/date_parser.py
+from __future__ import annotations
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from app.config import settings
+
+# Deterministic date/time grammar for field answers and prefill.
+# Every rule is a precompiled regex plus a handler that turns the match into a date
+# relative to a reference day, so "next friday", "july 18", "in 3 business days" or
+# "from july 18 to tomorrow" never need an LLM round trip.
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sunday": 6,
+}
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+    "thirty": 30, "couple": 2, "few": 3,
+}
+
+_WEEKDAY = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_NUMBER = r"\d+|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+_UNIT = r"day|week|month|year"
+
+def reference_today(tz: Optional[str] = None) -> date:
+    """Today's date in `tz`, else DEFAULT_TIMEZONE, else the server's local time."""
+    tz = tz or settings.default_timezone
+    if tz:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo(tz)).date()
+    return datetime.now().date()
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def add_business_days(day: date, count: int) -> date:
+    step = 1 if count >= 0 else -1
+    remaining = abs(count)
+    while remaining:
+        day += timedelta(days=step)
+        if day.weekday() < 5:
+            remaining -= 1
+    return day
+
+def _offset(day: date, amount: int, unit: str) -> date:
+    if unit == "day":
+        return day + timedelta(days=amount)
+    if unit == "week":
+        return day + timedelta(weeks=amount)
+    if unit == "month":
+        return add_months(day, amount)
+    return add_months(day, 12 * amount)
+
+def _closest(today: date, month: int, day: int) -> date:
+    """A month/day without a year means the occurrence closest to today (within half a year)."""
+    for year in (today.year, today.year + 1, today.year - 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if abs((candidate - today).days) <= 183:
+            return candidate
+    return date(today.year, month, day)
+
+def _year(token: Optional[str], today: date) -> Optional[int]:
+    if not token:
+        return None
+    year = int(token)
+    return year + 2000 if year < 100 else year
+
+def _calendar_date(today: date, year: Optional[int], month: int, day: int) -> date:
+    return date(year, month, day) if year else _closest(today, month, day)
+
+def _numeric_date(m: re.Match, today: date) -> date:
+    first, second, year = int(m.group(1)), int(m.group(2)), _year(m.group(3), today)
+    try:
+        return _calendar_date(today, year, first, second)    # US style: month/day
+    except ValueError:
+        return _calendar_date(today, year, second, first)    # fall back to day/month
+
+def _weekday(m: re.Match, today: date) -> date:
+    modifier, target = m.group(1), WEEKDAYS[m.group(2)]
+    ahead = (target - today.weekday()) % 7
+    if modifier in ("last", "past"):
+        return today - timedelta(days=(today.weekday() - target) % 7 or 7)
+    if modifier == "this":
+        return today + timedelta(days=ahead)
+    # bare weekday, "next" and "coming" all mean the next one after today
+    return today + timedelta(days=ahead or 7)
+
+def _relative_period(m: re.Match, today: date) -> date:
+    modifier, unit = m.group(1), m.group(2)
+    amount = {"next": 1, "this": 0, "last": -1}[modifier]
+    return _offset(today, amount, unit)
+
+def _period_boundary(m: re.Match, today: date) -> date:
+    edge, which, unit = m.group(1), (m.group(2) or "").strip(), m.group(3)
+    anchor = _offset(today, 1, unit) if which == "next" else today
+    if unit == "week":
+        monday = anchor - timedelta(days=anchor.weekday())
+        return monday if edge in ("beginning", "start") else monday + timedelta(days=4)  # work week ends Friday
+    if unit == "month":
+        if edge in ("beginning", "start"):
+            return anchor.replace(day=1)
+        return anchor.replace(day=calendar.monthrange(anchor.year, anchor.month)[1])
+    return anchor.replace(month=1, day=1) if edge in ("beginning", "start") else anchor.replace(month=12, day=31)
+
+class _Groups:
+    """Stand-in for a regex match so one handler can serve several rules."""
+    def __init__(self, *groups: Optional[str]):
+        self._groups = groups
+
+    def group(self, index: int) -> Optional[str]:
+        return self._groups[index - 1]
+
+_SHORT_BOUNDARY = {"eow": ("end", "", "week"), "eom": ("end", "", "month"), "eoy": ("end", "", "year")}
+
+Rule = Tuple["re.Pattern[str]", Callable[[re.Match, date], date]]
+
+_RULES: List[Rule] = [
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), lambda m, t: date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
+    (re.compile(r"\b(\d{4})/(\d{1,2})/(\d{1,2})\b"), lambda m, t: date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
+    (re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4}|\d{2})\b"), _numeric_date),
+    (re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?"),
+     lambda m, t: _calendar_date(t, _year(m.group(3), t), MONTHS[m.group(1)], int(m.group(2)))),
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\b\.?(?:,?\s+(\d{{4}}))?"),
+     lambda m, t: _calendar_date(t, _year(m.group(3), t), MONTHS[m.group(2)], int(m.group(1)))),
+    # A bare m/d only counts as a date when it is the whole answer; in free text "version 3/4" or "50/50" aren't dates
+    (re.compile(r"^(?:(?:on|by|due|for|starting|until)\s+)?(\d{1,2})/(\d{1,2})$"),
+     lambda m, t: _numeric_date(_Groups(m.group(1), m.group(2), None), t)),
+    (re.compile(r"\bnext\s+(?:business|working)\s+day\b"), lambda m, t: add_business_days(t, 1)),
+    (re.compile(rf"\b(?:in\s+)?({_NUMBER})\s+(?:business|working)\s+days?(?:\s+(from now|from today|later|ago))?\b"),
+     lambda m, t: add_business_days(t, -_number(m.group(1)) if m.group(2) == "ago" else _number(m.group(1)))),
+    (re.compile(rf"\bin\s+(?:a\s+)?({_NUMBER})\s+({_UNIT})s?\b"), lambda m, t: _offset(t, _number(m.group(1)), m.group(2))),
+    (re.compile(rf"\b({_NUMBER})\s+({_UNIT})s?\s+(from now|from today|later|ago)\b"),
+     lambda m, t: _offset(t, -_number(m.group(1)) if m.group(3) == "ago" else _number(m.group(1)), m.group(2))),
+    (re.compile(r"\bday after tomorrow\b"), lambda m, t: t + timedelta(days=2)),
+    (re.compile(r"\bday before yesterday\b"), lambda m, t: t - timedelta(days=2)),
+    (re.compile(r"\b(?:today|tonight|eod)\b"), lambda m, t: t),     # not "asap": that is an urgency, not a date
+    (re.compile(r"\b(?:tomorrow|tmrw|tmr)\b"), lambda m, t: t + timedelta(days=1)),
+    (re.compile(r"\byesterday\b"), lambda m, t: t - timedelta(days=1)),
+    (re.compile(rf"\b(?:(next|this|coming|last|past)\s+)?({_WEEKDAY})\b"), _weekday),
+    (re.compile(r"\b(beginning|start|end)\s+of\s+(?:the\s+)?(this\s+|next\s+)?(week|month|year)\b"), _period_boundary),
+    (re.compile(r"\b(eow|eom|eoy)\b"), lambda m, t: _period_boundary(_Groups(*_SHORT_BOUNDARY[m.group(1)]), t)),
+    (re.compile(rf"\b(next|this|last)\s+({_UNIT})\b"), _relative_period),
+]
+
+_RANGE_RE = re.compile(
+    r"^(?:from\s+|between\s+)?(?P<start>.+?)\s+(?:to|until|till|through|thru|and|-|–)\s+(?P<end>.+)$"
+)
+_ORDINAL_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)\b")
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace(",", " ")
+    text = _ORDINAL_RE.sub(r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def _parse_single(text: str, today: date) -> Optional[date]:
+    for pattern, handler in _RULES:
+        m = pattern.search(text)
+        if m:
+            try:
+                return handler(m, today)
+            except (ValueError, KeyError):
+                return None
+    return None
+
+def parse_date_range(text: str, today: Optional[date] = None) -> Optional[Tuple[date, date]]:
+    """
+    Parse a date or a date range. Single dates come back as (day, day).
+    Returns None when the text holds no date this grammar understands.
+    """
+    today = today or reference_today()
+    cleaned = _normalize(text)
+    if not cleaned:
+        return None
+
+    m = _RANGE_RE.match(cleaned)
+    if m and (m.group(0).startswith("between") or " and " not in m.group(0)):
+        start, end = _parse_single(m.group("start"), today), _parse_single(m.group("end"), today)
+        if start and end and end < start:
+            # "monday - friday": the end is the next one after the start, not after today
+            rolled = _parse_single(m.group("end"), start)
+            end = rolled if rolled and rolled >= start else end
+        if start and end:
+            return (start, end) if start <= end else (end, start)
+
+    single = _parse_single(cleaned, today)
+    return (single, single) if single else None
+
+def parse_date(text: str, today: Optional[date] = None, prefer_end: bool = False) -> Optional[str]:
+    """Parse a date answer to YYYY-MM-DD. For ranges, returns the start (or the end with prefer_end)."""
+    parsed = parse_date_range(text, today)
+    if not parsed:
+        return None
+    return (parsed[1] if prefer_end else parsed[0]).strftime("%Y-%m-%d")
+
+_TIME_RULES: List[Tuple["re.Pattern[str]", Callable[[re.Match], Tuple[int, int]]]] = [
+    (re.compile(r"\bnoon\b"), lambda m: (12, 0)),
+    (re.compile(r"\bmidnight\b"), lambda m: (0, 0)),
+    (re.compile(r"\b(\d{1,2})(?::(\d{2}))?(?::\d{2})?\s*([ap])\.?m\.?\b"),
+     lambda m: ((int(m.group(1)) % 12) + (12 if m.group(3) == "p" else 0), int(m.group(2) or 0))),
+    (re.compile(r"\b(\d{1,2}):(\d{2})(?::\d{2})?\b"), lambda m: (int(m.group(1)), int(m.group(2)))),
+    (re.compile(r"^(\d{1,2})\s+(\d{2})$"), lambda m: (int(m.group(1)), int(m.group(2)))),
+]
+
+def parse_time(text: str) -> Optional[str]:
+    """Parse a time answer to HH:MM (24h). Returns None when nothing matches."""
+    cleaned = _normalize(text)
+    for pattern, handler in _TIME_RULES:
+        m = pattern.search(cleaned)
+        if m:
+            hour, minute = handler(m)
+            if 0 <= hour < 24 and 0 <= minute < 60:
+                return f"{hour:02d}:{minute:02d}"
+            return None
+    return None
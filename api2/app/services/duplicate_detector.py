@@ -0,0 +1,190 @@
+# app/services/duplicate_detector.py
+from __future__ import annotations
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.config import settings
+from app.models.ticket_agent import TicketPlan
+from app.services.catalog_service import find_ticket_spec
+from app.services.plan_cache import normalize_request
+from app.services.rule_prefill import apply_prefill_rules
+from app.utils import metrics
+
+# Near-duplicate detection for requests a user already turned into tickets.
+# Each completed request is indexed per user as a MinHash signature over character
+# shingles and words of its text. Signatures are split into LSH bands, so a new request is
+# only compared with entries that share a band; entries older than DUPLICATE_WINDOW_SECONDS
+# are dropped. Candidates are then checked against the key form values of the completed
+# plan: if the prefill rules read a different vendor, environment or date out of the new
+# text ("...for BBB" vs "...for AAA"), it is not a duplicate however similar the wording.
+
+NUM_PERM = 64
+BANDS = 16                       # 16 bands x 4 rows: pairs above ~0.5 Jaccard almost always collide
+ROWS = NUM_PERM // BANDS
+SHINGLE = 4
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1234)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+# Values that are the same for every ticket of a user, or generated, say nothing about duplicates
+_SKIP_FIELDS = {"email", "summary"}
+
+def _features(text: str) -> Set[str]:
+    normalized = normalize_request(text)
+    padded = f" {normalized} "
+    grams = {padded[i:i + SHINGLE] for i in range(max(1, len(padded) - SHINGLE + 1))}
+    return grams | {f"w:{word}" for word in normalized.split()}
+
+def _conflicting_values(plan: TicketPlan, request_text: str) -> bool:
+    """True when the new text clearly names a different value for a field of the completed plan."""
+    for item in plan.items:
+        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, plan.catalog_version)
+        if not spec:
+            continue
+        for name, found in apply_prefill_rules(spec, request_text).items():
+            if name in _SKIP_FIELDS or found.confidence < settings.rule_prefill_min_confidence:
+                continue
+            if name in item.form and item.form[name] != found.value:
+                return True
+    return False
+
+def minhash(features: Set[str]) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) & _PRIME for f in features), dtype=np.uint64, count=len(features))
+    if not len(hashes):
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+@dataclass
+class DuplicateEntry:
+    entry_id: str
+    user: str
+    request_text: str
+    plan: TicketPlan
+    tickets: List[dict]          # what was created: pseudo_id, ticket_type, title
+    created_at: float
+    signature: np.ndarray = field(repr=False)
+
+@dataclass
+class DuplicateMatch:
+    entry: DuplicateEntry
+    similarity: float            # estimated Jaccard similarity of the request texts
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.entry.created_at
+
+class DuplicateIndex:
+    """
+    Per-user LSH index over recently completed requests. Without an explicit window it
+    follows DUPLICATE_WINDOW_SECONDS as it is when used, so a config reload applies.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None):
+        self._window_seconds = window_seconds
+        self._entries: Dict[str, DuplicateEntry] = {}
+        self._buckets: Dict[Tuple[str, int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def window_seconds(self) -> float:
+        return settings.duplicate_window_seconds if self._window_seconds is None else self._window_seconds
+
+    def _prune(self, now: float) -> None:
+        expired = [e for e in self._entries.values() if now - e.created_at > self.window_seconds]
+        for entry in expired:
+            del self._entries[entry.entry_id]
+            for band, key in _bands(entry.signature):
+                bucket = self._buckets.get((entry.user, band, key))
+                if bucket:
+                    bucket.discard(entry.entry_id)
+                    if not bucket:
+                        del self._buckets[(entry.user, band, key)]
+
+    def add(self, user: str, request_text: str, plan: TicketPlan, tickets: List[dict]) -> DuplicateEntry:
+        now = time.time()
+        entry = DuplicateEntry(
+            entry_id=uuid.uuid4().hex[:12],
+            user=user,
+            request_text=request_text,
+            plan=plan.model_copy(deep=True),
+            tickets=tickets,
+            created_at=now,
+            signature=minhash(_features(request_text)),
+        )
+        with self._lock:
+            self._prune(now)
+            self._entries[entry.entry_id] = entry
+            for band, key in _bands(entry.signature):
+                self._buckets.setdefault((user, band, key), set()).add(entry.entry_id)
+        return entry
+
+    def find(self, user: str, request_text: str, threshold: float) -> Optional[DuplicateMatch]:
+        signature = minhash(_features(request_text))
+        with self._lock:
+            self._prune(time.time())
+            candidates: Set[str] = set()
+            for band, key in _bands(signature):
+                candidates |= self._buckets.get((user, band, key), set())
+            scored = [
+                DuplicateMatch(self._entries[c], float(np.mean(self._entries[c].signature == signature)))
+                for c in candidates
+            ]
+        scored.sort(key=lambda m: (-m.similarity, -m.entry.created_at))
+        for match in scored:
+            if match.similarity < threshold:
+                break
+            if not _conflicting_values(match.entry.plan, request_text):
+                return match
+        return None
+
+    def get(self, entry_id: str) -> Optional[DuplicateEntry]:
+        return self._entries.get(entry_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_index = DuplicateIndex()
+
+def record_completed_request(user: Optional[str], request_text: str, plan: TicketPlan, tickets: List[dict]) -> None:
+    """Index a completed request so the same user's near-identical follow-up can be caught."""
+    if not user or not request_text or settings.duplicate_window_seconds <= 0:
+        return
+    _index.add(user, request_text, plan, tickets)
+
+def find_duplicate_request(user: Optional[str], request_text: str) -> Optional[DuplicateMatch]:
+    """The user's most similar recent request above DUPLICATE_SIMILARITY_THRESHOLD, if any."""
+    if not user or settings.duplicate_window_seconds <= 0:
+        return None
+    match = _index.find(user, request_text, settings.duplicate_similarity_threshold)
+    metrics.incr("duplicate_check.match" if match else "duplicate_check.clear")
+    if match:
+        print(f"🔁 DUPLICATES: '{request_text}' looks like '{match.entry.request_text}' ({match.similarity:.2f})")
+    return match
+
+def get_duplicate_entry(entry_id: str) -> Optional[DuplicateEntry]:
+    return _index.get(entry_id)
+
+def describe_duplicate(match: DuplicateMatch) -> str:
+    minutes = max(1, int(match.age_seconds // 60))
+    tickets = ", ".join(f"{t['title']} ({t['pseudo_id']})" for t in match.entry.tickets) or "a ticket"
+    return (
+        f"This looks like {tickets}, which you filed {minutes} minute{'s' if minutes != 1 else ''} ago "
+        f"(\"{match.entry.request_text}\"). Do you want to create another one anyway? (yes/no)"
+    )
+
+_YES = {"yes", "y", "yeah", "yep", "sure", "ok", "okay", "create", "proceed", "continue", "another", "anyway"}
+_NO = {"no", "n", "nope", "cancel", "stop", "don't", "dont", "skip"}
+
+def parse_confirmation(text: str) -> Optional[bool]:
+    """Yes/no answer to the duplicate question; None when it is neither."""
+    words = set(normalize_request(text).split())
+    yes, no = bool(words & _YES), bool(words & _NO)
+    return None if yes == no else yes
@@ -0,0 +1,129 @@
+# app/services/entity_extractor.py
+from __future__ import annotations
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from app.services.catalog_service import CatalogSnapshot, register_catalog_index, resolve_field_options
+from app.services.option_index import OptionSetCache
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that describe the artifact rather than the company, so they never identify an option
+GENERIC_TOKENS: Set[str] = {
+    "a", "an", "and", "the", "of", "for", "to", "is", "not", "listed",
+    "final", "estimated", "loan", "tape", "standard", "custom", "v2",
+}
+# A token shared by more than this share of a field's options is not distinctive either
+MAX_DISTINCTIVE_SHARE = 0.2
+MIN_TOKEN_LEN = 3
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower().replace("&", " and "))
+
+@dataclass
+class EntityMention:
+    option: str
+    score: float              # share of the option's distinctive weight found in the text, plus tie-break
+    matched: List[str]        # distinctive tokens that were found
+
+class FieldEntityExtractor:
+    """
+    Token inverted index over one field's options, built once per option set.
+    Only distinctive tokens (rare within the set, not generic like "final" or "loan")
+    identify an option; each is weighted by its IDF within the set. Adjacent option words
+    are also indexed joined ("stone ridge" -> "stoneridge"). Extraction is a single pass
+    over the text's tokens with one dictionary lookup per token.
+    """
+    def __init__(self, options: List[str]):
+        self.options = list(options)
+        option_tokens = [_tokens(o) for o in self.options]
+        self._all_tokens = [set(tokens) for tokens in option_tokens]
+
+        doc_freq: Dict[str, int] = {}
+        for tokens in self._all_tokens:
+            for token in tokens:
+                doc_freq[token] = doc_freq.get(token, 0) + 1
+
+        n = max(len(self.options), 1)
+        max_df = max(1, int(n * MAX_DISTINCTIVE_SHARE))
+        # text token -> [(option id, distinctive token it stands for)]
+        self._postings: Dict[str, List[Tuple[int, str]]] = {}
+        self._distinctive: List[Dict[str, float]] = []
+        for i, tokens in enumerate(option_tokens):
+            distinctive: Dict[str, float] = {}
+            for token in tokens:
+                if token in GENERIC_TOKENS or doc_freq[token] > max_df:
+                    continue
+                if len(token) < MIN_TOKEN_LEN and len(tokens) > 1:
+                    continue
+                if token not in distinctive:
+                    distinctive[token] = math.log(1 + n / doc_freq[token])
+                    self._postings.setdefault(token, []).append((i, token))
+            for left, right in zip(tokens, tokens[1:]):
+                joined = left + right
+                if joined not in doc_freq:
+                    for token in (left, right):
+                        if token in distinctive:
+                            self._postings.setdefault(joined, []).append((i, token))
+            self._distinctive.append(distinctive)
+
+    def extract(self, text: str, limit: int = 5) -> List[EntityMention]:
+        """Return options mentioned in the text, best first. Only fully mentioned options qualify."""
+        word_set = set(_tokens(text))
+        found: Dict[int, Set[str]] = {}
+        for word in word_set:
+            for i, token in self._postings.get(word, ()):
+                found.setdefault(i, set()).add(token)
+
+        ranked: List[Tuple[float, int, EntityMention]] = []
+        for i, tokens in found.items():
+            distinctive = self._distinctive[i]
+            total = sum(distinctive.values())
+            if not total:
+                continue
+            coverage = sum(w for token, w in distinctive.items() if token in tokens) / total
+            if coverage < 0.999:
+                continue
+            # Break ties between e.g. "X Final Loan Tape" and "X Estimated Loan Tape" with the remaining words
+            secondary = len(self._all_tokens[i] & (word_set | tokens)) / len(self._all_tokens[i])
+            score = round(coverage + 0.2 * secondary, 4)
+            # Longer mentions win ("citi securitization" over "citi")
+            ranked.append((score + sum(distinctive.values()), i, EntityMention(self.options[i], score, sorted(tokens))))
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        return [mention for _, _, mention in ranked[:limit]]
+
+    def best(self, text: str) -> Optional[EntityMention]:
+        """
+        The single best mention, or None when the text is ambiguous: two options fit
+        equally well, or it names two different entities ("from Pimco to Citi").
+        """
+        mentions = self.extract(text, limit=10)
+        if not mentions:
+            return None
+        top = mentions[0]
+        for other in mentions[1:]:
+            if not set(other.matched) <= set(top.matched):
+                return None
+            if set(other.matched) == set(top.matched) and other.score >= top.score:
+                return None
+        return top
+
+_extractors = OptionSetCache(FieldEntityExtractor)
+
+def get_entity_extractor(options: List[str]) -> FieldEntityExtractor:
+    return _extractors.get(options)
+
+def _warm_entity_extractors(snapshot: CatalogSnapshot) -> int:
+    """Build an extractor for every choice field when a catalog version loads."""
+    count = 0
+    for spec in snapshot.specs.values():
+        for raw in spec.get("fields", []):
+            if raw.get("type") in ("choice", "multi_choice"):
+                options = resolve_field_options(raw)
+                if options:
+                    get_entity_extractor(options)
+                    count += 1
+    return count
+
+register_catalog_index("entity_extractors", _warm_entity_extractors)
@@ -1,14 +1,26 @@
 # app/services/field_prefiller_service.py
 from __future__ import annotations
+import asyncio
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import settings
 from app.models.ticket_agent import TicketPlan, TicketItem
-from app.services.catalog_service import find_ticket_spec
+from app.services.catalog_service import find_ticket_spec, get_catalog_version, resolve_field_options
+from app.services.date_parser import reference_today
+from app.services.entity_extractor import get_entity_extractor
+from app.services.option_codes import OPTION_CODES_INSTRUCTIONS, decode_option_codes, render_coded_options
+from app.services.option_index import options_fingerprint
+from app.services.option_providers import load_field_options_async
+from app.services.prompt_fragments import estimate_tokens, field_context_block
+from app.services.rule_prefill import apply_prefill_rules
+from app.utils import metrics
 from app.services.llm_service import llm_service, Message as LLMMessage
-from datetime import datetime
 
 # System prompt for field prefilling - focused on filling fields with available options
-SYSTEM_PREFILL = """
+# The prompts come in two variants that differ only in their examples: option text, and
+# option numbers for PREFILL_OPTION_ENCODING=index, so the examples never contradict
+# OPTION_CODES_INSTRUCTIONS. Each variant is a fixed string, which keeps the prefix cacheable.
+_SYSTEM_PREFILL_RULES = """
 You are a Ticket Form Field Prefilling Specialist.
 Your job is to fill in ticket form fields based on user input, using ONLY the available options provided.
 
@@ -40,7 +52,9 @@ IMPORTANT FIELD MATCHING RULES:
 
 Return ONLY valid JSON with the filled form data.
 
-EXAMPLE OUTPUT FORMAT:
+"""
+
+_SYSTEM_PREFILL_EXAMPLES = """EXAMPLE OUTPUT FORMAT:
 If the user says "I need a high urgency datadog monitoring setup for kubernetes" and the available fields are:
 - urgency: ["critical", "high", "medium", "low"]
 - infrastructure_type: ["kubernetes", "lambda", "database", "other aws services"]
@@ -64,85 +78,354 @@ You should return:
   "vendor_name": "AAA Final Loan Tape",
   "type_of_rerun": "final"
 }
-NOTE THESE ARE ONLY EXAMPLES, YOU SHOULD FILL THE FIELDS BASED ON THE USER'S REQUEST.
+"""
+
+_SYSTEM_PREFILL_CODED_EXAMPLES = """EXAMPLE OUTPUT FORMAT:
+If the user says "I need a high urgency datadog monitoring setup for kubernetes" and the available fields are:
+- urgency: 1: critical; 2: high; 3: medium; 4: low
+- infrastructure_type: 1: kubernetes; 2: lambda; 3: database; 4: other aws services
+- alert_priority: 1: P1: Critical; 2: P2: High; 3: P3: Medium; 4: P4: Low; 5: P5: Info
+
+You should return:
+{
+  "urgency": 2,
+  "infrastructure_type": 1,
+  "alert_priority": 2
+}
+
+ANOTHER EXAMPLE:
+If the user says "Create a final loan tape for AAA vendor" and the available fields are:
+- vendor_name (every option ends with "Final Loan Tape"): 1: AAA; 2: Bawag; 3: Blackstone; ...
+- type_of_rerun: 1: final; 2: estimated
+- urgency: 1: critical; 2: high; 3: medium; 4: low
+
+You should return:
+{
+  "vendor_name": 1,
+  "type_of_rerun": 1
+}
+"""
+
+_SYSTEM_PREFILL_CLOSING = """NOTE THESE ARE ONLY EXAMPLES, YOU SHOULD FILL THE FIELDS BASED ON THE USER'S REQUEST.
 
 IMPORTANT: Only include fields that you can confidently fill based on the user's request. Do not include fields that are unclear or not mentioned.
 CRITICAL: Do NOT make assumptions or fill fields with default values. Only fill fields when the user provides enough information for them.
 """
 
-async def prefill_ticket_fields_async(ticket_item: TicketItem, user_text: str, user_email: str = None) -> Dict[str, Any]:
+SYSTEM_PREFILL = _SYSTEM_PREFILL_RULES + _SYSTEM_PREFILL_EXAMPLES + _SYSTEM_PREFILL_CLOSING
+SYSTEM_PREFILL_CODED = _SYSTEM_PREFILL_RULES + _SYSTEM_PREFILL_CODED_EXAMPLES + _SYSTEM_PREFILL_CLOSING
+
+# Static half of the prefill instructions; kept in the system prompt so it never changes between calls
+_PREFILL_INSTRUCTIONS_HEAD = """
+Please fill in the form fields based on the user's request. Return ONLY a JSON object with field names as keys and values as the selected options or filled data.
+
+IMPORTANT: If there is an "email" field available, you MUST include it with the USER EMAIL given at the end of the request, if provided.
+
+MATCHING INSTRUCTIONS:
+- Carefully analyze the user's request for keywords that match the available options
+- For vendor/investor fields: Look for company names, abbreviations, or keywords mentioned
+- For rerun types: Look for words like "final", "estimated", "manual" in the request
+- For urgency: Look for urgency indicators in the request. If the user does not mention urgency, do not fill the urgency field.
+- For dates: Convert relative dates to proper format using the CURRENT DATE given at the end of the request
+- For infrastructure: Look for technology keywords mentioned
+
+"""
+
+_PREFILL_INSTRUCTIONS_EXAMPLE = """Example output format:
+{
+"email": "user@example.com",
+"urgency": "high",
+"start_date": "2024-01-15",
+"end_date": "2024-01-16",
+"vendor_name": "AAA Final Loan Tape"
+}
+"""
+
+_PREFILL_INSTRUCTIONS_CODED_EXAMPLE = """Example output format:
+{
+"email": "user@example.com",
+"urgency": 2,
+"start_date": "2024-01-15",
+"end_date": "2024-01-16",
+"vendor_name": 1
+}
+"""
+
+_PREFILL_INSTRUCTIONS_TAIL = """Note that this is just an example, you should fill the fields based on the user's request. Do NOT use this as a template or use these specific values unless they appear in the user's request.
+
+Only include fields that you can confidently fill based on the user's request.
+Do NOT fill any fields that cannot be inferenced based on the provided information in the user's request.
+Do NOT fill in any option fields that do not have available options similar to any information in the user's request.
+Do NOT fill in any True or False fields that cannot be inferenced based on the provided information in the user's request.
+"""
+
+PREFILL_INSTRUCTIONS = _PREFILL_INSTRUCTIONS_HEAD + _PREFILL_INSTRUCTIONS_EXAMPLE + _PREFILL_INSTRUCTIONS_TAIL
+PREFILL_INSTRUCTIONS_CODED = _PREFILL_INSTRUCTIONS_HEAD + _PREFILL_INSTRUCTIONS_CODED_EXAMPLE + _PREFILL_INSTRUCTIONS_TAIL
+
+def prefill_system_prompt(coded: bool = False) -> str:
+    """System prompt for single-ticket prefill; `coded` when options are listed as numbers."""
+    return SYSTEM_PREFILL_CODED + PREFILL_INSTRUCTIONS_CODED if coded else SYSTEM_PREFILL + PREFILL_INSTRUCTIONS
+
+async def prefill_ticket_fields_async(
+    ticket_item: TicketItem,
+    user_text: str,
+    user_email: str = None,
+    catalog_version: str = None,
+    field_sources: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """
-    Prefill ticket fields using LLM with full access to field definitions and options.
+    Prefill ticket fields: deterministic rules first, then the LLM for whatever is left.
     
     Args:
         ticket_item: The ticket item to prefill
         user_text: User's original request text
         user_email: User's email (optional)
+        catalog_version: Catalog version the plan was built against (optional)
+        field_sources: Optional dict that receives how each value was found
     
     Returns:
         Dict containing the filled form data
     """
     print(f"🔧 PREFILLER: Starting field prefilling for {ticket_item.ticket_type}")
+    if field_sources is None:
+        field_sources = {}
     
     # Get the full ticket specification with all field details
-    spec = find_ticket_spec(ticket_item.service_area, ticket_item.category, ticket_item.ticket_type)
+    spec = find_ticket_spec(ticket_item.service_area, ticket_item.category, ticket_item.ticket_type, catalog_version)
     if not spec:
         print(f"❌ PREFILLER: Could not find spec for {ticket_item.ticket_type}")
         return {}
+    await load_field_options_async(spec.get("fields", []))
     
-    # Build detailed field context with all options
-    field_context = build_field_context(spec)
+    form_data, remaining = _rule_prefill(spec, user_text, user_email, field_sources)
+    if not remaining:
+        print(f"⏭️ PREFILLER: No fields left for the LLM, skipping the call")
+        metrics.incr("prefill.llm_skipped")
+        return form_data
+    
+    metrics.incr("prefill.llm_calls")
+    llm_data = await _llm_prefill_fields(ticket_item, user_text, user_email, {**spec, "fields": remaining}, catalog_version)
+    return _merge_llm_values(form_data, field_sources, remaining, llm_data, user_text, spec)
+
+def _rule_prefill(
+    spec: Dict[str, Any],
+    user_text: str,
+    user_email: Optional[str],
+    field_sources: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Rule stage; returns the confident values and the fields left for the LLM."""
+    # Rule stage: email, urgency, environments, dates, exact vendor/option mentions
+    form_data: Dict[str, Any] = {}
+    for name, rule_value in apply_prefill_rules(spec, user_text, user_email).items():
+        if rule_value.confidence >= settings.rule_prefill_min_confidence:
+            form_data[name] = rule_value.value
+            field_sources[name] = {"source": "rule", "rule": rule_value.rule, "confidence": rule_value.confidence}
+    if form_data:
+        print(f"📏 PREFILLER: Rules filled {list(form_data)}")
+    
+    # Only fields the rules couldn't fill (and the LLM can) go into the prompt
+    remaining = [
+        field for field in spec.get("fields", [])
+        if field.get("name") not in form_data
+        and field.get("name") not in ("summary", "email")
+        and field.get("type") not in ("file", "files")
+    ]
+    return form_data, remaining
+
+def _merge_llm_values(
+    form_data: Dict[str, Any],
+    field_sources: Dict[str, Dict[str, Any]],
+    remaining: List[Dict[str, Any]],
+    llm_data: Dict[str, Any],
+    user_text: str,
+    spec: Dict[str, Any],
+    source: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Add the LLM's values for the remaining fields, then post-process."""
+    remaining_names = {field["name"] for field in remaining}
+    for name, value in llm_data.items():
+        if name in remaining_names and value not in (None, "", [], {}):
+            form_data[name] = value
+            field_sources[name] = dict(source or {"source": "llm"})
+    
+    # Post-process form data to improve field matching
+    before = set(form_data)
+    form_data = post_process_form_data(form_data, user_text, spec)
+    for name in set(form_data) - before:
+        field_sources[name] = {"source": "post_process"}
+    
+    return form_data
+
+BATCH_PREFILL_INSTRUCTIONS = """
+SEVERAL TICKETS:
+- The request may be split into several tickets, given as "### Ticket 1", "### Ticket 2", ... each with its own fields and options.
+- Fill each ticket's fields only from that ticket's field list.
+- Return ONLY one JSON object mapping each ticket number to that ticket's field object, e.g. {"1": {"urgency": "high"}, "2": {"start_date": "2024-01-15"}}
+"""
+
+BATCH_PREFILL_INSTRUCTIONS_CODED = """
+SEVERAL TICKETS:
+- The request may be split into several tickets, given as "### Ticket 1", "### Ticket 2", ... each with its own fields and options.
+- Fill each ticket's fields only from that ticket's field list.
+- Return ONLY one JSON object mapping each ticket number to that ticket's field object, e.g. {"1": {"urgency": 2}, "2": {"start_date": "2024-01-15"}}
+"""
+
+async def prefill_ticket_fields_batch_async(
+    ticket_items: List[TicketItem],
+    user_text: str,
+    user_email: str = None,
+    catalog_version: str = None,
+) -> List[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+    """
+    Batched prefill_ticket_fields_async (LLM_BATCH_CALLS): rules run per item, then the
+    fields left on all items go to the LLM in one prompt with a section per ticket.
+    Tickets whose section is missing or unparseable fall back to their own call.
+
+    Returns:
+        (form data, field sources) per item, in order
+    """
+    results: List[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]] = []
+    pending: List[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]] = []   # (item index, spec, remaining fields)
+    for i, item in enumerate(ticket_items):
+        field_sources: Dict[str, Dict[str, Any]] = {}
+        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, catalog_version)
+        if not spec:
+            print(f"❌ PREFILLER: Could not find spec for {item.ticket_type}")
+            results.append(({}, field_sources))
+            continue
+        await load_field_options_async(spec.get("fields", []))
+        form_data, remaining = _rule_prefill(spec, user_text, user_email, field_sources)
+        results.append((form_data, field_sources))
+        if remaining:
+            pending.append((i, spec, remaining))
+        else:
+            metrics.incr("prefill.llm_skipped")
     
-    # Add current datetime context
-    current_datetime = datetime.now()
-    datetime_context = f"\n\nCURRENT DATE AS REFERENCE: {current_datetime.strftime('%Y-%m-%d')}"
+    # Ticket number (1-based position in `pending`) -> (LLM values, field source)
+    llm_results: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    if len(pending) > 1:
+        metrics.incr("prefill.llm_calls")
+        metrics.incr("prefill.batch_calls")
+        answers = await _llm_prefill_batch(
+            [(ticket_items[i], {**spec, "fields": remaining}) for i, spec, remaining in pending],
+            user_text, user_email, catalog_version,
+        )
+        llm_results = {n: (data, {"source": "llm", "batched": True}) for n, data in answers.items()}
+    
+    fallback = [(n, entry) for n, entry in enumerate(pending, 1) if n not in llm_results]
+    if fallback and len(pending) > 1:
+        print(f"⚠️ PREFILLER: Batched answer missed {len(fallback)} tickets, prefilling them one by one")
+        metrics.incr("prefill.batch_fallback", len(fallback))
+    if fallback:
+        metrics.incr("prefill.llm_calls", len(fallback))
+    fallback_data = await asyncio.gather(*(
+        _llm_prefill_fields(ticket_items[i], user_text, user_email, {**spec, "fields": remaining}, catalog_version)
+        for _, (i, spec, remaining) in fallback
+    ))
+    for (n, _), data in zip(fallback, fallback_data):
+        llm_results[n] = (data, {"source": "llm"})
+    
+    for n, (i, spec, remaining) in enumerate(pending, 1):
+        llm_data, source = llm_results[n]
+        form_data, field_sources = results[i]
+        results[i] = (_merge_llm_values(form_data, field_sources, remaining, llm_data, user_text, spec, source), field_sources)
+    return results
+
+async def _llm_prefill_batch(
+    entries: List[Tuple[TicketItem, Dict[str, Any]]],
+    user_text: str,
+    user_email: Optional[str],
+    catalog_version: Optional[str] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """One LLM call for several (ticket item, narrowed spec) pairs; returns the parsed sections by ticket number."""
+    coded = settings.prefill_option_encoding == "index" and any(
+        field.get("type") in ("choice", "multi_choice") for _, spec in entries for field in spec.get("fields", [])
+    )
+    sections = [
+        f"### Ticket {n}\n"
+        f"Ticket Type: {item.ticket_type}\n"
+        f"Service Area: {item.service_area}\n"
+        f"Category: {item.category}\n"
+        f"Available Fields and Options:\n{build_field_context(spec, catalog_version)}"
+        for n, (item, spec) in enumerate(entries, 1)
+    ]
+    if coded:
+        sections.append(OPTION_CODES_INSTRUCTIONS)
     
-    # Add user email context if available
     user_context = ""
     if user_email:
-        user_context = f"\n\nUSER EMAIL: {user_email}\nThe email field should be automatically filled with this email address."
-        
-    # Create the prompt with detailed field information
+        user_context = f"\nUSER EMAIL: {user_email}"
+    prompt = (
+        "\n\n".join(sections)
+        + f'\n\nUser Request: "{user_text}"\n\n'
+        + f"CURRENT DATE AS REFERENCE: {reference_today().isoformat()}{user_context}"
+    )
+    messages = [
+        LLMMessage(role="system", content=prefill_system_prompt(coded) + (BATCH_PREFILL_INSTRUCTIONS_CODED if coded else BATCH_PREFILL_INSTRUCTIONS)),
+        LLMMessage(role="user", content=prompt),
+    ]
+    
+    print(f"🤖 PREFILLER: Calling LLM once for {len(entries)} tickets")
+    try:
+        response = await llm_service.generate_non_streaming_response(
+            messages=messages,
+            model="llama3:8b",
+            temperature=0.1,
+            max_tokens=2048,
+            stage="prefill"
+        )
+        parsed = json.loads(extract_json_from_response(response.content))
+    except Exception as e:
+        print(f"❌ PREFILLER: Batched prefill failed: {e}")
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    
+    answers: Dict[int, Dict[str, Any]] = {}
+    for n, (_, spec) in enumerate(entries, 1):
+        section = parsed.get(str(n))
+        if isinstance(section, dict):
+            answers[n] = decode_option_codes(section, spec) if coded else section
+    return answers
+
+async def _llm_prefill_fields(
+    ticket_item: TicketItem,
+    user_text: str,
+    user_email: Optional[str],
+    spec: Dict[str, Any],
+    catalog_version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Ask the LLM to fill the fields in `spec` (already narrowed to what the rules left open)."""
+    # Build detailed field context with all options
+    field_context = build_field_context(spec, catalog_version)
+    
+    coded = settings.prefill_option_encoding == "index" and any(
+        field.get("type") in ("choice", "multi_choice") for field in spec.get("fields", [])
+    )
+    if coded:
+        field_context += OPTION_CODES_INSTRUCTIONS
+
+    # Dynamic parts (request, date, email) go last so the static system prompt and the
+    # per-spec field context form a stable prefix the model server can reuse
+    user_context = ""
+    if user_email:
+        user_context = f"\nUSER EMAIL: {user_email}\nThe email field should be automatically filled with this email address."
+
     prompt = f"""
                 Ticket Type: {ticket_item.ticket_type}
                 Service Area: {ticket_item.service_area}
                 Category: {ticket_item.category}
 
-                User Request: "{user_text}"
-
                 This is the catalog context. It Shows all Available Fields and Options:
                 {field_context}
 
-                Please fill in the form fields based on the user's request. Return ONLY a JSON object with field names as keys and values as the selected options or filled data.
-
-                IMPORTANT: If there is an "email" field available, you MUST include it with the user's email address: "{user_email}" if provided.
-
-                MATCHING INSTRUCTIONS:
-                - Carefully analyze the user's request for keywords that match the available options
-                - For vendor/investor fields: Look for company names, abbreviations, or keywords mentioned
-                - For rerun types: Look for words like "final", "estimated", "manual" in the request
-                - For urgency: Look for urgency indicators in the request. If the user does not mention urgency, do not fill the urgency field.
-                - For dates: Convert relative dates to proper format
-                - For infrastructure: Look for technology keywords mentioned
-
-                Example output format:
-                {{
-                "email": "{user_email or "user@example.com"}",
-                "urgency": "high",
-                "start_date": "2024-01-15",
-                "end_date": "2024-01-16",
-                "vendor_name": "AAA Final Loan Tape"
-                }}
-                Note that this is just an example, you should fill the fields based on the user's request. Do NOT use this as a template or use these specific values unless they appear in the user's request.
-
-                Only include fields that you can confidently fill based on the user's request.
-                Do NOT fill any fields that cannot be inferenced based on the provided information in the user's request.
-                Do NOT fill in any option fields that do not have available options similar to any information in the user's request.
-                Do NOT fill in any True or False fields that cannot be inferenced based on the provided information in the user's request.
+                User Request: "{user_text}"
+
+                CURRENT DATE AS REFERENCE: {reference_today().isoformat()}{user_context}
              """
     
     messages = [
-        {"role": "system", "content": SYSTEM_PREFILL + datetime_context + user_context},
+        {"role": "system", "content": prefill_system_prompt(coded)},
         {"role": "user", "content": prompt}
     ]
     
@@ -156,7 +439,8 @@ async def prefill_ticket_fields_async(ticket_item: TicketItem, user_text: str, u
             messages=message_objects,
             model="llama3:8b",
             temperature=0.1,
-            max_tokens=2048
+            max_tokens=2048,
+            stage="prefill"
         )
         
         raw = response.content
@@ -168,16 +452,11 @@ async def prefill_ticket_fields_async(ticket_item: TicketItem, user_text: str, u
         # Parse the JSON
         try:
             form_data = json.loads(cleaned_json)
+            if not isinstance(form_data, dict):
+                raise json.JSONDecodeError("Expected a JSON object", cleaned_json, 0)
             print(f"✅ PREFILLER: Successfully parsed form data: {form_data}")
-            
-            # Ensure email is set if user_email is provided and email field exists in spec
-            if user_email and "email" in [field.get("name") for field in spec.get("fields", [])]:
-                form_data["email"] = user_email
-                print(f"📧 PREFILLER: Ensured email field is set to: {user_email}")
-            
-            # Post-process form data to improve field matching
-            form_data = post_process_form_data(form_data, user_text, spec)
-            
+            if coded:
+                form_data = decode_option_codes(form_data, spec)
             return form_data
         except json.JSONDecodeError as e:
             print(f"❌ PREFILLER: JSON parsing failed: {e}")
@@ -188,54 +467,69 @@ async def prefill_ticket_fields_async(ticket_item: TicketItem, user_text: str, u
         print(f"❌ PREFILLER: LLM failed: {e}")
         return {}
 
-def build_field_context(spec: Dict[str, Any]) -> str:
+def build_field_context(spec: Dict[str, Any], version: Optional[str] = None) -> str:
     """
     Build a detailed context string describing all fields and their options.
+    Each field's block is rendered once per catalog version (and option set, for
+    options_source fields) and reused, see app/services/prompt_fragments.py.
     """
+    version = version or get_catalog_version()
+    blocks = []
+    for field in spec.get("fields", []):
+        options = resolve_field_options(field)
+        # Static options are fixed per catalog version; sourced ones can change between refreshes
+        options_key = options_fingerprint(options) if field.get("options_source") else None
+        key = (version, spec.get("ticket_type"), field.get("name", ""), options_key, settings.prefill_option_encoding)
+        blocks.append(field_context_block(key, lambda field=field, options=options: _render_field_context(field, options)))
+    text = "\n".join(blocks)
+    metrics.observe("prompt.field_context_tokens", estimate_tokens(text))
+    return text
+
+def _render_field_context(field: Dict[str, Any], options: List[str]) -> str:
     context_lines = []
+    field_name = field.get("name", "")
+    field_type = field.get("type", "")
+    description = field.get("description", "")
     
-    for field in spec.get("fields", []):
-        field_name = field.get("name", "")
-        field_type = field.get("type", "")
-        description = field.get("description", "")
-        options = field.get("options", [])
-        
-        context_lines.append(f"\nField: {field_name}")
-        context_lines.append(f"Type: {field_type}")
-        if description:
-            context_lines.append(f"Description: {description}")
-        
-        if options:
+    context_lines.append(f"\nField: {field_name}")
+    context_lines.append(f"Type: {field_type}")
+    if description:
+        context_lines.append(f"Description: {description}")
+    
+    if options:
+        if settings.prefill_option_encoding == "index":
+            context_lines.extend(render_coded_options(options))
+        else:
             context_lines.append("Available options:")
             for option in options:
                 context_lines.append(f"  • {option}")
-            
-            # Add matching hints for common field types
-            if field_name in ["vendor_name", "from_investor", "to_recipient", "investor_name"]:
-                context_lines.append("  → Look for company names, abbreviations (AAA, BBB), or keywords in user request")
-            elif field_name in ["type_of_rerun", "request_type"]:
-                context_lines.append("  → Look for words like 'final', 'estimated', 'manual', 'automatic' in user request")
-            elif field_name == "urgency":
-                context_lines.append("  → Look for urgency words like 'urgent', 'critical', 'high', 'medium', 'low' in user request")
-            elif field_name in ["infrastructure_type", "source"]:
-                context_lines.append("  → Look for infrastructure words like 'kubernetes', 'lambda', 'database', 'aws' in user request")
-        else:
-            if field_type == "string":
-                context_lines.append("  • Free text input")
-            elif field_type == "rich_text":
-                context_lines.append("  • Rich text input")
-            elif field_type == "bool":
-                context_lines.append("  • true/false, yes/no, 1/0")
-            elif field_type == "int":
-                context_lines.append("  • Integer number")
-            elif field_type == "date":
-                context_lines.append("  • Date in YYYY-MM-DD format or relative dates (today, tomorrow, etc.)")
-            elif field_type == "time":
-                context_lines.append("  • Time in HH:MM format")
-            elif field_type in ["file", "files"]:
-                context_lines.append("  • File upload")
         
-        context_lines.append("")
+        # Add matching hints for common field types
+        if field_name in ["vendor_name", "from_investor", "to_recipient", "investor_name"]:
+            context_lines.append("  → Look for company names, abbreviations (AAA, BBB), or keywords in user request")
+        elif field_name in ["type_of_rerun", "request_type"]:
+            context_lines.append("  → Look for words like 'final', 'estimated', 'manual', 'automatic' in user request")
+        elif field_name == "urgency":
+            context_lines.append("  → Look for urgency words like 'urgent', 'critical', 'high', 'medium', 'low' in user request")
+        elif field_name in ["infrastructure_type", "source"]:
+            context_lines.append("  → Look for infrastructure words like 'kubernetes', 'lambda', 'database', 'aws' in user request")
+    else:
+        if field_type == "string":
+            context_lines.append("  • Free text input")
+        elif field_type == "rich_text":
+            context_lines.append("  • Rich text input")
+        elif field_type == "bool":
+            context_lines.append("  • true/false, yes/no, 1/0")
+        elif field_type == "int":
+            context_lines.append("  • Integer number")
+        elif field_type == "date":
+            context_lines.append("  • Date in YYYY-MM-DD format or relative dates (today, tomorrow, etc.)")
+        elif field_type == "time":
+            context_lines.append("  • Time in HH:MM format")
+        elif field_type in ["file", "files"]:
+            context_lines.append("  • File upload")
+    
+    context_lines.append("")
     
     return "\n".join(context_lines)
 
@@ -280,7 +574,7 @@ def post_process_form_data(form_data: Dict[str, Any], user_text: str, spec: Dict
     for field in fields:
         field_name = field.get("name", "")
         field_type = field.get("type", "")
-        options = field.get("options", [])
+        options = resolve_field_options(field)
         
         # Skip if field already has a value
         if field_name in form_data and form_data[field_name]:
@@ -288,13 +582,12 @@ def post_process_form_data(form_data: Dict[str, Any], user_text: str, spec: Dict
             
         # Handle vendor/investor name fields
         if field_name in ["vendor_name", "from_investor", "to_recipient", "investor_name"] and options:
-            for option in options:
-                option_lower = option.lower()
-                # Look for company abbreviations or keywords
-                if any(keyword in user_text_lower for keyword in option_lower.split()):
-                    form_data[field_name] = option
-                    print(f"🔧 PREFILLER: Post-processed {field_name} = {option}")
-                    break
+            # One pass over the text against the field's distinctive option tokens;
+            # ambiguous mentions are left for the user to answer
+            mention = get_entity_extractor(options).best(user_text)
+            if mention:
+                form_data[field_name] = mention.option
+                print(f"🔧 PREFILLER: Post-processed {field_name} = {mention.option} (matched {', '.join(mention.matched)})")
         
         # Handle rerun type fields
         elif field_name in ["type_of_rerun", "request_type"] and options:
@@ -339,14 +632,23 @@ async def prefill_plan_fields_async(plan: TicketPlan, user_text: str, user_email
     # Create a copy of the plan to modify
     updated_plan = TicketPlan(
         items=[],
-        meta=plan.meta
+        meta=plan.meta,
+        catalog_version=plan.catalog_version
     )
     
+    batched = None
+    if settings.llm_batch_calls and len(plan.items) > 1:
+        batched = await prefill_ticket_fields_batch_async(plan.items, user_text, user_email, plan.catalog_version)
+    
     for i, item in enumerate(plan.items):
         print(f"🔧 PREFILLER: Prefilling item {i+1}: {item.ticket_type}")
         
         # Prefill fields for this ticket item
-        form_data = await prefill_ticket_fields_async(item, user_text, user_email)
+        if batched is not None:
+            form_data, field_sources = batched[i]
+        else:
+            field_sources: Dict[str, Dict[str, Any]] = {}
+            form_data = await prefill_ticket_fields_async(item, user_text, user_email, plan.catalog_version, field_sources)
         
         # Create updated ticket item with prefilled form data
         updated_item = TicketItem(
@@ -356,7 +658,8 @@ async def prefill_plan_fields_async(plan: TicketPlan, user_text: str, user_email
             title=item.title,
             description=item.description,
             form=form_data,  # Use the prefilled form data
-            labels=item.labels
+            labels=item.labels,
+            field_sources=field_sources
         )
         
         # Set email if provided
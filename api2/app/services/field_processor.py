@@ -6,6 +6,9 @@ from datetime import datetime, date, timedelta
 from typing import Any, List, Optional, Union
 from app.models.ticket_agent import FieldDef
 from app.services.llm_service import llm_service, Message as LLMMessage
+from app.services.choice_matcher import match_choice
+from app.services.date_parser import parse_date, parse_time
+from app.utils import metrics
 
 class FieldProcessor:
     """Process and validate user input according to field type specifications"""
@@ -33,7 +36,7 @@ class FieldProcessor:
             elif field_def.type == "int":
                 return FieldProcessor._process_int(user_input)
             elif field_def.type == "date":
-                return FieldProcessor._process_date(user_input)
+                return FieldProcessor._process_date(user_input, prefer_end=field_def.name.startswith("end"))
             elif field_def.type == "time":
                 return FieldProcessor._process_time(user_input)
             elif field_def.type == "choice":
@@ -91,144 +94,22 @@ class FieldProcessor:
             raise ValueError(f"Invalid integer: '{numbers[0]}'")
     
     @staticmethod
-    def _process_date(user_input: str) -> str:
+    def _process_date(user_input: str, prefer_end: bool = False) -> str:
         """Process date input - convert to ISO format"""
-        user_input = user_input.strip()
-        
-        # Get current date for context
-        today = datetime.now().date()
-        today_str = today.strftime('%Y-%m-%d')
-        
-        # Try programmatic parsing for common relative dates first
-        user_input_lower = user_input.lower().strip()
-        
-        if user_input_lower == "today":
-            return today_str
-        elif user_input_lower == "tomorrow":
-            tomorrow = today + timedelta(days=1)
-            return tomorrow.strftime('%Y-%m-%d')
-        elif user_input_lower == "yesterday":
-            yesterday = today - timedelta(days=1)
-            return yesterday.strftime('%Y-%m-%d')
-        elif user_input_lower == "next week":
-            next_week = today + timedelta(days=7)
-            return next_week.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 3 days":
-            in_3_days = today + timedelta(days=3)
-            return in_3_days.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 5 days":
-            in_5_days = today + timedelta(days=5)
-            return in_5_days.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 7 days":
-            in_7_days = today + timedelta(days=7)
-            return in_7_days.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 10 days":
-            in_10_days = today + timedelta(days=10)
-            return in_10_days.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 14 days":
-            in_14_days = today + timedelta(days=14)
-            return in_14_days.strftime('%Y-%m-%d')
-        elif user_input_lower == "in 30 days":
-            in_30_days = today + timedelta(days=30)
-            return in_30_days.strftime('%Y-%m-%d')
-        
-        # Try common date formats
-        date_formats = [
-            '%Y-%m-%d',      # 2024-01-15
-            '%m/%d/%Y',      # 01/15/2024
-            '%d/%m/%Y',      # 15/01/2024
-            '%Y/%m/%d',      # 2024/01/15
-            '%B %d, %Y',     # January 15, 2024
-            '%b %d, %Y',     # Jan 15, 2024
-            '%d %B %Y',      # 15 January 2024
-            '%d %b %Y',      # 15 Jan 2024
-        ]
-        
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(user_input, fmt)
-                return parsed_date.strftime('%Y-%m-%d')
-            except ValueError:
-                continue
-        
-        # If no format matches, try to extract date using regex
-        date_patterns = [
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY or DD/MM/YYYY
-            r'(\d{4})/(\d{1,2})/(\d{1,2})',  # YYYY/MM/DD
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, user_input)
-            if match:
-                try:
-                    if len(match.groups()) == 3:
-                        year, month, day = match.groups()
-                        # Try both MM/DD and DD/MM for ambiguous formats
-                        try:
-                            parsed_date = datetime(int(year), int(month), int(day))
-                            return parsed_date.strftime('%Y-%m-%d')
-                        except ValueError:
-                            # Try DD/MM format
-                            parsed_date = datetime(int(year), int(day), int(month))
-                            return parsed_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    continue
-        
-        # For now, skip LLM parsing in synchronous context
-        # In a real implementation, you'd want to make this async or use a different approach
+        # Formats, weekdays, relative offsets, business days and ranges are parsed locally;
+        # there is no LLM fallback in the synchronous path
+        parsed = parse_date(user_input.strip(), prefer_end=prefer_end)
+        if parsed:
+            metrics.incr("date_parse.local")
+            return parsed
         raise ValueError(f"Could not parse date from: '{user_input}'. Please use format YYYY-MM-DD, MM/DD/YYYY, or similar.")
     
     @staticmethod
     def _process_time(user_input: str) -> str:
         """Process time input - convert to HH:MM format"""
-        user_input = user_input.strip()
-        
-        # Try common time formats
-        time_formats = [
-            '%H:%M',         # 14:30
-            '%H:%M:%S',      # 14:30:00
-            '%I:%M %p',      # 2:30 PM
-            '%I:%M:%S %p',   # 2:30:00 PM
-            '%I %p',         # 2 PM
-            '%H %M',         # 14 30
-        ]
-        
-        for fmt in time_formats:
-            try:
-                parsed_time = datetime.strptime(user_input, fmt)
-                return parsed_time.strftime('%H:%M')
-            except ValueError:
-                continue
-        
-        # Try to extract time using regex
-        time_patterns = [
-            r'(\d{1,2}):(\d{2})(?::(\d{2}))?',  # HH:MM or HH:MM:SS
-            r'(\d{1,2})\s*(\d{2})',             # HH MM
-            r'(\d{1,2})\s*(am|pm)',             # HH AM/PM
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, user_input.lower())
-            if match:
-                try:
-                    if 'am' in user_input.lower() or 'pm' in user_input.lower():
-                        # Handle AM/PM format
-                        hour = int(match.group(1))
-                        period = match.group(2)
-                        if period == 'pm' and hour != 12:
-                            hour += 12
-                        elif period == 'am' and hour == 12:
-                            hour = 0
-                        return f"{hour:02d}:00"
-                    else:
-                        # Handle 24-hour format
-                        hour = int(match.group(1))
-                        minute = int(match.group(2))
-                        return f"{hour:02d}:{minute:02d}"
-                except (ValueError, IndexError):
-                    continue
-        
+        parsed = parse_time(user_input.strip())
+        if parsed:
+            return parsed
         raise ValueError(f"Could not parse time from: '{user_input}'. Please use format HH:MM, 2:30 PM, or similar.")
     
     @staticmethod
@@ -242,24 +123,20 @@ class FieldProcessor:
         # Exact match (case insensitive)
         for option in field_def.options:
             if option.lower() == user_input_lower:
+                metrics.incr("choice_match.exact")
                 return option
         
-        # Partial match
-        for option in field_def.options:
-            if user_input_lower in option.lower() or option.lower() in user_input_lower:
-                return option
-        
-        # Fuzzy match using LLM if available
-        try:
-            # For now, skip LLM matching in synchronous context
-            # In a real implementation, you'd want to make this async or use a different approach
-            options_str = ", ".join(field_def.options)
-            raise ValueError(f"Invalid choice: '{user_input}'. Available options: {options_str}")
-        except Exception as e:
-            print(f"⚠️ PROCESSOR: LLM matching failed, falling back to exact match: {e}")
-            # If LLM fails, raise error with available options
-            options_str = ", ".join(field_def.options)
-            raise ValueError(f"Invalid choice: '{user_input}'. Available options: {options_str}")
+        # Fuzzy match locally (trigrams, token sets, abbreviations)
+        result = match_choice(user_input, field_def.options)
+        if result.option:
+            return result.option
+        
+        # No LLM in the synchronous path: ambiguous answers are sent back with the closest options
+        if result.candidates:
+            options_str = ", ".join(result.candidates)
+            raise ValueError(f"Invalid choice: '{user_input}'. Did you mean one of: {options_str}")
+        options_str = ", ".join(field_def.options)
+        raise ValueError(f"Invalid choice: '{user_input}'. Available options: {options_str}")
     
     @staticmethod
     def _process_multi_choice(user_input: str, field_def: FieldDef) -> List[str]:
@@ -310,7 +187,8 @@ If no option matches well, return "NO_MATCH"."""
             response = await llm_service.generate_non_streaming_response(
                 messages=messages,
                 temperature=0.1,
-                max_tokens=100
+                max_tokens=100,
+                stage="answer"
             )
             
             result = response.content.strip()
@@ -0,0 +1,187 @@
+# app/services/intent_router.py
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.services.catalog_service import CatalogSnapshot, get_catalog_index, register_catalog_index
+from app.utils import metrics
+
+# Decides whether a chat message should start the ticket agent.
+# Two signals, both built once per catalog version:
+# - compiled matchers: explicit ticket phrases ("open a ticket") and catalog ticket-type
+#   names in one alternation regex each, so a message is scanned once per matcher;
+# - a logistic regression over hashed word unigrams/bigrams, trained from catalog text
+#   (ticket types, descriptions, categories), built-in chit-chat and the labeled traffic
+#   in INTENT_EXAMPLES_PATH.
+# Only confident ticket intents start the planner; the uncertain band gets a clarifying turn.
+
+DIM = 4096
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+_TICKET_PHRASE_RE = re.compile(
+    r"\b(?:create|open|file|submit|raise|log|start|make)\s+(?:me\s+)?(?:a\s+|an\s+|new\s+|another\s+)*"
+    r"(?:ticket|request|incident|service\s+request)\b"
+    r"|\b(?:new|support|help|service)\s+(?:ticket|request)\b"
+    r"|\b(?:incident|bug)\s+report\b"
+)
+
+# Questions about a topic ("what does a loan tape contain") rather than requests
+_QUESTION_RE = re.compile(r"^\s*(?:what|what's|whats|how|why|who|when|explain|tell me|can you explain|is there)\b")
+
+# Requests as people phrase them; the catalog supplies what they ask for
+_REQUEST_TEMPLATES = [
+    "{}", "i need a {}", "please {}", "can you {}", "i need help with {}", "request for {}",
+    "we need {} asap", "could you set up {}", "{} for tomorrow please",
+]
+_TICKET_EXAMPLES = [
+    "the payments api is down", "checkout service is not working", "our job failed last night",
+    "something is broken in production", "the nightly batch job didn't run", "users are getting errors on login",
+    "logs are not showing up in datadog", "we need an alert when cpu is high", "set up a dashboard for risk metrics",
+    "rerun the report for yesterday", "please rerun the loan tape", "send the files to the investor over sftp",
+    "we need access to the sftp server", "update the config yaml in prod", "schedule a new jams job",
+    "the transfer to the vendor failed", "need the logs from last week restored", "onboard my team to xmatters",
+    "urgent production issue with the api", "the investor did not receive the report",
+]
+_CHAT_EXAMPLES = [
+    "hi", "hello there", "hey how are you", "good morning", "thanks", "thank you so much", "ok cool",
+    "what can you do", "who are you", "tell me a joke", "what's the weather like today",
+    "explain what kubernetes is", "how does a loan amortization schedule work", "what is sftp",
+    "summarize this paragraph for me", "write a python function to reverse a string",
+    "translate this to spanish", "what time is it", "lol that alert sound is so annoying",
+    "i'm on high alert today haha", "the dashboard looks nice", "did you see the game last night",
+    "how do i center a div in css", "what's the difference between a list and a tuple",
+    "can you help me write an email to my manager", "give me ideas for a team lunch",
+    "what does datadog do", "who won the election", "recommend a good book",
+    "how was your weekend", "never mind", "that's all for now", "bye",
+    "what's a good name for a cat", "explain recursion like i'm five",
+    "is it going to rain", "how many days until friday", "what is an investor",
+    "explain sftp", "what is jams", "how do datadog monitors work in general", "please help me understand this error message",
+    "help me write a sql query", "what's a loan tape", "tell me about xmatters", "how do dashboards work",
+]
+
+def _features(text: str) -> np.ndarray:
+    words = _TOKEN_RE.findall(text.lower())
+    row = np.zeros(DIM, dtype=np.float32)
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        row[zlib.crc32(term.encode("utf-8")) % DIM] = 1.0
+    norm = np.linalg.norm(row)
+    return row / norm if norm else row
+
+def load_intent_examples(path: Optional[str]) -> List[Tuple[str, int]]:
+    """Labeled traffic: one {"text": ..., "label": "ticket" | "chat"} object per line."""
+    if not path or not os.path.exists(path):
+        return []
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("label") in ("ticket", "chat") and record.get("text"):
+                examples.append((str(record["text"]), 1 if record["label"] == "ticket" else 0))
+    return examples
+
+_log_lock = threading.Lock()
+
+def log_intent_example(text: str, label: str) -> None:
+    """Append a labeled message (e.g. the user's answer to a clarifying turn) for the next training run."""
+    path = settings.intent_examples_path
+    if not path:
+        return
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"text": text, "label": label}, ensure_ascii=False) + "\n")
+
+def _catalog_examples(snapshot: CatalogSnapshot) -> List[str]:
+    texts: List[str] = []
+    for (area, category, ticket_type), spec in snapshot.specs.items():
+        name = ticket_type.lower()
+        texts.extend(template.format(name) for template in _REQUEST_TEMPLATES)
+        texts.append(f"{category.lower()} {name}")
+        if spec.get("description"):
+            texts.append(spec["description"])
+    return texts
+
+def _train(x: np.ndarray, y: np.ndarray, epochs: int = 400, lr: float = 10.0, l2: float = 1e-4) -> Tuple[np.ndarray, float]:
+    """Full-batch gradient descent on class-balanced logistic loss."""
+    weights = np.zeros(x.shape[1], dtype=np.float32)
+    bias = 0.0
+    positive = max(1, int(y.sum()))
+    sample_weight = np.where(y == 1, len(y) / (2 * positive), len(y) / (2 * max(1, len(y) - positive))).astype(np.float32)
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        error = (p - y) * sample_weight
+        weights -= lr * ((x.T @ error) / len(y) + l2 * weights)
+        bias -= lr * float(error.mean())
+    return weights, bias
+
+@dataclass
+class IntentResult:
+    label: str                       # "ticket", "unclear" or "chat"
+    confidence: float                # probability that the message asks for a ticket
+    matched: List[str] = field(default_factory=list)   # matcher hits that raised the confidence
+
+    @property
+    def is_ticket(self) -> bool:
+        return self.label == "ticket"
+
+class IntentClassifier:
+    def __init__(self, snapshot: CatalogSnapshot, extra: Iterable[Tuple[str, int]] = ()):
+        names = sorted({key[2].lower() for key in snapshot.specs}, key=len, reverse=True)
+        self._type_re = re.compile(r"\b(?:" + "|".join(re.escape(n) for n in names) + r")\b") if names else None
+
+        positives = _catalog_examples(snapshot) + _TICKET_EXAMPLES
+        examples = [(t, 1) for t in positives] + [(t, 0) for t in _CHAT_EXAMPLES] + list(extra)
+        x = np.vstack([_features(text) for text, _ in examples])
+        y = np.asarray([label for _, label in examples], dtype=np.float32)
+        self.weights, self.bias = _train(x, y)
+        self.trained_on = len(examples)
+
+    def probability(self, text: str) -> float:
+        return float(1.0 / (1.0 + np.exp(-(_features(text) @ self.weights + self.bias))))
+
+    def classify(self, text: str) -> IntentResult:
+        confidence = self.probability(text)
+        matched: List[str] = []
+        lowered = text.lower()
+        ticket_type = self._type_re.search(lowered) if self._type_re else None
+        if ticket_type:
+            # Naming a ticket type halves the doubt; it is not enough on its own
+            matched.append(ticket_type.group(0))
+            confidence = 1 - (1 - confidence) / 2
+        if _QUESTION_RE.match(lowered):
+            confidence *= 0.7
+        phrase = _TICKET_PHRASE_RE.search(lowered)
+        if phrase:
+            matched.append(phrase.group(0))
+            confidence = max(confidence, 0.95)
+
+        if confidence >= settings.intent_ticket_threshold:
+            label = "ticket"
+        elif confidence >= settings.intent_clarify_threshold:
+            label = "unclear"
+        else:
+            label = "chat"
+        return IntentResult(label, confidence, matched)
+
+def _build_classifier(snapshot: CatalogSnapshot) -> IntentClassifier:
+    classifier = IntentClassifier(snapshot, load_intent_examples(settings.intent_examples_path))
+    print(f"🧭 INTENT: Trained intent classifier on {classifier.trained_on} examples")
+    return classifier
+
+register_catalog_index("intent_classifier", _build_classifier)
+
+def classify_intent(text: str, version: Optional[str] = None) -> IntentResult:
+    classifier: IntentClassifier = get_catalog_index("intent_classifier", version)
+    result = classifier.classify(text)
+    metrics.incr(f"intent.{result.label}")
+    print(f"🧭 INTENT: '{text[:60]}' -> {result.label} ({result.confidence:.2f}{', ' + ', '.join(result.matched) if result.matched else ''})")
+    return result
+
+CLARIFY_QUESTION = "Would you like me to open a ticket for this? (yes/no)"
@@ -13,6 +13,7 @@ from typing import AsyncGenerator, Dict, List, Optional, Any
 from pydantic import BaseModel
 import httpx
 from app.config import settings
+from app.utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,41 @@ class LLMResponse(BaseModel):
     model: str
     usage: Optional[Dict[str, Any]] = None
 
+def ollama_usage(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Token counts and timings from an Ollama response. prompt_eval_count only covers prompt
+    tokens that were actually evaluated, so a reused prefix shows up as a small count.
+    """
+    if "prompt_eval_count" not in data and "eval_count" not in data:
+        return data.get("usage")
+    ms = lambda key: round(data.get(key, 0) / 1e6, 1)   # Ollama reports nanoseconds
+    return {
+        "prompt_tokens": data.get("prompt_eval_count", 0),
+        "completion_tokens": data.get("eval_count", 0),
+        "prompt_eval_count": data.get("prompt_eval_count", 0),
+        "eval_count": data.get("eval_count", 0),
+        "prompt_eval_ms": ms("prompt_eval_duration"),
+        "eval_ms": ms("eval_duration"),
+        "load_ms": ms("load_duration"),
+        "total_ms": ms("total_duration"),
+    }
+
+def record_llm_usage(stage: Optional[str], usage: Optional[Dict[str, Any]]) -> None:
+    """Per-stage prompt vs completion token metrics (GET /api/metrics)."""
+    stage = stage or "other"
+    metrics.incr(f"llm.{stage}.calls")
+    if not usage:
+        return
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    completion_tokens = usage.get("completion_tokens") or 0
+    metrics.incr(f"llm.{stage}.prompt_tokens", prompt_tokens)
+    metrics.incr(f"llm.{stage}.completion_tokens", completion_tokens)
+    metrics.observe(f"llm.{stage}.prompt_eval_count", prompt_tokens)
+    metrics.observe(f"llm.{stage}.eval_count", completion_tokens)
+    if "prompt_eval_ms" in usage:
+        metrics.observe(f"llm.{stage}.prompt_eval_ms", usage["prompt_eval_ms"])
+        metrics.observe(f"llm.{stage}.eval_ms", usage["eval_ms"])
+
 class LLMService:
     def __init__(self):
         self.provider = settings.llm_provider
@@ -160,6 +196,9 @@ class LLMService:
                 "num_predict": max_tokens
             }
         }
+        if settings.ollama_keep_alive:
+            # Keeps the model (and the KV cache of the last prompt prefix) loaded between calls
+            payload["keep_alive"] = settings.ollama_keep_alive
         
         logger.info(f"Ollama request: model='{model}', messages={len(ollama_messages)}")
         
@@ -180,6 +219,8 @@ class LLMService:
                     if line.strip():
                         try:
                             data = json.loads(line)
+                            if data.get("done"):
+                                record_llm_usage("chat", ollama_usage(data))
                             if "message" in data and "content" in data["message"]:
                                 content = data["message"]["content"]
                                 if content:
@@ -269,21 +310,27 @@ class LLMService:
         messages: List[Message], 
         model: Optional[str] = None,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        stage: Optional[str] = None
     ) -> LLMResponse:
-        """Generate non-streaming response from the active provider"""
+        """
+        Generate non-streaming response from the active provider.
+        `stage` ("planner", "prefill", "summary", ...) labels the token metrics.
+        """
         model = model or self.model
         temperature = temperature or self.temperature
         max_tokens = max_tokens or self.max_tokens
         
         if self.provider == "ollama":
-            return await self._generate_ollama_non_streaming_response(messages, model, temperature, max_tokens)
+            response = await self._generate_ollama_non_streaming_response(messages, model, temperature, max_tokens)
         elif self.provider == "openai":
-            return await self._generate_openai_non_streaming_response(messages, model, temperature, max_tokens)
+            response = await self._generate_openai_non_streaming_response(messages, model, temperature, max_tokens)
         else:
             error_msg = f"Unsupported provider: {self.provider}"
             logger.error(error_msg)
             return LLMResponse(content=f"Error: {error_msg}", model=model)
+        record_llm_usage(stage, response.usage)
+        return response
     
     async def _generate_ollama_non_streaming_response(
         self, 
@@ -310,6 +357,9 @@ class LLMService:
                 "num_predict": max_tokens
             }
         }
+        if settings.ollama_keep_alive:
+            # Keeps the model (and the KV cache of the last prompt prefix) loaded between calls
+            payload["keep_alive"] = settings.ollama_keep_alive
         
         try:
             response = await self.client.post(
@@ -323,7 +373,7 @@ class LLMService:
                 return LLMResponse(
                     content=data.get("message", {}).get("content", ""),
                     model=model,
-                    usage=data.get("usage")
+                    usage=ollama_usage(data)
                 )
             else:
                 error_msg = f"Ollama API error: {response.status_code}"
@@ -419,7 +469,7 @@ class LLMService:
 llm_service = LLMService()
 
 # Add synchronous chat function for the planner service
-def chat(messages: list[dict], *, model: str, format: str | None = None, options: dict | None = None) -> str:
+def chat(messages: list[dict], *, model: str, format: str | None = None, options: dict | None = None, stage: str | None = None) -> str:
     """
     Call Ollama's /api/chat and return the message content as a string.
     If format='json', return the raw JSON string (not prettified).
@@ -449,7 +499,8 @@ def chat(messages: list[dict], *, model: str, format: str | None = None, options
                 messages=message_objects,
                 model=model,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                stage=stage
             )
             print(f"📥 LLM: Got response: {response.content[:100]}...")
             return response.content
@@ -475,7 +526,8 @@ def chat(messages: list[dict], *, model: str, format: str | None = None, options
                 messages=message_objects,
                 model=model,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                stage=stage
             )
             print(f"📥 LLM: Got response: {response.content[:100]}...")
             return response.content
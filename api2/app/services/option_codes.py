@@ -0,0 +1,88 @@
+# app/services/option_codes.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from app.services.catalog_service import resolve_field_options
+from app.services.choice_matcher import match_choice
+from app.utils import metrics
+
+# Index-coded options for LLM prompts (PREFILL_OPTION_ENCODING=index).
+# Choice options are listed as short numbers, words every option ends with are written
+# once, and the model answers with numbers, so long names like
+# "Davidson and Kempner Estimated Loan Tape" cost a few tokens instead of a dozen each way.
+
+OPTION_CODES_INSTRUCTIONS = """
+OPTION CODES:
+- Options are listed as numbers ("3: Pimco Final"). For choice fields return the NUMBER of the option (e.g. 3), for multi_choice fields a list of numbers (e.g. [1, 4]).
+- When a field says every option ends with some words, those words are part of the option; still return only the number.
+- Never return option text for choice fields, and never invent numbers that are not listed.
+"""
+
+def _common_suffix(options: List[str]) -> str:
+    """Words every option ends with ("Final Loan Tape", "Estimated Loan Tape" -> "Loan Tape")."""
+    if len(options) < 2:
+        return ""
+    split = [o.split() for o in options]
+    suffix: List[str] = []
+    for words in zip(*(reversed(s) for s in split)):
+        if len(set(words)) != 1:
+            break
+        suffix.insert(0, words[0])
+    # Keep at least one word of every option
+    while suffix and any(len(s) <= len(suffix) for s in split):
+        suffix.pop(0)
+    return " ".join(suffix)
+
+def render_coded_options(options: List[str]) -> List[str]:
+    """Prompt lines for one option set in code form."""
+    suffix = _common_suffix(options)
+    cut = len(suffix) + 1 if suffix else 0
+    lines = [f'Options (every option ends with "{suffix}"):' if suffix else "Options:"]
+    lines.append("; ".join(f"{i}: {o[:-cut] if cut else o}" for i, o in enumerate(options, 1)))
+    return lines
+
+def _decode_one(value: Any, options: List[str], field_name: str) -> Optional[str]:
+    if isinstance(value, bool):
+        return None
+    code = value if isinstance(value, int) else None
+    if isinstance(value, str):
+        stripped = value.strip().rstrip(".").lstrip("#")
+        if stripped.isdigit():
+            code = int(stripped)
+        elif value in options:
+            return value                          # the model answered with the text anyway
+        else:
+            result = match_choice(value, options)
+            if result.source in ("exact", "local"):
+                return result.option
+    if code is not None and 1 <= code <= len(options):
+        return options[code - 1]
+    print(f"⚠️ OPTION_CODES: Dropping invalid value {value!r} for {field_name}")
+    metrics.incr("prefill.invalid_option_code")
+    return None
+
+def decode_option_codes(form_data: Dict[str, Any], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map codes in an LLM answer back to option text and validate them against the spec.
+    Values that don't name a listed option are dropped, so the user is asked instead.
+    """
+    decoded = dict(form_data)
+    for field in spec.get("fields", []):
+        name = field.get("name")
+        if name not in decoded or field.get("type") not in ("choice", "multi_choice"):
+            continue
+        options = resolve_field_options(field)
+        if not options:
+            continue
+        value = decoded.pop(name)
+        if field["type"] == "multi_choice":
+            values = value if isinstance(value, list) else [value]
+            chosen = [o for o in (_decode_one(v, options, name) for v in values) if o]
+            if chosen:
+                decoded[name] = list(dict.fromkeys(chosen))
+        else:
+            if isinstance(value, list) and len(value) == 1:
+                value = value[0]
+            option = _decode_one(value, options, name)
+            if option:
+                decoded[name] = option
+    return decoded
@@ -0,0 +1,161 @@
+# app/services/option_index.py
+from __future__ import annotations
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from app.services.catalog_service import (
+    CatalogSnapshot,
+    get_catalog_index,
+    get_catalog_snapshot,
+    register_catalog_index,
+    resolve_field_options,
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_PREFIX_LEN = 12          # longer query tokens are matched on their first 12 characters
+MIN_TRIGRAM_OVERLAP = 0.5    # share of a query token's trigrams an option must contain
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def options_fingerprint(options: List[str]) -> str:
+    return hashlib.sha1("\x1f".join(options).encode("utf-8")).hexdigest()[:12]
+
+class OptionIndex:
+    """
+    Prefix + trigram index over one option list, built once and queried many times.
+    - Prefix map: every leading slice of every word -> option ids ("goan" finds "GoAnywhere").
+    - Trigram map: fallback for typos and mid-word fragments ("stonridge" still finds "Stoneridge").
+    Results keep the catalog order among equally scored options.
+    """
+    def __init__(self, options: List[str]):
+        self.options = list(options)
+        self.fingerprint = options_fingerprint(self.options)
+        self._lowered = [o.lower() for o in self.options]
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        for i, option in enumerate(self.options):
+            for token in _tokens(option):
+                for n in range(1, min(len(token), MAX_PREFIX_LEN) + 1):
+                    self._prefixes.setdefault(token[:n], set()).add(i)
+                for gram in _trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _token_scores(self, token: str) -> Dict[int, float]:
+        """Score every option against one query token: 1.0 for a word prefix, else trigram overlap."""
+        scores: Dict[int, float] = {i: 1.0 for i in self._prefixes.get(token[:MAX_PREFIX_LEN], ())}
+        if len(token) < 4 or token.isdigit():
+            # Short words and numbers (years, series ids) only match as prefixes
+            return scores
+        grams = _trigrams(token)
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._trigrams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        for i, count in counts.items():
+            overlap = count / len(grams)
+            if overlap >= MIN_TRIGRAM_OVERLAP and overlap * 0.9 > scores.get(i, 0.0):
+                scores[i] = overlap * 0.9
+        return scores
+
+    def search(self, query: str, limit: int = 10) -> Tuple[List[str], int]:
+        """Return (top `limit` matching options, total number of matches)."""
+        tokens = _tokens(query or "")
+        if not tokens:
+            return self.options[:limit], len(self.options)
+
+        totals: Optional[Dict[int, float]] = None
+        for token in tokens:
+            scores = self._token_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                # Every query word has to match something in the option
+                totals = {i: totals[i] + s for i, s in scores.items() if i in totals}
+            if not totals:
+                return [], 0
+
+        needle = " ".join(tokens)
+        ranked = sorted(
+            totals.items(),
+            key=lambda kv: (-(kv[1] + (0.5 if self._lowered[kv[0]].startswith(needle) else 0.0)), kv[0]),
+        )
+        return [self.options[i] for i, _ in ranked[:limit]], len(ranked)
+
+class OptionSetCache:
+    """
+    Bounded LRU of structures built from an option list (search indexes, matchers, ...),
+    keyed by the list's content so an unchanged set is never rebuilt - even when it comes
+    from an options_source that refreshed, or from a newer catalog version.
+    """
+    def __init__(self, factory: Callable[[List[str]], Any], max_entries: int = 64):
+        self.factory = factory
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, options: List[str]) -> Any:
+        key = options_fingerprint(options)
+        with self._lock:
+            built = self._entries.get(key)
+            if built is not None:
+                self._entries.move_to_end(key)
+                return built
+        built = self.factory(options)
+        with self._lock:
+            self._entries[key] = built
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return built
+
+_option_indexes = OptionSetCache(OptionIndex)
+
+def get_option_index(options: List[str]) -> OptionIndex:
+    return _option_indexes.get(options)
+
+def _build_option_search(snapshot: CatalogSnapshot) -> Dict[Tuple[str, str], OptionIndex]:
+    """Index every choice field of a catalog version by (ticket_type, field_name)."""
+    indexes: Dict[Tuple[str, str], OptionIndex] = {}
+    for (_, _, ticket_type), spec in snapshot.specs.items():
+        for raw in spec.get("fields", []):
+            if raw.get("type") not in ("choice", "multi_choice"):
+                continue
+            options = resolve_field_options(raw)
+            if options:
+                indexes[(ticket_type, raw["name"])] = get_option_index(options)
+    return indexes
+
+register_catalog_index("option_search", _build_option_search)
+
+def find_field_option_index(ticket_type: str, field_name: str, version: Optional[str] = None) -> Optional[OptionIndex]:
+    """
+    Return the search index for a ticket type's choice field, or None if there is no such field.
+    Fields backed by an options_source are re-indexed when their options have refreshed.
+    """
+    snapshot = get_catalog_snapshot(version)
+    raw = next(
+        (
+            f
+            for (_, _, tt), spec in snapshot.specs.items() if tt == ticket_type
+            for f in spec.get("fields", []) if f.get("name") == field_name
+        ),
+        None,
+    )
+    if raw is None or raw.get("type") not in ("choice", "multi_choice"):
+        return None
+
+    index = (get_catalog_index("option_search", version) or {}).get((ticket_type, field_name))
+    if raw.get("options_source"):
+        options = resolve_field_options(raw)
+        if index is None or options_fingerprint(options) != index.fingerprint:
+            index = get_option_index(options)
+    return index or get_option_index([])
@@ -0,0 +1,289 @@
+# app/services/option_providers.py
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+from app.config import settings
+from app.services.catalog_service import CatalogSnapshot, register_catalog_index
+
+logger = logging.getLogger(__name__)
+
+class OptionProvider(ABC):
+    """
+    Fetches the option list behind one `options_source` string.
+    Sources look like "<scheme>:<target>", e.g.:
+      catalog:VENDORS_LOAN_TAPE          -> a list constant in app/catalog.py
+      file:data/investors.json           -> JSON list (or {"options": [...]}), YAML list, or one option per line
+      sql:investors.name                 -> SELECT DISTINCT name FROM investors
+      https://ref-data.internal/vendors  -> JSON list (or {"options": [...]}) from an HTTP endpoint
+    """
+    def __init__(self, target: str):
+        self.target = target
+
+    @abstractmethod
+    def fetch(self) -> List[str]:
+        ...
+
+def _as_option_list(data, source: str) -> List[str]:
+    if isinstance(data, dict):
+        data = data.get("options")
+    if not isinstance(data, list):
+        raise ValueError(f"Options source '{source}' did not return a list")
+    return [str(option) for option in data if str(option).strip()]
+
+class CatalogConstantProvider(OptionProvider):
+    """Options defined as list constants in app/catalog.py"""
+    def fetch(self) -> List[str]:
+        from app import catalog
+        return _as_option_list(getattr(catalog, self.target, None), f"catalog:{self.target}")
+
+class FileOptionProvider(OptionProvider):
+    """Options stored in a local JSON/YAML/text file"""
+    def fetch(self) -> List[str]:
+        ext = os.path.splitext(self.target)[1].lower()
+        with open(self.target, "r", encoding="utf-8") as f:
+            if ext == ".json":
+                return _as_option_list(json.load(f), self.target)
+            if ext in (".yaml", ".yml"):
+                import yaml
+                return _as_option_list(yaml.safe_load(f), self.target)
+            return [line.strip() for line in f if line.strip()]
+
+_SQL_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+class SQLOptionProvider(OptionProvider):
+    """Options stored in a column of a database table: sql:<table>.<column>"""
+    def fetch(self) -> List[str]:
+        from sqlalchemy import text
+        from app.models import engine
+        table, _, column = self.target.partition(".")
+        if not (_SQL_IDENTIFIER.match(table) and _SQL_IDENTIFIER.match(column)):
+            raise ValueError(f"Invalid sql options source '{self.target}', expected <table>.<column>")
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}"))
+            return [str(row[0]) for row in rows]
+
+class HTTPOptionProvider(OptionProvider):
+    """
+    Options served by an HTTP endpoint. When OPTIONS_HTTP_STANDIN_DIR is set the
+    endpoint is never called; a local JSON file named after the URL stands in for it.
+    """
+    def standin_path(self) -> str:
+        name = re.sub(r"[^A-Za-z0-9]+", "_", self.target.split("://", 1)[-1]).strip("_")
+        return os.path.join(settings.options_http_standin_dir, f"{name}.json")
+
+    def fetch(self) -> List[str]:
+        if settings.options_http_standin_dir:
+            return FileOptionProvider(self.standin_path()).fetch()
+        import httpx
+        response = httpx.get(self.target, timeout=settings.options_http_timeout)
+        response.raise_for_status()
+        return _as_option_list(response.json(), self.target)
+
+_PROVIDER_FACTORIES: Dict[str, Callable[[str], OptionProvider]] = {
+    "catalog": CatalogConstantProvider,
+    "file": FileOptionProvider,
+    "sql": SQLOptionProvider,
+    "http": lambda target: HTTPOptionProvider(f"http:{target}"),
+    "https": lambda target: HTTPOptionProvider(f"https:{target}"),
+}
+
+def register_option_provider(scheme: str, factory: Callable[[str], OptionProvider]) -> None:
+    """Plug in a new options_source scheme, e.g. register_option_provider("s3", S3OptionProvider)."""
+    _PROVIDER_FACTORIES[scheme] = factory
+
+def build_provider(source: str) -> OptionProvider:
+    scheme, sep, target = source.partition(":")
+    if not sep or scheme not in _PROVIDER_FACTORIES:
+        raise ValueError(f"Unknown options source '{source}'")
+    return _PROVIDER_FACTORIES[scheme](target)
+
+# Refreshes run here so the request path never waits on a provider
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="options-refresh")
+
+class CachedOptionSource:
+    """
+    TTL cache in front of one provider.
+    - Fresh value: returned as is.
+    - Stale value: returned as is while a single background refresh runs (stale-while-revalidate).
+    - No value yet: returns the inline fallback and refreshes in the background; with no
+      fallback, callers block on one shared load instead of each fetching. Async code loads
+      through load_async() (see load_field_options_async) so the event loop never waits.
+    Loads and refreshes share one lock, so a source is fetched once at a time (single-flight).
+    A failed refresh keeps serving the last good value. A failed load with nothing cached
+    is remembered for OPTIONS_RETRY_SECONDS: until then callers get the fallback (or no
+    options) without fetching again.
+    """
+    def __init__(self, source: str, provider: OptionProvider, ttl: float):
+        self.source = source
+        self.provider = provider
+        self.ttl = ttl
+        self.value: Optional[List[str]] = None
+        self.fetched_at = 0.0
+        self.failed_at: Optional[float] = None   # last failed load while nothing was cached
+        self.last_error: Optional[str] = None
+        self.stats = {"hits": 0, "stale": 0, "cold": 0, "refreshes": 0, "errors": 0, "backoff": 0}
+        self._lock = threading.Lock()            # held while fetching
+        self._state_lock = threading.Lock()      # guards _refreshing only, never held during a fetch
+        self._refreshing = False
+
+    def retry_pending(self) -> bool:
+        """True while a recent failed load says not to fetch again yet."""
+        return self.failed_at is not None and time.monotonic() - self.failed_at < settings.options_retry_seconds
+
+    def get(self, fallback: Optional[List[str]] = None) -> List[str]:
+        if self.value is None:
+            self.stats["cold"] += 1
+            if self.retry_pending():
+                self.stats["backoff"] += 1
+                return fallback or []
+            if fallback:
+                self.refresh_in_background()
+                return fallback
+            return self.load()
+
+        value = self.value
+        if time.monotonic() - self.fetched_at > self.ttl:
+            self.stats["stale"] += 1
+            self.refresh_in_background()
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    def refresh_in_background(self) -> Optional[Future]:
+        """Schedule one refresh; returns its future, or None when one is already running."""
+        with self._state_lock:
+            if self._refreshing:
+                return None
+            self._refreshing = True
+        return _refresh_executor.submit(self._refresh, time.monotonic())
+
+    def _refresh(self, requested_at: float) -> None:
+        try:
+            with self._lock:
+                # A load that finished while we waited for the lock already did the work
+                if self.value is None or self.fetched_at < requested_at:
+                    self._fetch()
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def load(self) -> List[str]:
+        """Blocking load for a cold cache; concurrent callers share one fetch."""
+        with self._lock:
+            if self.value is None and not self.retry_pending():
+                self._fetch()
+        return self.value or []
+
+    async def load_async(self) -> List[str]:
+        if self.value is not None:
+            return self.value
+        if self.retry_pending():
+            self.stats["backoff"] += 1
+            return []
+        return await asyncio.to_thread(self.load)
+
+    def _fetch(self) -> None:
+        try:
+            options = self.provider.fetch()
+            self.value = options
+            self.fetched_at = time.monotonic()
+            self.failed_at = None
+            self.last_error = None
+            self.stats["refreshes"] += 1
+            print(f"🔄 OPTIONS: Loaded {len(options)} options from {self.source}")
+        except Exception as e:
+            self.last_error = str(e)
+            self.stats["errors"] += 1
+            if self.value is None:
+                self.failed_at = time.monotonic()
+            logger.error(f"Failed to load options from {self.source}: {e}")
+
+    def info(self) -> dict:
+        return {
+            "source": self.source,
+            "loaded": self.value is not None,
+            "count": len(self.value or []),
+            "age_seconds": round(time.monotonic() - self.fetched_at, 1) if self.value is not None else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+_sources: Dict[str, CachedOptionSource] = {}
+_sources_lock = threading.Lock()
+
+def get_option_source(source: str) -> CachedOptionSource:
+    cached = _sources.get(source)
+    if cached is None:
+        with _sources_lock:
+            cached = _sources.get(source)
+            if cached is None:
+                cached = CachedOptionSource(source, build_provider(source), settings.options_cache_ttl_seconds)
+                _sources[source] = cached
+    return cached
+
+def resolve_options_source(source: str, fallback: Optional[List[str]] = None) -> List[str]:
+    """Resolve an options_source to its option list without blocking on a refresh."""
+    try:
+        return get_option_source(source).get(fallback)
+    except ValueError as e:
+        logger.error(str(e))
+        return fallback or []
+
+async def load_field_options_async(fields: Iterable[dict]) -> None:
+    """
+    Load the options_source of every field that has no value yet and no inline fallback,
+    off the event loop, so resolve_field_options() on those fields answers from the cache.
+    """
+    cold = []
+    for field in fields:
+        source = field.get("options_source")
+        if not source or isinstance(field.get("options"), list):
+            continue
+        try:
+            cached = get_option_source(source)
+        except ValueError as e:
+            logger.error(str(e))
+            continue
+        if cached.value is None:
+            cold.append(cached)
+    if cold:
+        await asyncio.gather(*(cached.load_async() for cached in cold))
+
+def get_option_source_stats() -> List[dict]:
+    return [cached.info() for cached in list(_sources.values())]
+
+def _warm_option_sources(snapshot: CatalogSnapshot) -> List[str]:
+    """
+    Load every options_source in a catalog version as soon as it is loaded. Catalog loads
+    run at import or in a worker thread, so cold sources are waited for (up to
+    OPTIONS_HTTP_TIMEOUT) and requests rarely find an empty cache.
+    """
+    sources = sorted({
+        raw["options_source"]
+        for spec in snapshot.specs.values()
+        for raw in spec.get("fields", [])
+        if raw.get("options_source")
+    })
+    pending = []
+    for source in sources:
+        try:
+            cached = get_option_source(source)
+            if cached.value is None:
+                future = cached.refresh_in_background()
+                if future is not None:
+                    pending.append(future)
+        except ValueError as e:
+            logger.error(str(e))
+    if pending:
+        wait(pending, timeout=settings.options_http_timeout)
+    return sources
+
+register_catalog_index("option_sources", _warm_option_sources)
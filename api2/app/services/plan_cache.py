@@ -0,0 +1,127 @@
+# app/services/plan_cache.py
+from __future__ import annotations
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.models.ticket_agent import TicketPlan
+from app.services.catalog_service import CatalogSnapshot, on_catalog_reload
+from app.services.date_parser import parse_date_range, reference_today
+from app.utils import metrics
+
+# Memoized plans for repeat requests ("final loan tape for AAA").
+# Key: (normalized request text, catalog version, date bucket). The date bucket is today's
+# date only when the text holds a date, so "loan tape for AAA" is shared across days while
+# "rerun from july 18 to tomorrow" is not. Entries are stored without user-specific values
+# (the requester's email), which are re-applied for whoever hits the entry.
+
+PlanKey = Tuple[str, str, str]
+
+_PUNCTUATION_RE = re.compile(r"[^\w@./:-]+")
+
+def normalize_request(text: str) -> str:
+    """Case, whitespace and punctuation don't change a plan."""
+    words = (w.strip("./:-") for w in _PUNCTUATION_RE.sub(" ", text.lower()).split())
+    return " ".join(w for w in words if w)
+
+def plan_cache_key(user_text: str, catalog_version: str) -> PlanKey:
+    normalized = normalize_request(user_text)
+    date_bucket = reference_today().isoformat() if parse_date_range(user_text) else ""
+    return normalized, catalog_version, date_bucket
+
+@dataclass
+class _Entry:
+    plan: dict                              # TicketPlan dump without user-specific values
+    user_fields: List[Tuple[int, str]]      # (item index, field name) to refill with the requester's email
+    stored_at: float
+
+class PlanCache:
+    """
+    Limits left as None follow PLAN_CACHE_MAX_ENTRIES / PLAN_CACHE_TTL_SECONDS as they are
+    when used, so POST /api/config/reload applies to the shared cache too.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[PlanKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entries(self) -> int:
+        return settings.plan_cache_max_entries if self._max_entries is None else self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, value: Optional[int]) -> None:
+        self._max_entries = value
+
+    @property
+    def ttl_seconds(self) -> float:
+        return settings.plan_cache_ttl_seconds if self._ttl_seconds is None else self._ttl_seconds
+
+    @ttl_seconds.setter
+    def ttl_seconds(self, value: Optional[float]) -> None:
+        self._ttl_seconds = value
+
+    def get(self, key: PlanKey, user_text: str, user_email: Optional[str]) -> Optional[TicketPlan]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.stored_at > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+
+        plan = TicketPlan.model_validate(entry.plan)   # fresh copy; sessions mutate their plans
+        plan.meta = {**plan.meta, "request_text": user_text}
+        for index, name in entry.user_fields:
+            if user_email:
+                item = plan.items[index]
+                item.form[name] = user_email
+                item.field_sources[name] = {"source": "rule", "rule": "email", "confidence": 1.0}
+        return plan
+
+    def put(self, key: PlanKey, plan: TicketPlan, user_email: Optional[str]) -> None:
+        data = plan.model_dump()
+        user_fields: List[Tuple[int, str]] = []
+        for index, item in enumerate(data["items"]):
+            for name in list(item["form"]):
+                if name == "email" and (user_email is None or item["form"][name] == user_email):
+                    item["form"].pop(name)
+                    item["field_sources"].pop(name, None)
+                    user_fields.append((index, name))
+        with self._lock:
+            self._entries[key] = _Entry(data, user_fields, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_plan_cache = PlanCache()
+
+def get_cached_plan(user_text: str, catalog_version: str, user_email: Optional[str] = None) -> Optional[TicketPlan]:
+    if settings.plan_cache_ttl_seconds <= 0:
+        return None
+    plan = _plan_cache.get(plan_cache_key(user_text, catalog_version), user_text, user_email)
+    metrics.incr("plan_cache.hit" if plan else "plan_cache.miss")
+    return plan
+
+def store_plan(user_text: str, plan: TicketPlan, user_email: Optional[str] = None) -> None:
+    if settings.plan_cache_ttl_seconds <= 0 or not plan.items or not plan.catalog_version:
+        return
+    _plan_cache.put(plan_cache_key(user_text, plan.catalog_version), plan, user_email)
+
+def clear_plan_cache(snapshot: Optional[CatalogSnapshot] = None) -> None:
+    _plan_cache.clear()
+
+on_catalog_reload(clear_plan_cache)
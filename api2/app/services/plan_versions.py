@@ -0,0 +1,106 @@
+# app/services/plan_versions.py
+from __future__ import annotations
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import SessionLocal
+from app.models.plan_snapshot import PlanSnapshot
+from app.models.ticket_agent import ConversationState
+from app.utils import metrics
+from app.utils.json_patch import make_patch
+
+# Versioned plans for agent sessions. Each turn that changes the plan bumps
+# state.plan_version and keeps a snapshot of the last PLAN_HISTORY_SIZE versions, so a
+# turn can send an RFC 6902 patch against the version the client already has instead
+# of the whole plan. Clients that don't have a kept version get a full snapshot.
+# Versions only live as long as the session; the final plan of a completed session is
+# persisted as a PlanSnapshot row, and the completion message links to that instead.
+
+logger = logging.getLogger(__name__)
+
+def commit_plan_version(state: ConversationState) -> int:
+    """Snapshot the current plan as a new version if it changed; returns the current version."""
+    if state.plan is None:
+        return state.plan_version
+    dump = state.plan.model_dump(mode="json")
+    if state.plan_snapshots.get(state.plan_version) == dump:
+        return state.plan_version
+    state.plan_version += 1
+    state.plan_snapshots[state.plan_version] = dump
+    for old in sorted(state.plan_snapshots)[:-max(1, settings.plan_history_size)]:
+        del state.plan_snapshots[old]
+    return state.plan_version
+
+def plan_update(state: ConversationState, known_version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Response fields for the plan of a turn. `known_version` is the version the client
+    has (default: the last one sent to it). Returns "plan_version" plus either
+    "plan_patch" / "plan_base_version", or the full plan as "plan_preview".
+    """
+    version = commit_plan_version(state)
+    if known_version is None:
+        known_version = state.plan_version_sent
+    state.plan_version_sent = version
+
+    base = state.plan_snapshots.get(known_version) if known_version is not None else None
+    if base is not None:
+        metrics.incr("plan_update.patch")
+        return {
+            "plan_version": version,
+            "plan_base_version": known_version,
+            "plan_patch": make_patch(base, state.plan_snapshots[version]),
+        }
+    metrics.incr("plan_update.snapshot")
+    return {"plan_version": version, "plan_preview": state.plan_snapshots.get(version)}
+
+def get_plan_version(state: ConversationState, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """A kept plan version (the current one by default), or None when it is no longer kept."""
+    commit_plan_version(state)
+    return state.plan_snapshots.get(state.plan_version if version is None else version)
+
+def plan_reference(session_id: str, version: int) -> str:
+    return f"/api/agent-sessions/{session_id}/plan?version={version}"
+
+def persist_final_plan(state: ConversationState, db: Optional[Session] = None) -> Optional[str]:
+    """
+    Store the current plan of a completed session; returns the snapshot id, or None when
+    it could not be saved (ticket creation does not fail over it).
+    """
+    if state.plan is None:
+        return None
+    version = commit_plan_version(state)
+    conversation_id = None
+    if state.session_id.startswith("conv_"):
+        try:
+            conversation_id = int(state.session_id[len("conv_"):])
+        except ValueError:
+            pass
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        snapshot = PlanSnapshot(
+            id=uuid.uuid4().hex,
+            conversation_id=conversation_id,
+            session_id=state.session_id,
+            plan_version=version,
+            plan=json.dumps(state.plan_snapshots[version]),
+        )
+        db.add(snapshot)
+        db.commit()
+        metrics.incr("plan_snapshot.saved")
+        return snapshot.id
+    except SQLAlchemyError as e:
+        db.rollback()
+        metrics.incr("plan_snapshot.failed")
+        logger.error(f"Could not persist the final plan of {state.session_id}: {e}")
+        return None
+    finally:
+        if own_session:
+            db.close()
+
+def final_plan_reference(snapshot_id: str) -> str:
+    return f"/api/plans/{snapshot_id}"
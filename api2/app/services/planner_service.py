@@ -2,7 +2,9 @@
 from __future__ import annotations
 import json
 from typing import Dict
-from app.services.catalog_service import slice_catalog_for_prompt
+from app.services.catalog_service import slice_catalog_for_prompt, slice_catalog_for_prompt_async, get_catalog_version
+from app.services.plan_cache import get_cached_plan, store_plan
+from app.services.prompt_fragments import planner_catalog_json
 from app.models.ticket_agent import TicketPlan
 from app.services.llm_service import chat  # <-- existing Ollama wrapper
 
@@ -59,20 +61,30 @@ async def plan_from_text_async(user_text: str, user_email: str = None) -> Ticket
     # STEP 1: Identify tickets (without field prefilling)
     print(f"📋 PLANNER: Step 1 - Identifying ticket types...")
     
-    cat_slice = slice_catalog_for_prompt(user_text)
-    print(f"📋 PLANNER: Catalog slice has {len(cat_slice.get('service_areas', []))} service areas")
+    # Pin the catalog version so later turns resolve specs against the same catalog
+    catalog_version = get_catalog_version()
 
-    # Add user email context if available (for reference only - field prefilling happens separately)
+    # Repeat requests reuse the identified tickets and prefill values
+    cached_plan = get_cached_plan(user_text, catalog_version, user_email)
+    if cached_plan is not None:
+        print(f"⚡ PLANNER: Plan cache hit, {len(cached_plan.items)} ticket items")
+        return cached_plan
+
+    cat_slice = await slice_catalog_for_prompt_async(user_text, catalog_version)
+    print(f"📋 PLANNER: Catalog slice has {sum(len(specs) for cats in cat_slice.values() for specs in cats.values())} ticket types")
+
+    # Add user email context if available (for reference only - field prefilling happens separately).
+    # It goes after the user text so the system prompt and catalog slice stay a reusable prefix.
     user_context = ""
     if user_email:
         user_context = f"\n\nUSER EMAIL: {user_email}"
 
     messages = [
-        {"role": "system", "content": SYSTEM_PLAN + user_context},
+        {"role": "system", "content": SYSTEM_PLAN},
         # Put the catalog slice as JSON in the assistant "context" turn,
         # so the model can see the allowed categories/ticket types/fields.
-        {"role": "assistant", "content": json.dumps({"catalog": cat_slice})},
-        {"role": "user", "content": user_text}
+        {"role": "assistant", "content": planner_catalog_json(cat_slice, catalog_version)},
+        {"role": "user", "content": user_text + user_context}
     ]
 
     print(f"🤖 PLANNER: Calling LLM for ticket identification with {len(messages)} messages")
@@ -88,7 +100,8 @@ async def plan_from_text_async(user_text: str, user_email: str = None) -> Ticket
             messages=message_objects,
             model="llama3:8b",  # Use the actual model name
             temperature=0.2,
-            max_tokens=4096
+            max_tokens=4096,
+            stage="planner"
         )
         
         raw = response.content
@@ -129,6 +142,7 @@ async def plan_from_text_async(user_text: str, user_email: str = None) -> Ticket
             data = json.loads(raw)
             print(f"✅ PLANNER: Successfully parsed JSON, creating initial TicketPlan")
             initial_plan = TicketPlan(**data)
+            initial_plan.catalog_version = catalog_version
             
             # STEP 2: Prefill fields using specialized field prefiller
             print(f"🔧 PLANNER: Step 2 - Prefilling fields using specialized service...")
@@ -137,6 +151,7 @@ async def plan_from_text_async(user_text: str, user_email: str = None) -> Ticket
             final_plan = await prefill_plan_fields_async(initial_plan, user_text, user_email)
             print(f"✅ PLANNER: Completed two-step process - tickets identified and fields prefilled")
             
+            store_plan(user_text, final_plan, user_email)
             return final_plan
             
         except json.JSONDecodeError as e:
@@ -160,20 +175,23 @@ def plan_from_text(user_text: str, user_email: str = None) -> TicketPlan:
     # STEP 1: Identify tickets (without field prefilling)
     print(f"📋 PLANNER: Step 1 - Identifying ticket types...")
     
-    cat_slice = slice_catalog_for_prompt(user_text)
-    print(f"📋 PLANNER: Catalog slice has {len(cat_slice.get('service_areas', []))} service areas")
+    # Pin the catalog version so later turns resolve specs against the same catalog
+    catalog_version = get_catalog_version()
+    cat_slice = slice_catalog_for_prompt(user_text, catalog_version)
+    print(f"📋 PLANNER: Catalog slice has {sum(len(specs) for cats in cat_slice.values() for specs in cats.values())} ticket types")
 
-    # Add user email context if available (for reference only - field prefilling happens separately)
+    # Add user email context if available (for reference only - field prefilling happens separately).
+    # It goes after the user text so the system prompt and catalog slice stay a reusable prefix.
     user_context = ""
     if user_email:
         user_context = f"\n\nUSER EMAIL: {user_email}"
 
     messages = [
-        {"role": "system", "content": SYSTEM_PLAN + user_context},
+        {"role": "system", "content": SYSTEM_PLAN},
         # Put the catalog slice as JSON in the assistant "context" turn,
         # so the model can see the allowed categories/ticket types/fields.
-        {"role": "assistant", "content": json.dumps({"catalog": cat_slice})},
-        {"role": "user", "content": user_text}
+        {"role": "assistant", "content": planner_catalog_json(cat_slice, catalog_version)},
+        {"role": "user", "content": user_text + user_context}
     ]
 
     print(f"🤖 PLANNER: Calling LLM for ticket identification with {len(messages)} messages")
@@ -184,6 +202,7 @@ def plan_from_text(user_text: str, user_email: str = None) -> TicketPlan:
             model="llama3.1:8b",   # substitute your local model
             format="json",
             options={"temperature": 0.2, "top_p": 0.9, "num_ctx": 4096},
+            stage="planner",
         )
 
         print(f"📥 PLANNER: LLM returned raw response: '{raw[:100]}...'")
@@ -191,6 +210,7 @@ def plan_from_text(user_text: str, user_email: str = None) -> TicketPlan:
         data = json.loads(raw)
         print(f"✅ PLANNER: Successfully parsed JSON, creating initial TicketPlan")
         initial_plan = TicketPlan(**data)
+        initial_plan.catalog_version = catalog_version
         
         # STEP 2: Prefill fields using specialized field prefiller
         print(f"🔧 PLANNER: Step 2 - Prefilling fields using specialized service...")
@@ -0,0 +1,104 @@
+# app/services/prompt_fragments.py
+from __future__ import annotations
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.services.catalog_service import CatalogSnapshot, get_catalog_version, on_catalog_reload
+from app.utils import metrics
+
+# Prompt pieces that only change with the catalog (the planner's catalog view, per-field
+# context blocks for the prefiller) are serialized once and reused across requests.
+# Keys include the catalog version; everything is dropped when a new version goes live.
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting (~4 characters per token for English/JSON)."""
+    return (len(text) + 3) // 4
+
+class FragmentCache:
+    """LRU of serialized prompt fragments with their token estimates."""
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], str]) -> str:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        text = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (text, estimate_tokens(text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            tokens = [t for _, t in self._entries.values()]
+            return {
+                "entries": len(tokens),
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached_tokens": sum(tokens),
+                "max_tokens": max(tokens, default=0),
+            }
+
+_planner_views = FragmentCache("planner_catalog", max_entries=512)
+_field_blocks = FragmentCache("field_context", max_entries=4096)
+
+def _compact_spec(spec: dict) -> dict:
+    """What the planner needs to pick a ticket type: no option lists, no field details."""
+    compact: Dict[str, Any] = {"ticket_type": spec["ticket_type"]}
+    if spec.get("description"):
+        compact["description"] = spec["description"]
+    compact["fields"] = [raw["name"] for raw in spec.get("fields", []) if raw.get("name")]
+    return compact
+
+def planner_catalog_json(cat_slice: Dict[str, Dict[str, list]], version: Optional[str] = None) -> str:
+    """
+    The planner's catalog context for a slice ({area: {category: [specs]}}), serialized
+    once per catalog version and ticket-type combination.
+    """
+    key = (version or get_catalog_version(),) + tuple(
+        (area, category, spec["ticket_type"])
+        for area, categories in cat_slice.items()
+        for category, specs in categories.items()
+        for spec in specs
+    )
+
+    def build() -> str:
+        compact = {
+            area: {category: [_compact_spec(spec) for spec in specs] for category, specs in categories.items()}
+            for area, categories in cat_slice.items()
+        }
+        return json.dumps({"catalog": compact}, separators=(",", ":"), ensure_ascii=False)
+
+    text = _planner_views.get(key, build)
+    metrics.observe("prompt.planner_catalog_tokens", estimate_tokens(text))
+    return text
+
+def field_context_block(key: Hashable, build: Callable[[], str]) -> str:
+    """One field's prefill context, cached under a key built by the caller."""
+    return _field_blocks.get(key, build)
+
+def get_prompt_fragment_stats() -> dict:
+    return {cache.name: cache.stats() for cache in (_planner_views, _field_blocks)}
+
+def clear_prompt_fragments(snapshot: Optional[CatalogSnapshot] = None) -> None:
+    for cache in (_planner_views, _field_blocks):
+        cache.clear()
+
+on_catalog_reload(clear_prompt_fragments)
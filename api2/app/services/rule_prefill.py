@@ -0,0 +1,194 @@
+# app/services/rule_prefill.py
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+from app.services.catalog_service import resolve_field_options
+from app.services.date_parser import parse_date_range, parse_time, reference_today
+from app.services.entity_extractor import get_entity_extractor
+
+@dataclass
+class RuleContext:
+    user_text: str
+    text: str                     # lowercased user text
+    user_email: Optional[str]
+    today: date
+    fields: List[dict]            # every field of the spec, for rules that need siblings
+
+@dataclass
+class RuleValue:
+    value: Any
+    confidence: float             # 0..1; values below RULE_PREFILL_MIN_CONFIDENCE are left to the LLM
+    rule: str
+
+# A rule looks at one field (raw catalog dict + resolved options) and returns a value or None
+PrefillRule = Callable[[dict, List[str], RuleContext], Optional[RuleValue]]
+
+_RULES: List[tuple] = []
+
+def register_prefill_rule(name: str, rule: PrefillRule) -> None:
+    """Add a rule; rules run in registration order and the first one that returns a value wins."""
+    _RULES.append((name, rule))
+
+# ---- email ----
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+def _email_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    name = field["name"]
+    if name != "email" and not name.endswith("_email"):
+        return None
+    if name == "email" and ctx.user_email:
+        return RuleValue(ctx.user_email, 1.0, "email")
+    found = _EMAIL_RE.findall(ctx.user_text)
+    if len(found) == 1:
+        return RuleValue(found[0], 0.9, "email")
+    return None
+
+# ---- urgency / priority ----
+
+_LEVEL_PHRASE_RE = re.compile(
+    r"\b(critical|high|medium|low)\s+(?:priority|urgency|severity|sev)\b"
+    r"|\b(?:priority|urgency|severity)\s*(?:is|of|:|=)?\s*(critical|high|medium|low)\b"
+)
+# Checked in order, so "not urgent" wins over "urgent"
+_LEVEL_WORDS = [
+    (re.compile(r"\b(?:not urgent|non-urgent|no rush|whenever)\b"), "low", 0.85),
+    (re.compile(r"\b(?:emergency|sev\s?1|p1|outage)\b"), "critical", 0.8),
+    (re.compile(r"\b(?:urgent|urgently|asap)\b"), "high", 0.8),
+]
+
+def _pick_level_option(level: str, options: List[str]) -> Optional[str]:
+    """Map a level onto option text: "high" -> "high", "High" or "P2: High"."""
+    for option in options:
+        if option.lower() == level:
+            return option
+    matches = [o for o in options if re.search(rf"\b{level}\b", o.lower())]
+    return matches[0] if len(matches) == 1 else None
+
+def _urgency_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    if not options or not any(word in field["name"] for word in ("urgency", "priority")):
+        return None
+    levels = {a or b for a, b in _LEVEL_PHRASE_RE.findall(ctx.text)}
+    if len(levels) == 1:
+        option = _pick_level_option(levels.pop(), options)
+        return RuleValue(option, 0.95, "urgency") if option else None
+    if levels:
+        return None
+    for pattern, level, confidence in _LEVEL_WORDS:
+        if pattern.search(ctx.text):
+            option = _pick_level_option(level, options)
+            return RuleValue(option, confidence, "urgency") if option else None
+    return None
+
+# ---- environments ----
+
+_ENVIRONMENT_WORDS = {
+    "prd": re.compile(r"\b(?:prd|prod|production)\b"),
+    "sbx": re.compile(r"\b(?:sbx|sandbox)\b"),
+    "uat": re.compile(r"\b(?:uat|staging)\b"),
+}
+
+def _environment_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    lowered = {o.lower(): o for o in options}
+    if not options or not set(_ENVIRONMENT_WORDS) & set(lowered):
+        return None
+    mentioned = [env for env, pattern in _ENVIRONMENT_WORDS.items() if env in lowered and pattern.search(ctx.text)]
+    if len(mentioned) == 1:
+        return RuleValue(lowered[mentioned[0]], 0.95, "environment")
+    return None
+
+# ---- dates and times ----
+
+def _date_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    if field.get("type") != "date":
+        return None
+    parsed = parse_date_range(ctx.user_text, ctx.today)
+    if not parsed:
+        return None
+    start, end = parsed
+    name = field["name"]
+    if start != end and (name.startswith("start") or name.startswith("end")):
+        return RuleValue((end if name.startswith("end") else start).strftime("%Y-%m-%d"), 0.9, "date_range")
+    date_fields = [f for f in ctx.fields if f.get("type") == "date"]
+    if start == end and len(date_fields) == 1:
+        return RuleValue(start.strftime("%Y-%m-%d"), 0.85, "date")
+    return None
+
+def _time_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    if field.get("type") != "time" or len([f for f in ctx.fields if f.get("type") == "time"]) != 1:
+        return None
+    parsed = parse_time(ctx.user_text)
+    return RuleValue(parsed, 0.85, "time") if parsed else None
+
+# ---- choices ----
+
+# Options that show up in ordinary sentences and must never be filled from a bare mention
+_VAGUE_OPTIONS = {"other", "none", "none of the above", "n/a", "yes", "no", "add", "update", "remove"}
+_ENTITY_FIELDS = {"vendor_name", "from_investor", "to_recipient", "investor_name"}
+
+def _entity_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    if field["name"] not in _ENTITY_FIELDS or not options:
+        return None
+    mention = get_entity_extractor(options).best(ctx.user_text)
+    return RuleValue(mention.option, 0.9, "entity") if mention else None
+
+def _mentioned_options(options: List[str], ctx: RuleContext) -> List[str]:
+    found = []
+    for option in options:
+        lowered = option.lower()
+        if lowered in _VAGUE_OPTIONS or len(lowered) < 3:
+            continue
+        if re.search(rf"(?<![\w-]){re.escape(lowered)}(?![\w-])", ctx.text):
+            found.append(option)
+    # Drop options that are only mentioned as part of a longer mentioned option
+    return [o for o in found if not any(o != other and o.lower() in other.lower() for other in found)]
+
+def _choice_mention_rule(field: dict, options: List[str], ctx: RuleContext) -> Optional[RuleValue]:
+    if field.get("type") not in ("choice", "multi_choice") or not options:
+        return None
+    found = _mentioned_options(options, ctx)
+    if field["type"] == "multi_choice" and found:
+        return RuleValue(found, 0.85, "choice_mention")
+    if len(found) == 1:
+        return RuleValue(found[0], 0.9, "choice_mention")
+    return None
+
+for _name, _rule in (
+    ("email", _email_rule),
+    ("urgency", _urgency_rule),
+    ("environment", _environment_rule),
+    ("date", _date_rule),
+    ("time", _time_rule),
+    ("entity", _entity_rule),
+    ("choice_mention", _choice_mention_rule),
+):
+    register_prefill_rule(_name, _rule)
+
+def apply_prefill_rules(spec: Dict[str, Any], user_text: str, user_email: Optional[str] = None,
+                        today: Optional[date] = None) -> Dict[str, RuleValue]:
+    """
+    Run the deterministic rules over every field of a spec.
+    Returns {field_name: RuleValue} for the fields a rule could fill; callers decide
+    which confidence is good enough.
+    """
+    fields = spec.get("fields", [])
+    ctx = RuleContext(
+        user_text=user_text,
+        text=user_text.lower(),
+        user_email=user_email,
+        today=today or reference_today(),
+        fields=fields,
+    )
+    values: Dict[str, RuleValue] = {}
+    for field in fields:
+        if field.get("name") == "summary" or field.get("type") in ("file", "files"):
+            continue
+        options = resolve_field_options(field) if field.get("type") in ("choice", "multi_choice") else []
+        for _, rule in _RULES:
+            result = rule(field, options, ctx)
+            if result is not None and result.value not in (None, "", []):
+                values[field["name"]] = result
+                break
+    return values
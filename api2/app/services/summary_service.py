@@ -1,9 +1,20 @@
 # app/services/summary_service.py
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any
-from app.models.ticket_agent import TicketPlan, TicketItem
+import string
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.models.ticket_agent import MissingField, TicketPlan, TicketItem
+from app.services.catalog_service import find_ticket_spec
+from app.services.field_prefiller_service import extract_json_from_response
 from app.services.llm_service import llm_service, Message as LLMMessage
+from app.utils import metrics
+
+MAX_SUMMARY_CHARS = 75
 
 SYSTEM_SUMMARY = """You are a Ticket Summary Generator.
 Generate a concise, descriptive summary (max 75 characters) for a support ticket based on the ticket type and filled form data.
@@ -25,13 +36,46 @@ Examples:
 
 Return ONLY the summary text, no JSON or other formatting."""
 
-async def generate_ticket_summary(ticket_item: TicketItem) -> str:
+def _truncate(summary: str) -> str:
+    if len(summary) > MAX_SUMMARY_CHARS:
+        return summary[:MAX_SUMMARY_CHARS - 3] + "..."
+    return summary
+
+@lru_cache(maxsize=1024)
+def _template_fields(template: str) -> Tuple[str, ...]:
+    return tuple(name for _, name, _, _ in string.Formatter().parse(template) if name)
+
+def _template_value(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value if v not in (None, ""))
+    if value is None or isinstance(value, bool):
+        return None
+    text = str(value).strip()
+    return text or None
+
+def render_summary_template(spec: Optional[dict], form: Dict[str, Any]) -> Optional[str]:
     """
-    Generate a summary for a ticket based on its type and filled form data.
+    Render the ticket type's summary_template from the filled form, or None when the
+    catalog has no template or none of its alternatives has all of its fields filled.
+    Alternatives are tried in order; the first that fits in 75 characters wins.
     """
-    print(f"📝 SUMMARY: Generating summary for {ticket_item.ticket_type}")
-    
-    # Build context from ticket data
+    templates = (spec or {}).get("summary_template")
+    if not templates:
+        return None
+    if isinstance(templates, str):
+        templates = [templates]
+    rendered: List[str] = []
+    for template in templates:
+        values = {name: _template_value(form.get(name)) for name in _template_fields(template)}
+        if all(values.values()):
+            rendered.append(" ".join(template.format(**values).split()))
+    for summary in rendered:
+        if len(summary) <= MAX_SUMMARY_CHARS:
+            return summary
+    return _truncate(rendered[0]) if rendered else None
+
+def _summary_context(ticket_item: TicketItem) -> str:
+    """Ticket type plus the filled form fields the LLM summarizes."""
     context_parts = []
     context_parts.append(f"Ticket Type: {ticket_item.ticket_type}")
     
@@ -41,7 +85,25 @@ async def generate_ticket_summary(ticket_item: TicketItem) -> str:
             if value and field_name not in ["email", "summary"]:  # Skip email and summary itself
                 context_parts.append(f"{field_name}: {value}")
     
-    context = "\n".join(context_parts)
+    return "\n".join(context_parts)
+
+async def generate_ticket_summary(ticket_item: TicketItem, catalog_version: Optional[str] = None) -> str:
+    """
+    Generate a summary for a ticket based on its type and filled form data.
+    The ticket type's summary_template is used when its fields are filled; the LLM otherwise.
+    Records which path produced it in field_sources["summary"].
+    """
+    spec = find_ticket_spec(ticket_item.service_area, ticket_item.category, ticket_item.ticket_type, catalog_version)
+    summary = render_summary_template(spec, ticket_item.form)
+    if summary:
+        print(f"✅ SUMMARY: Rendered template summary for {ticket_item.ticket_type}: '{summary}'")
+        metrics.incr("summary.template")
+        ticket_item.field_sources["summary"] = {"source": "template"}
+        return summary
+
+    print(f"📝 SUMMARY: Generating summary for {ticket_item.ticket_type}")
+    
+    context = _summary_context(ticket_item)
     
     messages = [
         {"role": "system", "content": SYSTEM_SUMMARY},
@@ -57,35 +119,237 @@ async def generate_ticket_summary(ticket_item: TicketItem) -> str:
             messages=message_objects,
             model="llama3:8b",
             temperature=0.3,
-            max_tokens=100
+            max_tokens=100,
+            stage="summary"
         )
         
         summary = response.content.strip()
         
         # Ensure summary is within character limit
-        if len(summary) > 75:
-            summary = summary[:72] + "..."
+        summary = _truncate(summary)
         
         print(f"✅ SUMMARY: Generated summary: '{summary}'")
+        metrics.incr("summary.llm")
+        ticket_item.field_sources["summary"] = {"source": "llm"}
         return summary
         
     except Exception as e:
         print(f"❌ SUMMARY: Failed to generate summary: {e}")
         # Fallback to a basic summary
-        fallback = f"{ticket_item.ticket_type} request"
-        if len(fallback) > 75:
-            fallback = fallback[:72] + "..."
-        return fallback
+        metrics.incr("summary.fallback")
+        ticket_item.field_sources["summary"] = {"source": "fallback"}
+        return _truncate(f"{ticket_item.ticket_type} request")
+
+BATCH_SUMMARY_INSTRUCTIONS = """
+You will be given several tickets, numbered "Ticket 1", "Ticket 2", ...
+Write one summary per ticket following the rules above.
+Return ONLY a JSON object mapping each ticket number to its summary, e.g. {"1": "Datadog log setup for payment-service", "2": "Loan tape rerun for Q1 2024"}"""
+
+async def generate_ticket_summaries_batch(items: List[TicketItem], catalog_version: Optional[str] = None) -> List[str]:
+    """
+    Summaries for several tickets from one LLM call (LLM_BATCH_CALLS), so the system prompt
+    is evaluated once. Template summaries are still rendered locally, and tickets missing
+    from the answer fall back to per-item calls.
+    """
+    summaries: List[Optional[str]] = [None] * len(items)
+    llm_indexes: List[int] = []
+    for i, item in enumerate(items):
+        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, catalog_version)
+        if render_summary_template(spec, item.form):
+            summaries[i] = await generate_ticket_summary(item, catalog_version)
+        else:
+            llm_indexes.append(i)
+
+    if len(llm_indexes) > 1:
+        print(f"📝 SUMMARY: Generating {len(llm_indexes)} summaries in one call")
+        sections = "\n\n".join(f"Ticket {n}:\n{_summary_context(items[i])}" for n, i in enumerate(llm_indexes, 1))
+        messages = [
+            LLMMessage(role="system", content=SYSTEM_SUMMARY + "\n" + BATCH_SUMMARY_INSTRUCTIONS),
+            LLMMessage(role="user", content=f"Generate a summary for each of these tickets:\n\n{sections}"),
+        ]
+        answers: Dict[str, Any] = {}
+        try:
+            response = await llm_service.generate_non_streaming_response(
+                messages=messages,
+                model="llama3:8b",
+                temperature=0.3,
+                max_tokens=60 * len(llm_indexes),
+                stage="summary"
+            )
+            parsed = json.loads(extract_json_from_response(response.content))
+            if isinstance(parsed, dict):
+                answers = {str(k): v for k, v in parsed.items()}
+        except Exception as e:
+            print(f"❌ SUMMARY: Batched summary call failed: {e}")
+        metrics.incr("summary.batch_calls")
+
+        for n, i in enumerate(llm_indexes, 1):
+            answer = answers.get(str(n))
+            if isinstance(answer, str) and answer.strip():
+                summaries[i] = _truncate(answer.strip())
+                items[i].field_sources["summary"] = {"source": "llm", "batched": True}
+                metrics.incr("summary.llm")
+        llm_indexes = [i for i in llm_indexes if summaries[i] is None]
+        if llm_indexes:
+            print(f"⚠️ SUMMARY: Batched answer missed {len(llm_indexes)} tickets, summarizing them one by one")
+            metrics.incr("summary.batch_fallback", len(llm_indexes))
+
+    fallback = await asyncio.gather(*(generate_ticket_summary(items[i], catalog_version) for i in llm_indexes))
+    for i, summary in zip(llm_indexes, fallback):
+        summaries[i] = summary
+    return summaries
+
+def _summary_inputs(item: TicketItem, spec: Optional[dict]) -> Dict[str, Any]:
+    """The form values a summary is generated from: template fields when a template applies, else the LLM context."""
+    if render_summary_template(spec, item.form):
+        templates = spec["summary_template"]
+        names = {n for t in ([templates] if isinstance(templates, str) else templates) for n in _template_fields(t)}
+        return {n: item.form.get(n) for n in sorted(names)}
+    return {k: v for k, v in item.form.items() if v and k not in ("email", "summary")}
+
+def summary_fingerprint(item: TicketItem, catalog_version: Optional[str] = None) -> str:
+    spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, catalog_version)
+    payload = json.dumps([catalog_version, item.ticket_type, _summary_inputs(item, spec)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+# Summaries started ahead of completion, keyed by fingerprint. Identical inputs give the
+# same summary, so sessions share tasks: an item that starts or joins one holds a
+# reference (its summary_draft names the fingerprint) until it collects the result, its
+# inputs change or its session completes. A task nobody references any more is cancelled,
+# as are the oldest ones beyond the limit.
+_MAX_EARLY_TASKS = 256
+_early_tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+_early_refs: Dict[str, int] = {}
+
+def _release_early_task(fingerprint: str) -> None:
+    refs = _early_refs.get(fingerprint, 0) - 1
+    if refs > 0:
+        _early_refs[fingerprint] = refs
+        return
+    _early_refs.pop(fingerprint, None)
+    task = _early_tasks.pop(fingerprint, None)
+    if task is not None and not task.done():
+        task.cancel()
+        metrics.incr("summary.early_cancelled")
+
+async def _summary_with_source(item: TicketItem, catalog_version: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    summary = await generate_ticket_summary(item, catalog_version)
+    return summary, item.field_sources.get("summary", {})
+
+def _collect_early_summary(item: TicketItem, fingerprint: str) -> None:
+    """Move a finished background summary onto the item, dropping the item's reference to it."""
+    draft = item.summary_draft or {}
+    if draft.get("fingerprint") != fingerprint or "text" in draft:
+        return
+    task = _early_tasks.get(fingerprint)
+    if task is None:
+        item.summary_draft = None         # evicted
+        return
+    if not task.done():
+        return
+    _release_early_task(fingerprint)
+    if task.cancelled() or task.exception():
+        item.summary_draft = None
+        return
+    text, source = task.result()
+    item.summary_draft = {"text": text, "source": source, "fingerprint": fingerprint}
+
+def _drop_early_summary(item: TicketItem) -> None:
+    """Forget the item's draft; a background summary still running for it is released."""
+    draft = item.summary_draft
+    item.summary_draft = None
+    if draft and "text" not in draft:
+        _release_early_task(draft["fingerprint"])
+
+def release_early_summaries(plan: Optional[TicketPlan]) -> None:
+    """Release the background summaries of a plan whose session is dropped without completing."""
+    for item in plan.items if plan else ():
+        _drop_early_summary(item)
+
+def start_early_summaries(plan: TicketPlan, missing: Iterable[MissingField] = ()) -> None:
+    """
+    Start LLM summaries in the background for items whose required fields are all filled,
+    so completing the plan doesn't wait for them. Drafts are kept on the item with the
+    fingerprint of their inputs and ignored once a later answer changes one of them.
+    Template summaries are rendered at completion; they need no head start.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    waiting = {m.item_index for m in missing}
+    for i, item in enumerate(plan.items):
+        if i in waiting or item.form.get("summary"):
+            continue
+        fingerprint = summary_fingerprint(item, plan.catalog_version)
+        _collect_early_summary(item, fingerprint)
+        if (item.summary_draft or {}).get("fingerprint") == fingerprint:
+            continue
+        _drop_early_summary(item)         # made from inputs a later answer changed
+        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, plan.catalog_version)
+        if render_summary_template(spec, item.form):
+            continue
+        item.summary_draft = {"fingerprint": fingerprint}
+        _early_refs[fingerprint] = _early_refs.get(fingerprint, 0) + 1
+        if fingerprint in _early_tasks:
+            continue
+        print(f"⏩ SUMMARY: Starting early summary for {item.ticket_type}")
+        metrics.incr("summary.early_started")
+        _early_tasks[fingerprint] = asyncio.create_task(
+            _summary_with_source(item.model_copy(deep=True), plan.catalog_version)
+        )
+        while len(_early_tasks) > _MAX_EARLY_TASKS:
+            evicted, task = _early_tasks.popitem(last=False)
+            _early_refs.pop(evicted, None)
+            if not task.done():
+                task.cancel()
+                metrics.incr("summary.early_cancelled")
+
+def _early_summary_for_item(item: TicketItem, catalog_version: Optional[str]) -> Optional[str]:
+    """The item's background summary, if one was made from its current inputs."""
+    fingerprint = summary_fingerprint(item, catalog_version)
+    _collect_early_summary(item, fingerprint)
+    draft = item.summary_draft
+    _drop_early_summary(item)
+    if draft and draft.get("fingerprint") == fingerprint and "text" in draft:
+        metrics.incr("summary.early_used")
+        item.field_sources["summary"] = draft["source"]
+        return draft["text"]
+    if draft:
+        metrics.incr("summary.early_discarded")
+    return None
+
+async def _await_early_summaries(items: List[TicketItem], catalog_version: Optional[str]) -> None:
+    running = [_early_tasks.get(summary_fingerprint(item, catalog_version)) for item in items]
+    running = [task for task in running if task is not None and not task.done()]
+    if running:
+        metrics.incr("summary.early_awaited", len(running))
+        await asyncio.wait(running)
 
 async def generate_summaries_for_plan(plan: TicketPlan) -> TicketPlan:
     """
     Generate summaries for all tickets in a plan after all other fields are filled.
+    Summaries started by start_early_summaries() are reused; the rest are generated
+    concurrently, or in one call with LLM_BATCH_CALLS.
     """
     print(f"📝 SUMMARY: Generating summaries for {len(plan.items)} tickets")
     
-    for i, item in enumerate(plan.items):
-        if not item.form.get("summary"):  # Only generate if summary is empty
-            summary = await generate_ticket_summary(item)
-            plan.items[i].form["summary"] = summary
+    pending = [item for item in plan.items if not item.form.get("summary")]  # Only generate if summary is empty
+    for item in plan.items:
+        if item.form.get("summary"):
+            _drop_early_summary(item)     # the session is done with background work for these
+    await _await_early_summaries(pending, plan.catalog_version)
+    for item in pending:
+        summary = _early_summary_for_item(item, plan.catalog_version)
+        if summary:
+            item.form["summary"] = summary
+    
+    pending = [item for item in pending if not item.form.get("summary")]
+    if settings.llm_batch_calls and len(pending) > 1:
+        summaries = await generate_ticket_summaries_batch(pending, plan.catalog_version)
+    else:
+        summaries = await asyncio.gather(*(generate_ticket_summary(item, plan.catalog_version) for item in pending))
+    for item, summary in zip(pending, summaries):
+        item.form["summary"] = summary
     
     return plan
@@ -1,8 +1,13 @@
 # app/services/validator_questions.py
 from __future__ import annotations
-from typing import List, Tuple, Any
+import asyncio
+import re
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote, urlencode
+from app.config import settings
 from app.models.ticket_agent import TicketPlan, MissingField, FieldDef
 from app.services.catalog_service import find_ticket_spec, resolve_field_options
+from app.services.option_providers import load_field_options_async
 
 def _is_required(field_dict: dict) -> bool:
     """
@@ -21,7 +26,7 @@ def find_missing_fields(plan: TicketPlan) -> List[MissingField]:
     missing: List[MissingField] = []
     for i, item in enumerate(plan.items):
         print(f"📋 VALIDATOR: Checking item {i}: {item.ticket_type}")
-        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type)
+        spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, plan.catalog_version)
         if not spec:
             # If spec can't be found, it's a catalog mismatch—flag and skip questions.
             print(f"⚠️ VALIDATOR: No spec found for {item.ticket_type}, marking as needs-triage")
@@ -57,6 +62,8 @@ def render_question(m: MissingField, plan: TicketPlan) -> dict:
     """
     Turn a MissingField into a question payload usable by your chatbot UI.
     Note: the "options" are resolved from constants.py if field.type is choice/multi_choice.
+    Large option sets are cut to the first QUESTION_OPTIONS_INLINE_LIMIT entries; the
+    payload then carries "options_total" and an "options_search" URL for typeahead.
     """
     f = m.field
     # Get the ticket information for context
@@ -88,8 +95,20 @@ def render_question(m: MissingField, plan: TicketPlan) -> dict:
 
     # Resolve options for enumerated fields
     options = None
+    options_total = None
+    options_search = None
     if f.type in ("choice", "multi_choice"):
         options = resolve_field_options(f.model_dump())
+        options_total = len(options)
+
+        limit = settings.question_options_inline_limit
+        if options_total > limit:
+            options = options[:limit]
+            query = urlencode({"version": plan.catalog_version}) if plan.catalog_version else ""
+            options_search = (
+                f"/api/catalog/fields/{quote(ticket_item.ticket_type, safe='/')}/{quote(f.name)}/options"
+                + (f"?{query}" if query else "")
+            )
         
         # Add options to the prompt text for choice fields
         if options:
@@ -97,16 +116,92 @@ def render_question(m: MissingField, plan: TicketPlan) -> dict:
                 prompt_text += f"\n\nAvailable options:\n" + "\n".join([f"• {option}" for option in options])
             elif f.type == "multi_choice":
                 prompt_text += f"\n\nAvailable options (select one or more):\n" + "\n".join([f"• {option}" for option in options])
+            if options_search:
+                prompt_text += f"\n…and {options_total - len(options)} more. Type a name to search."
 
     return {
         "text": prompt_text,
         "type": f.type,
-        "options": options,                 # list or None
+        "options": options,                 # list or None (first N when options_search is set)
+        "options_total": options_total,     # size of the full option set
+        "options_search": options_search,   # typeahead URL when the set was truncated
         "item_index": m.item_index,
         "field_name": f.name,
         "description": f.description or "", # UI can show this under the input
     }
 
+def question_group(missing: List[MissingField]) -> List[MissingField]:
+    """
+    The fields asked together in form mode: the missing fields of the first ticket that
+    has any, capped at QUESTION_FORM_GROUP_SIZE (0 = no cap).
+    """
+    if not missing:
+        return []
+    group = [m for m in missing if m.item_index == missing[0].item_index]
+    size = settings.question_form_group_size
+    return group[:size] if size > 0 else group
+
+def render_form(group: List[MissingField], plan: TicketPlan) -> dict:
+    """
+    Several missing fields of one ticket as one form payload. "fields" holds the
+    render_question() payload of each field; "text" is the chat fallback, answered
+    with one "field: value" line per field.
+    """
+    fields = [render_question(m, plan) for m in group]
+    ticket_item = plan.items[group[0].item_index]
+    if len(plan.items) > 1:
+        ticket_identifier = f"[Ticket {group[0].item_index + 1}]"
+    else:
+        ticket_identifier = f"[{ticket_item.ticket_type}]"
+
+    lines = [f"{ticket_identifier} Please provide the following (one `field: value` per line):"]
+    for m, question in zip(group, fields):
+        line = f"• **{m.field.name.replace('_', ' ')}** ({m.field.type})"
+        if question["options"]:
+            line += ": " + " / ".join(question["options"])
+            if question["options_search"]:
+                line += f" … and {question['options_total'] - len(question['options'])} more"
+        lines.append(line)
+
+    return {
+        "text": "\n".join(lines),
+        "type": "form",
+        "item_index": group[0].item_index,
+        "ticket_type": ticket_item.ticket_type,
+        "fields": fields,
+    }
+
+_FORM_LINE_RE = re.compile(r"^\s*[-•*]?\s*\**([A-Za-z][\w ]*?)\**\s*[:=]\s*(.+?)\s*$")
+
+def parse_form_answer(text: str, group: List[MissingField]) -> Dict[str, str]:
+    """
+    Read "field: value" lines (or ";"-separated pairs) from a chat answer to a form.
+    Field names match with spaces or underscores, case-insensitively. A form with a
+    single field takes the whole text as its answer.
+    """
+    by_name = {m.field.name.lower(): m.field.name for m in group}
+    by_name.update({m.field.name.replace("_", " ").lower(): m.field.name for m in group})
+    answers: Dict[str, str] = {}
+    for part in re.split(r"[\n;]+", text):
+        match = _FORM_LINE_RE.match(part)
+        if not match:
+            continue
+        name = by_name.get(" ".join(match.group(1).lower().split()))
+        if name and match.group(2):
+            answers[name] = match.group(2)
+    if not answers and len(group) == 1 and text.strip():
+        answers[group[0].field.name] = text.strip()
+    return answers
+
+async def apply_answers_async(plan: TicketPlan, answers: List[Tuple[int, str, Any]]) -> TicketPlan:
+    """
+    Apply several (item_index, field_name, value) answers at once. Each goes through
+    apply_answer_async; they run concurrently, so choice matching that needs the LLM
+    costs one round trip for the whole form.
+    """
+    await asyncio.gather(*(apply_answer_async(plan, i, name, value) for i, name, value in answers))
+    return plan
+
 def apply_answer(plan: TicketPlan, item_index: int, field_name: str, value: Any) -> TicketPlan:
     """
     Insert the user's answer into the right TicketItem.form slot.
@@ -115,7 +210,7 @@ def apply_answer(plan: TicketPlan, item_index: int, field_name: str, value: Any)
     """
     # Get the field definition to process the value correctly
     item = plan.items[item_index]
-    spec = find_ticket_spec(item.service_area, item.category, item.ticket_type)
+    spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, plan.catalog_version)
     
     if not spec:
         # If spec can't be found, just store the raw value
@@ -127,6 +222,9 @@ def apply_answer(plan: TicketPlan, item_index: int, field_name: str, value: Any)
     for field in spec["fields"]:
         if field["name"] == field_name:
             field_def = FieldDef(**field)
+            # options_source-backed choices need their resolved option list
+            if field_def.type in ("choice", "multi_choice"):
+                field_def.options = resolve_field_options(field)
             break
     
     if field_def:
@@ -155,18 +253,24 @@ async def apply_answer_async(plan: TicketPlan, item_index: int, field_name: str,
     """
     # Get the field definition to process the value correctly
     item = plan.items[item_index]
-    spec = find_ticket_spec(item.service_area, item.category, item.ticket_type)
+    spec = find_ticket_spec(item.service_area, item.category, item.ticket_type, plan.catalog_version)
     
     if not spec:
         # If spec can't be found, just store the raw value
         plan.items[item_index].form[field_name] = value
         return plan
     
+    # Cold options_source lists load in a worker thread, not on the event loop
+    await load_field_options_async(f for f in spec["fields"] if f["name"] == field_name)
+
     # Find the field definition
     field_def = None
     for field in spec["fields"]:
         if field["name"] == field_name:
             field_def = FieldDef(**field)
+            # options_source-backed choices need their resolved option list
+            if field_def.type in ("choice", "multi_choice"):
+                field_def.options = resolve_field_options(field)
             break
     
     if field_def:
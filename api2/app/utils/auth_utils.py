@@ -3,15 +3,27 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+import asyncio
+import threading
+import time
 import jwt
 
 from app.models import get_db
 from app.models.user import User
 from app.config import settings
+from app.utils import metrics
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Hashes below BCRYPT_ROUNDS are upgraded on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
@@ -24,6 +36,69 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
+# bcrypt takes 100-300 ms by design, so request handlers run it on a small dedicated pool
+# (bcrypt releases the GIL) instead of the event loop. At most PASSWORD_HASH_WORKERS hashes
+# run at once; beyond PASSWORD_HASH_MAX_QUEUE waiting jobs new ones get a 503 instead of
+# piling up behind a login storm.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_jobs = 0
+_password_lock = threading.Lock()
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    with _password_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+        return _password_executor
+
+def shutdown_password_executor() -> None:
+    global _password_executor
+    with _password_lock:
+        executor, _password_executor = _password_executor, None
+    if executor:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def _run_password_job(fn: Callable[..., Any], *args: Any) -> Any:
+    global _password_jobs
+    with _password_lock:
+        queued = _password_jobs - settings.password_hash_workers + 1
+        if queued > settings.password_hash_max_queue:
+            metrics.incr("password_hash.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests right now, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_jobs += 1
+    metrics.observe("password_hash.queue_depth", max(0, queued))
+    submitted = time.perf_counter()
+
+    def job() -> Any:
+        started = time.perf_counter()
+        metrics.observe("password_hash.wait_ms", (started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe("password_hash.run_ms", (time.perf_counter() - started) * 1000)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), job)
+    finally:
+        with _password_lock:
+            _password_jobs -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password() on the password pool."""
+    return await _run_password_job(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash() on the password pool."""
+    return await _run_password_job(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the password pool; also returns a new hash when the stored one uses outdated parameters."""
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -47,34 +122,100 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def get_user_from_token(token: str, db: Session) -> User:
+@dataclass(frozen=True)
+class AuthUser:
+    """What request handlers need to know about the caller; the full User row is loaded only where needed."""
+    id: int
+    email: str
+    role: Optional[str]
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(id=user.id, email=user.email, role=user.role, token_version=user.token_version or 0)
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+# Tokens resolved in the last AUTH_USER_CACHE_TTL_SECONDS skip JWT decoding and the user
+# query. Entries never outlive the token's exp. bump_token_version() drops a user's entries
+# in this process; other workers stop accepting the old tokens within the TTL.
+# WARNING: Like the session store, this cache is per-process.
+_user_cache: "OrderedDict[str, Tuple[AuthUser, float]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+def _cached_user(token: str) -> Optional[AuthUser]:
+    with _user_cache_lock:
+        entry = _user_cache.get(token)
+        if entry is None:
+            return None
+        if time.time() >= entry[1]:
+            del _user_cache[token]
+            return None
+        _user_cache.move_to_end(token)
+        return entry[0]
+
+def _cache_user(token: str, user: AuthUser, payload: dict) -> None:
+    expires_at = time.time() + settings.auth_user_cache_ttl_seconds
+    if isinstance(payload.get("exp"), (int, float)):
+        expires_at = min(expires_at, payload["exp"])
+    with _user_cache_lock:
+        _user_cache[token] = (user, expires_at)
+        _user_cache.move_to_end(token)
+        while len(_user_cache) > settings.auth_user_cache_max_entries:
+            _user_cache.popitem(last=False)
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Forget every cached token of `user_id`."""
+    with _user_cache_lock:
+        for token in [t for t, (user, _) in _user_cache.items() if user.id == user_id]:
+            del _user_cache[token]
+
+def clear_user_cache() -> None:
+    with _user_cache_lock:
+        _user_cache.clear()
+
+def bump_token_version(user: User, db: Session) -> None:
+    """Invalidate every token issued to `user` so far (logout, password change)."""
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+    invalidate_cached_user(user.id)
+
+def get_user_from_token(token: str, db: Session) -> AuthUser:
     """Get user from JWT token."""
+    if settings.auth_user_cache_ttl_seconds > 0:
+        cached = _cached_user(token)
+        if cached is not None:
+            metrics.incr("auth_cache.hit")
+            return cached
+        metrics.incr("auth_cache.miss")
+
     payload = decode_token(token)
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     
     user = db.query(User).filter(User.id == int(user_id)).first()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
+        raise _credentials_error()
+    # Tokens issued before a logout or password change carry an older version
+    if payload.get("ver", 0) != (user.token_version or 0):
+        metrics.incr("auth_cache.revoked")
+        raise _credentials_error()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    auth_user = AuthUser.from_user(user)
+    if settings.auth_user_cache_ttl_seconds > 0:
+        _cache_user(token, auth_user, payload)
+    return auth_user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> AuthUser:
     """Dependency to get current authenticated user."""
     if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     return get_user_from_token(token, db)
 
 def generate_verification_token(user_id: int, email: str) -> str:
@@ -0,0 +1,98 @@
+# app/utils/fast_json.py
+from __future__ import annotations
+import datetime
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:            # optional: falls back to the stdlib encoder
+    orjson = None
+
+# JSON encoding for responses and SSE frames.
+# JSON_SERIALIZER picks the backend: "orjson", "stdlib" or "auto" (orjson when installed).
+# Both produce compact UTF-8 JSON and accept Pydantic models, datetimes/dates and sets.
+# FastJSONResponse is the app's default response class; sse_event() and SSEFrame encode
+# stream frames, SSEFrame serializing the fields that don't change between frames once.
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+_BACKENDS: Dict[str, Callable[[Any], bytes]] = {"stdlib": _stdlib_dumps}
+if orjson is not None:
+    _BACKENDS["orjson"] = _orjson_dumps
+
+_dumps: Callable[[Any], bytes] = _stdlib_dumps
+
+def dumps(value: Any) -> bytes:
+    if isinstance(value, BaseModel):
+        # Pydantic's compiled serializer beats model_dump() + encoding
+        return value.__pydantic_serializer__.to_json(value)
+    return _dumps(value)
+
+def use_json_backend(name: str) -> str:
+    """Switch the encoder ("orjson", "stdlib" or "auto"); returns the backend in use."""
+    global _dumps
+    if name == "auto":
+        name = "orjson" if "orjson" in _BACKENDS else "stdlib"
+    if name not in _BACKENDS:
+        print(f"⚠️ FAST_JSON: JSON backend '{name}' is not available, using stdlib")
+        name = "stdlib"
+    _dumps = _BACKENDS[name]
+    return name
+
+def json_backend() -> str:
+    return next(name for name, fn in _BACKENDS.items() if fn is _dumps)
+
+use_json_backend(settings.json_serializer)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured backend."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def sse_event(data: Any, event: Optional[str] = "message") -> bytes:
+    """One server-sent event frame carrying `data` as JSON."""
+    head = f"event: {event}\ndata: ".encode("utf-8") if event else b"data: "
+    return head + dumps(data) + b"\n\n"
+
+class SSEFrame:
+    """
+    Precompiled frame for payloads sent many times with only a few fields changing
+    (streamed chunks of one message). The fixed fields and the keys of the changing
+    ones are serialized once; each frame only encodes the changing values, which come
+    last in the object.
+    """
+
+    def __init__(self, fixed: Dict[str, Any], changing: Tuple[str, ...], event: Optional[str] = "message"):
+        head = f"event: {event}\ndata: ".encode("utf-8") if event else b"data: "
+        self._prefix = head + dumps(fixed)[:-1]          # without the closing brace
+        self._keys = [(b"," if fixed or i else b"") + dumps(key) + b":" for i, key in enumerate(changing)]
+
+    def render(self, *values: Any) -> bytes:
+        """Frame with the changing fields set to `values`, in the order given at construction."""
+        if len(values) != len(self._keys):
+            raise ValueError(f"Expected {len(self._keys)} values, got {len(values)}")
+        encode = _dumps
+        parts = [self._prefix]
+        for key, value in zip(self._keys, values):
+            parts.append(key)
+            parts.append(encode(value))
+        parts.append(b"}\n\n")
+        return b"".join(parts)
@@ -0,0 +1,59 @@
+# app/utils/http_cache.py
+from __future__ import annotations
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+from fastapi import Request
+from fastapi.responses import Response
+from app.config import settings
+from app.utils import metrics
+from app.utils.fast_json import dumps
+
+# Precomputed responses for endpoints whose body only depends on settings or the catalog
+# (/api/config, /api/startup, /api/endpoints, file and speech config, presets, search, banner).
+# Only bodies that are the same for every user and query belong here; per-user endpoints
+# (files, keys, roles, tool calls and tool auth) are built per request as before.
+# The body is serialized once and served as bytes with a content-hash ETag and
+# Cache-Control: max-age=HTTP_CACHE_MAX_AGE_SECONDS; If-None-Match gets a 304.
+# A cached ApiResponse keeps the timestamp of when it was built.
+# invalidate_http_cache() drops everything; it runs on config and catalog reload.
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+
+_cache: Dict[str, CachedBody] = {}
+_lock = threading.Lock()
+
+def _cache_control() -> str:
+    max_age = settings.http_cache_max_age_seconds
+    return f"max-age={int(max_age)}" if max_age > 0 else "no-cache"
+
+def cached_response(request: Request, key: str, build: Callable[[], Any]) -> Response:
+    """
+    Serve `build()` (an ApiResponse or JSON-able value) from the cache under `key`, building
+    it on first use. `build` must not depend on the request or the user.
+    """
+    entry = _cache.get(key)
+    built = entry is None
+    if built:
+        body = dumps(build())
+        entry = CachedBody(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+        with _lock:
+            entry = _cache.setdefault(key, entry)
+        metrics.incr("http_cache.miss")
+    headers = {"ETag": entry.etag, "Cache-Control": _cache_control()}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry.etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        metrics.incr("http_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+    if not built:
+        metrics.incr("http_cache.hit")
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+def invalidate_http_cache(*_: Any) -> None:
+    with _lock:
+        _cache.clear()
+    print("🧹 HTTP_CACHE: Cleared precomputed responses")
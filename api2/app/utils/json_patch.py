@@ -0,0 +1,127 @@
+# app/utils/json_patch.py
+from __future__ import annotations
+import copy
+from typing import Any, Dict, List
+
+# RFC 6902 JSON Patch: diff two JSON documents and apply a patch.
+# make_patch() emits add/remove/replace only; apply_patch() also accepts move/copy/test
+# so patches written by clients or other tools can be applied too.
+
+Patch = List[Dict[str, Any]]
+
+class JsonPatchError(ValueError):
+    pass
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _diff(old: Any, new: Any, path: str, ops: Patch) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": copy.deepcopy(value)})
+            else:
+                _diff(old[key], value, f"{path}/{_escape(key)}", ops)
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff(old[i], new[i], f"{path}/{i}", ops)
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": copy.deepcopy(new[i])})
+    elif old != new or type(old) is not type(new):
+        ops.append({"op": "replace", "path": path, "value": copy.deepcopy(new)})
+
+def make_patch(old: Any, new: Any) -> Patch:
+    """Operations that turn `old` into `new` (an empty list when they are equal)."""
+    ops: Patch = []
+    _diff(old, new, "", ops)
+    return ops
+
+def _split(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        if isinstance(doc, dict):
+            if token not in doc:
+                raise JsonPatchError(f"Path not found: {token!r}")
+            doc = doc[token]
+        elif isinstance(doc, list):
+            doc = doc[_index(doc, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Cannot descend into {type(doc).__name__}")
+    return doc
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add into {type(parent).__name__}")
+    return doc
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"Path not found: {tokens[-1]!r}")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, tokens[-1], allow_end=False))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__}")
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    """Apply `patch` to a copy of `doc`; raises JsonPatchError when an operation doesn't apply."""
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        kind = op.get("op")
+        tokens = _split(op.get("path", ""))
+        if kind == "add":
+            doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(doc, tokens)
+        elif kind == "replace":
+            if not tokens:
+                doc = copy.deepcopy(op["value"])
+            else:
+                _remove(doc, tokens)
+                doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif kind in ("move", "copy"):
+            source = _split(op.get("from", ""))
+            value = _remove(doc, source) if kind == "move" else copy.deepcopy(_resolve(doc, source))
+            doc = _add(doc, tokens, value)
+        elif kind == "test":
+            if _resolve(doc, tokens) != op.get("value"):
+                raise JsonPatchError(f"Test failed at {op.get('path')!r}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {kind!r}")
+    return doc
@@ -0,0 +1,38 @@
+# app/utils/metrics.py
+from __future__ import annotations
+import threading
+from typing import Dict
+
+# WARNING: Like the session store, these are per-process counters.
+_COUNTERS: Dict[str, float] = {}
+_TIMINGS: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+def incr(name: str, amount: float = 1) -> None:
+    """Bump a counter, e.g. incr("choice_match.local")."""
+    with _lock:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+def observe(name: str, value: float) -> None:
+    """Record one sample (e.g. a duration in ms); keeps count/total/max."""
+    with _lock:
+        stats = _TIMINGS.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += value
+        stats["max"] = max(stats["max"], value)
+
+def get_counter(name: str) -> float:
+    return _COUNTERS.get(name, 0)
+
+def snapshot() -> dict:
+    with _lock:
+        timings = {
+            name: {**stats, "avg": round(stats["total"] / stats["count"], 3) if stats["count"] else 0.0}
+            for name, stats in _TIMINGS.items()
+        }
+        return {"counters": dict(sorted(_COUNTERS.items())), "timings": dict(sorted(timings.items()))}
+
+def reset() -> None:
+    with _lock:
+        _COUNTERS.clear()
+        _TIMINGS.clear()
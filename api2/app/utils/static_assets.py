@@ -0,0 +1,181 @@
+# app/utils/static_assets.py
+from __future__ import annotations
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from starlette.responses import FileResponse, Response
+from app.config import settings
+from app.utils import metrics
+
+try:
+    import brotli
+except ImportError:            # optional: gzip only (plus any .br files the build wrote)
+    brotli = None
+
+# In-memory serving of the built frontend (client/dist).
+# The directory is walked once: every file gets a strong ETag (content hash, with a
+# "-gzip"/"-br" suffix on compressed responses) and a Cache-Control, and files up to
+# STATIC_CACHE_MAX_BYTES are kept in memory together with gzip / brotli variants
+# (precompressed .gz/.br files from the build are used when present).
+# Requests never touch the filesystem for those; larger files are streamed from disk with
+# the same headers. Hashed bundles (assets/index-3f9a1c2b.js) never change under their
+# name, so they are cached as immutable; index.html and other files are revalidated.
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_HASHED_RE = re.compile(r"[.-][A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml",
+                 "application/manifest+json", "application/wasm")
+_ENCODINGS = ("br", "gzip")
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+@dataclass
+class StaticAsset:
+    path: str                    # absolute path on disk
+    content_type: str
+    etag: str
+    cache_control: str
+    size: int
+    body: Optional[bytes] = None                              # None: streamed from disk
+    encoded: Dict[str, bytes] = field(default_factory=dict)   # "br" / "gzip" -> compressed body
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data)
+    return None
+
+def _load_asset(path: str, relative: str) -> StaticAsset:
+    size = os.path.getsize(path)
+    data: Optional[bytes] = None
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= settings.static_cache_max_bytes:
+            data = f.read()
+            hasher.update(data)
+        else:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+    digest = hasher.hexdigest()
+
+    content_type = _content_type(path)
+    hashed = relative.startswith("assets/") and bool(_HASHED_RE.search(relative))
+    asset = StaticAsset(path, content_type, f'"{digest}"', IMMUTABLE if hashed else REVALIDATE, size, data)
+    if data is not None and content_type.startswith(_COMPRESSIBLE) and size >= 256:
+        for encoding in _ENCODINGS:
+            prebuilt = path + _SUFFIXES[encoding]
+            if os.path.isfile(prebuilt):
+                with open(prebuilt, "rb") as f:
+                    body = f.read()
+            else:
+                body = _compress(data, encoding)
+            if body is not None and len(body) < size:
+                asset.encoded[encoding] = body
+    return asset
+
+class StaticAssets:
+    """Index of a built frontend directory, answering requests from memory."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        if not os.path.isdir(root):
+            return
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if name.endswith((".gz", ".br")) and os.path.isfile(os.path.join(directory, name[:-3])):
+                    continue       # precompressed variant; served through its source file
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                self.assets[relative] = _load_asset(path, relative)
+        cached = sum(1 for a in self.assets.values() if a.body is not None)
+        print(f"📦 STATIC: Indexed {len(self.assets)} frontend files ({cached} in memory) from {root}")
+
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        return self.assets.get("index.html")
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """The file for `path`, or index.html for frontend routes; None when there is no frontend."""
+        asset = self.assets.get(path.lstrip("/"))
+        if asset is None:
+            metrics.incr("static.spa_fallback")
+            return self.index
+        return asset
+
+    def respond(self, asset: StaticAsset, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+        # Each encoding is a different representation, so it gets its own ETag ("<hash>-gzip")
+        encoding = _pick_encoding(accept_encoding, asset.encoded) if asset.body is not None else None
+        etag = f'{asset.etag[:-1]}-{encoding}"' if encoding else asset.etag
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control}
+        if asset.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match and _etag_matches(if_none_match, asset.etag):
+            metrics.incr("static.not_modified")
+            return Response(status_code=304, headers=headers)
+
+        if asset.body is None:
+            metrics.incr("static.disk")
+            return FileResponse(asset.path, media_type=asset.content_type, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            metrics.incr(f"static.{encoding}")
+            return Response(asset.encoded[encoding], media_type=asset.content_type, headers=headers)
+        metrics.incr("static.identity")
+        return Response(asset.body, media_type=asset.content_type, headers=headers)
+
+_ENCODING_TAG_RE = re.compile(r'-(?:br|gzip)"$')
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """`etag` is the content tag; the encoding suffix of a variant's tag is ignored (same content)."""
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires; proxies may add W/ to our strong tags
+    tags = [t.strip() for t in header.split(",")]
+    return any(_ENCODING_TAG_RE.sub('"', t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+def _pick_encoding(header: Optional[str], available: Dict[str, bytes]) -> Optional[str]:
+    if not header or not available:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    candidates: List[str] = [e for e in _ENCODINGS if e in available and accepted.get(e, accepted.get("*", 0)) > 0]
+    return max(candidates, key=lambda e: accepted.get(e, accepted.get("*", 0)), default=None)
+
+_assets: Optional[StaticAssets] = None
+
+def frontend_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "client", "dist"))
+
+def load_static_assets(root: Optional[str] = None) -> StaticAssets:
+    """(Re)index the frontend build, e.g. at startup or after a new build was deployed."""
+    global _assets
+    _assets = StaticAssets(root or frontend_root())
+    return _assets
+
+def get_static_assets() -> StaticAssets:
+    assets = _assets
+    if assets is None or (not assets.assets and os.path.isdir(assets.root)):
+        # Not indexed yet, or the frontend was built after startup
+        assets = load_static_assets(assets.root if assets else None)
+    return assets
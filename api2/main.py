@@ -9,6 +9,7 @@ import logging
 import os
 from contextlib import asynccontextmanager
 from typing import Dict, Any
+from app.utils.fast_json import FastJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +24,25 @@ async def lifespan(app: FastAPI):
     # Create database tables
     from app.models import engine, Base
     Base.metadata.create_all(bind=engine)
+    # Watch the catalog file so catalog edits don't need a restart
+    import asyncio
+    from app.config import settings
+    from app.services.catalog_service import load_catalog_indexes, watch_catalog_file
+    # Build the catalog indexes now rather than on the first request that needs them
+    load_catalog_indexes()
+    catalog_watcher = None
+    if settings.catalog_path and settings.catalog_poll_seconds > 0:
+        catalog_watcher = asyncio.create_task(watch_catalog_file(settings.catalog_poll_seconds))
+    # Index the built frontend so page loads are served from memory
+    from app.utils.static_assets import load_static_assets
+    load_static_assets()
     yield
     # Shutdown
     logger.info("Shutting down FastAPI application...")
+    if catalog_watcher:
+        catalog_watcher.cancel()
+    from app.utils.auth_utils import shutdown_password_executor
+    shutdown_password_executor()
     # TODO: Close database connections, cleanup resources, etc.
 
 # Create FastAPI app instance
@@ -35,7 +52,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -93,7 +111,7 @@ async def api_info():
     }
 
 # Import and include route modules
-from app.routes import auth, config, endpoints, user, conversations, models, files, messages, memory, stubs, agent
+from app.routes import auth, config, endpoints, user, conversations, models, files, messages, memory, stubs, agent, catalog
 
 # Register all API routes
 app.include_router(auth.router, prefix="/api", tags=["Authentication"])
@@ -106,6 +124,7 @@ app.include_router(files.router, prefix="/api", tags=["Files"])
 app.include_router(messages.router, prefix="/api", tags=["Messages"])
 app.include_router(memory.router, prefix="/api/memory", tags=["Memory"])
 app.include_router(stubs.router, prefix="/api", tags=["Stubs"])
+app.include_router(catalog.router, prefix="/api", tags=["Catalog"])
 app.include_router(agent.router, prefix="/agents", tags=["Agents"])
 
 # TODO: Import and include route modules here
@@ -123,24 +142,15 @@ async def catch_all(full_path: str, request: Request):
     if full_path == "api" or full_path.startswith("api/"):
         raise HTTPException(status_code=404, detail="API endpoint not found")
     
-    from fastapi.responses import FileResponse, HTMLResponse
-    import os
+    from app.utils.static_assets import get_static_assets
     
-    frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'client', 'dist'))
-    
-    # First, try to serve the requested file (for static assets like CSS, JS, images)
-    file_path = os.path.join(frontend_path, full_path)
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        return FileResponse(file_path)
-    
-    # If file doesn't exist, serve index.html (for frontend routes like /login, /chat, etc.)
-    index_path = os.path.join(frontend_path, 'index.html')
-    if os.path.exists(index_path):
-        with open(index_path, 'r') as f:
-            content = f.read()
-        return HTMLResponse(content=content)
-    else:
+    # Static assets (CSS, JS, images) by path; anything else is a frontend route and gets
+    # index.html (/login, /chat, etc.). Both come from the index built at startup.
+    assets = get_static_assets()
+    asset = assets.lookup(full_path)
+    if asset is None:
         raise HTTPException(status_code=404, detail="Frontend not found")
+    return assets.respond(asset, request.headers.get("if-none-match"), request.headers.get("accept-encoding"))
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stdlib json vs. the fast_json backends for the payloads we send most
+
+Run directly: python tests/bench_json.py [iterations]
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.fast_json import FastJSONResponse, SSEFrame, sse_event, use_json_backend
+from app.utils.response_utils import ApiResponse
+
+TEXT = "Here is the plan for your request. " * 40
+
+CHUNK = {
+    "message": True, "messageId": "9f1c2d3e-aaaa-bbbb-cccc-1234567890ab", "conversationId": "42",
+    "parentMessageId": "1b2c3d4e-aaaa-bbbb-cccc-1234567890ab", "sender": "Ticket Bot", "text": TEXT,
+    "isCreatedByUser": False, "createdAt": datetime.now().isoformat(), "updatedAt": datetime.now().isoformat(),
+    "model": "llama3.1", "endpoint": "custom", "unfinished": True, "error": False, "isEdited": False,
+}
+FIXED = {k: v for k, v in CHUNK.items() if k not in ("text", "updatedAt")}
+
+CONFIG = ApiResponse.create_success(
+    data={"appTitle": "Ticket Orchestration Chat", "features": {"registration": True, "fileUpload": True},
+          "endpoints": {"custom": True, "openAI": False}, "models": ["llama3.1"] * 5},
+    message="Configuration retrieved successfully",
+)
+
+def baseline_chunk():
+    return f"event: message\ndata: {json.dumps(CHUNK)}\n\n"
+
+def baseline_response():
+    return json.dumps(CONFIG.model_dump(mode="json")).encode("utf-8")
+
+def _time(name: str, fn, iterations: int) -> None:
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=3))
+    print(f"{name:<48} {seconds / iterations * 1e6:>8.2f}")
+
+def run(iterations: int) -> None:
+    print(f"{'case':<48} {'us/op':>8}")
+    _time("sse chunk: json.dumps f-string (before)", baseline_chunk, iterations)
+    _time("response: model_dump + json.dumps (before)", baseline_response, iterations)
+    for backend in ("stdlib", "orjson"):
+        if use_json_backend(backend) != backend:
+            print(f"(skipping {backend}: not installed)")
+            continue
+        frame = SSEFrame(FIXED, changing=("text", "updatedAt"))
+        _time(f"sse chunk: sse_event [{backend}]", lambda: sse_event(CHUNK), iterations)
+        _time(f"sse chunk: SSEFrame.render [{backend}]",
+              lambda: frame.render(TEXT, CHUNK["updatedAt"]), iterations)
+        _time(f"response: FastJSONResponse [{backend}]", lambda: FastJSONResponse(CONFIG).body, iterations)
+    use_json_backend("auto")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
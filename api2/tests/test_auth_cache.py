@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the token -> user cache and token_version revocation
+"""
+
+import os
+import sys
+from datetime import timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, get_db
+from app.models.user import User
+from app.utils import metrics
+from app.utils.auth_utils import (
+    bump_token_version, clear_user_cache, create_access_token, get_user_from_token
+)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(email="cache@example.com", password="not-a-hash", role="USER"))
+    session.commit()
+    clear_user_cache()
+    yield session
+    session.close()
+    clear_user_cache()
+
+def _token(user, version=None):
+    claims = {"sub": str(user.id)} if version is None else {"sub": str(user.id), "ver": version}
+    return create_access_token(claims, expires_delta=timedelta(minutes=5))
+
+def test_cached_resolution(db):
+    """The second request with a token is served from the cache"""
+    user = db.query(User).first()
+    token = _token(user, 0)
+    hits, misses = metrics.get_counter("auth_cache.hit"), metrics.get_counter("auth_cache.miss")
+
+    first = get_user_from_token(token, db)
+    second = get_user_from_token(token, db)
+    assert first == second and first.email == "cache@example.com" and first.token_version == 0
+    assert metrics.get_counter("auth_cache.miss") == misses + 1
+    assert metrics.get_counter("auth_cache.hit") == hits + 1
+    print("✅ PASS")
+
+def test_bumped_version_revokes_tokens(db):
+    """After a bump, cached and uncached old tokens are rejected; new ones work"""
+    user = db.query(User).first()
+    old, legacy = _token(user, 0), _token(user)        # tokens from before the "ver" claim count as 0
+    get_user_from_token(old, db)
+
+    bump_token_version(user, db)
+    for token in (old, legacy):
+        with pytest.raises(HTTPException) as error:
+            get_user_from_token(token, db)
+        assert error.value.status_code == 401
+    assert get_user_from_token(_token(user, 1), db).token_version == 1
+    print("✅ PASS")
+
+def test_logout_endpoint(db):
+    """POST /api/auth/logout revokes the caller's token"""
+    from main import app
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {_token(db.query(User).first(), 0)}"}
+        assert client.get("/api/user", headers=headers).status_code == 200
+        assert client.post("/api/auth/logout", headers=headers).status_code == 200
+        assert client.get("/api/user", headers=headers).status_code == 401
+        assert client.post("/api/auth/refresh", headers=headers).status_code == 401
+    finally:
+        app.dependency_overrides.clear()
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for batched prefill and summary calls (LLM_BATCH_CALLS)
+"""
+
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.config import settings
+from app.models.ticket_agent import TicketItem, TicketPlan
+from app.services import field_prefiller_service, summary_service
+from app.services.field_prefiller_service import prefill_ticket_fields_batch_async
+from app.services.summary_service import generate_summaries_for_plan
+
+def _incident(description):
+    return TicketItem(
+        service_area="SRE/Production Support", category="Report an Incident", ticket_type="Open an incident here",
+        title="Incident", description=description, form={"description": description},
+    )
+
+def _fake_llm(monkeypatch, answers):
+    """Each call pops the next answer; the prompts are recorded."""
+    calls = []
+
+    class Response:
+        def __init__(self, content):
+            self.content = content
+
+    async def generate(messages, **kwargs):
+        calls.append(messages)
+        return Response(answers.pop(0))
+
+    monkeypatch.setattr(field_prefiller_service.llm_service, "generate_non_streaming_response", generate)
+    return calls
+
+def test_prefill_batch_one_call(monkeypatch):
+    calls = _fake_llm(monkeypatch, [json.dumps({"1": {"description": "api down"}, "2": {"description": "db slow"}})])
+    items = [_incident(""), _incident("")]
+
+    results = asyncio.run(prefill_ticket_fields_batch_async(items, "api is down and the db is slow, high urgency"))
+    assert len(calls) == 1
+    assert "### Ticket 2" in calls[0][1].content
+    assert [form["description"] for form, _ in results] == ["api down", "db slow"]
+    assert results[0][1]["description"] == {"source": "llm", "batched": True}
+    assert results[0][0]["urgency"] == "high"            # rules still run per item
+    print("✅ PASS")
+
+def test_prefill_batch_falls_back_per_item(monkeypatch):
+    """A section missing from the batched answer gets its own call"""
+    calls = _fake_llm(monkeypatch, [json.dumps({"1": {"description": "api down"}}), json.dumps({"description": "db slow"})])
+    items = [_incident(""), _incident("")]
+
+    results = asyncio.run(prefill_ticket_fields_batch_async(items, "api is down and the db is slow"))
+    assert len(calls) == 2
+    assert results[1][0]["description"] == "db slow"
+    assert results[1][1]["description"] == {"source": "llm"}
+    print("✅ PASS")
+
+def test_summaries_batched(monkeypatch):
+    monkeypatch.setattr(settings, "llm_batch_calls", True)
+    calls = _fake_llm(monkeypatch, [json.dumps({"1": "Payments API outage"}), "Database latency"])
+    loan_tape = TicketItem(
+        service_area="SRE/Production Support", category="Financial Service Request", ticket_type="Loan Tape",
+        title="Loan tape", description="", form={"vendor_name": "AAA Final Loan Tape", "type_of_rerun": "final"},
+    )
+    plan = TicketPlan(items=[_incident("payments api down"), loan_tape, _incident("db slow")], meta={})
+
+    asyncio.run(generate_summaries_for_plan(plan))
+    assert len(calls) == 2                                # one batch + one fallback, the template needs none
+    assert [item.form["summary"] for item in plan.items] == [
+        "Payments API outage", "AAA Final Loan Tape rerun (final)", "Database latency"
+    ]
+    assert plan.items[0].field_sources["summary"] == {"source": "llm", "batched": True}
+    assert plan.items[2].field_sources["summary"] == {"source": "llm"}
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
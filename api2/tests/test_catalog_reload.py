@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for loading and hot-reloading the catalog from a data file
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import CATALOG
+from app.config import settings
+from app.services import catalog_service
+from app.services.catalog_service import (
+    find_ticket_spec,
+    get_catalog_index,
+    get_catalog_snapshot,
+    get_catalog_version,
+    load_catalog_indexes,
+    register_catalog_index,
+    reload_catalog,
+)
+
+AREA, CATEGORY, TICKET = "SRE/Production Support", "Report an Incident", "Open an incident here"
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+def test_catalog_reload_from_file():
+    """A changed file produces a new version while old versions stay resolvable"""
+    builtin_version = get_catalog_version()
+    original_path = settings.catalog_path
+    builds = []
+    register_catalog_index("test_counter", lambda snap: builds.append(snap.version) or len(snap.specs))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        data = copy.deepcopy(CATALOG)
+        _write(path, data)
+        settings.catalog_path = path
+        try:
+            snapshot, changed = reload_catalog()
+            print(f"Loaded {snapshot.version} from file (changed={changed})")
+            # Same content as the built-in catalog means the same version
+            assert snapshot.version == builtin_version
+
+            # Edit the description of one ticket type
+            spec = next(s for s in data["categories"][AREA][CATEGORY] if s["ticket_type"] == TICKET)
+            spec["description"] = "Edited description"
+            _write(path, data)
+            snapshot, changed = reload_catalog()
+            assert changed
+            assert snapshot.version != builtin_version
+            assert snapshot.version in builds, "derived indexes are rebuilt at load time"
+            assert get_catalog_index("test_counter") == len(snapshot.specs)
+
+            # Live lookups see the edit, pinned lookups keep the old spec
+            assert find_ticket_spec(AREA, CATEGORY, TICKET)["description"] == "Edited description"
+            assert find_ticket_spec(AREA, CATEGORY, TICKET, builtin_version)["description"] != "Edited description"
+
+            # An unchanged mtime is a no-op
+            _, changed = reload_catalog()
+            assert not changed
+
+            # A broken file is rejected and the live catalog stays in place
+            with open(path, "w") as f:
+                f.write("{not json")
+            os.utime(path, (os.stat(path).st_atime, os.stat(path).st_mtime + 1))
+            try:
+                reload_catalog()
+                assert False, "expected ValueError"
+            except ValueError as e:
+                print(f"Rejected broken catalog: {e}")
+            assert get_catalog_version() == snapshot.version
+
+            # So is a file that was deleted after it was loaded
+            os.remove(path)
+            try:
+                reload_catalog()
+                assert False, "expected ValueError"
+            except ValueError as e:
+                print(f"Rejected missing catalog: {e}")
+            assert get_catalog_version() == snapshot.version
+        finally:
+            settings.catalog_path = original_path
+            catalog_service._INDEX_BUILDERS.pop("test_counter", None)
+            reload_catalog(force=True)
+
+    assert get_catalog_version() == builtin_version
+    print("✅ PASS")
+
+def test_load_catalog_indexes():
+    """The index modules are loaded on demand and build their indexes for the live catalog"""
+    load_catalog_indexes()
+    assert {"option_sources", "option_search", "catalog_retrieval", "catalog_router", "intent_classifier"} <= set(get_catalog_snapshot().indexes)
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_catalog_reload_from_file()
+    test_load_catalog_indexes()
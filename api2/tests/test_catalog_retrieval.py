@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for embedding-based catalog retrieval used to slice the planner prompt
+"""
+
+import os
+import subprocess
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from app.config import settings
+from app.services import catalog_retrieval
+from app.services.catalog_retrieval import CatalogRetrievalIndex, retrieve_ticket_types
+from app.services.catalog_service import get_catalog_snapshot, slice_catalog_for_prompt
+
+def _top(text):
+    return retrieve_ticket_types(text, 1)[0][0][2]
+
+def test_top_match_per_request():
+    """Requests without the old hard-coded keywords still find their ticket type"""
+    assert _top("high urgency datadog monitoring") == "Datadog Monitors and Dashboards"
+    assert _top("I need a final loan tape for AAA") == "Loan Tape"
+    assert _top("investor report rerun from july 18 to tomorrow") == "Investor Reports Manual Rerun"
+    assert _top("update the global yaml config") == "Request for global Configuration YAML File Update"
+    assert _top("who is on call? need help with the xmatters schedule") == "XMatters consultation request"
+    assert _top("goanywhere uat project") == "GoAnywhere Request UAT"
+    print("✅ PASS")
+
+def test_slice_is_ranked_and_bounded():
+    """The planner slice keeps the catalog shape but only carries the top-k ticket types"""
+    sliced = slice_catalog_for_prompt("set up sftp connectivity for a new vendor")
+    specs = [spec for cats in sliced.values() for specs in cats.values() for spec in specs]
+    assert len(specs) == settings.catalog_retrieval_top_k
+    assert specs[0]["ticket_type"] in ("SFTP New Connectivity", "SFTP Migration")
+    assert len(specs) < len(get_catalog_snapshot().specs)
+    print("✅ PASS")
+
+def test_provider_embeddings_fall_back(monkeypatch):
+    """An unreachable embedding provider leaves the local TF-IDF index in charge"""
+    def refuse(*args, **kwargs):
+        raise httpx.ConnectError("connection refused")
+    monkeypatch.setattr(settings, "catalog_embedding_model", "nomic-embed-text")
+    monkeypatch.setattr(catalog_retrieval.httpx, "post", refuse)
+
+    index = CatalogRetrievalIndex(get_catalog_snapshot())
+    assert index.embedder == "hashing"
+    assert index.search("jams batch job", 1)[0][0][2] == "JAMS Batch Job Request"
+    print("✅ PASS")
+
+def test_malformed_provider_answers_fall_back(monkeypatch):
+    """Embeddings of the wrong shape are rejected at build time instead of breaking the catalog load"""
+    class Response:
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"embeddings": [[0.1, 0.2]]}          # one vector for many documents
+    monkeypatch.setattr(settings, "catalog_embedding_model", "nomic-embed-text")
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(catalog_retrieval.httpx, "post", lambda *args, **kwargs: Response())
+
+    index = CatalogRetrievalIndex(get_catalog_snapshot())
+    assert index.embedder == "hashing"
+    print("✅ PASS")
+
+def test_failed_query_embeddings_skip_the_provider(monkeypatch):
+    """After a query embedding fails, queries use TF-IDF for a while without calling the provider"""
+    snapshot = get_catalog_snapshot()
+    calls = []
+
+    class Response:
+        def __init__(self, texts):
+            self.texts = texts
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"embeddings": [[1.0, float(i)] for i in range(len(self.texts))]}
+
+    def post(url, json=None, **kwargs):
+        calls.append(len(json["input"]))
+        if len(calls) > 1:
+            raise httpx.ReadTimeout("timed out")
+        return Response(json["input"])
+    monkeypatch.setattr(settings, "catalog_embedding_model", "nomic-embed-text")
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(catalog_retrieval.httpx, "post", post)
+
+    index = CatalogRetrievalIndex(snapshot)
+    assert index.embedder == "provider"
+    assert index.search("jams batch job", 1)[0][0][2] == "JAMS Batch Job Request"
+    assert index.search("jams batch job", 1)[0][0][2] == "JAMS Batch Job Request"
+    assert len(calls) == 2, "the provider is not retried right after a failure"
+    print("✅ PASS")
+
+def test_imports_on_its_own():
+    """catalog_retrieval can be the first module imported (no cycle through catalog_service)"""
+    root = os.path.join(os.path.dirname(__file__), '..')
+    result = subprocess.run([sys.executable, "-c", "import app.services.catalog_retrieval"], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for staged department -> category -> ticket type routing
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import catalog_service
+from app.services.catalog_router import route_catalog
+from app.utils import metrics
+
+TOPICS = {
+    "Human Resources": ["payroll", "benefits", "onboarding"],
+    "Facilities": ["parking", "badge", "desk"],
+    "Legal": ["contract", "subpoena", "trademark"],
+    "Finance": ["invoice", "expense", "budget"],
+    "Security": ["phishing", "firewall", "vulnerability"],
+    "Marketing": ["campaign", "newsletter", "branding"],
+    "Procurement": ["purchase", "supplier", "quote"],
+    "Training": ["course", "certification", "workshop"],
+    "Travel": ["flight", "hotel", "visa"],
+    "Networking": ["vpn", "wifi", "dns"],
+}
+
+def _big_catalog():
+    """Ten departments x three categories x four ticket types"""
+    categories = {}
+    for department, topics in TOPICS.items():
+        categories[department] = {
+            f"{topic.title()} Requests": [
+                {
+                    "ticket_type": f"{topic.title()} {action}",
+                    "description": f"{action} a {topic} item for the {department.lower()} team",
+                    "fields": [{"name": "details", "type": "string", "description": f"Describe the {topic} {action.lower()}"}],
+                }
+                for action in ("Change", "Review", "Cancel", "Report")
+            ]
+            for topic in topics
+        }
+    return {"department": list(TOPICS), "categories": categories}
+
+def test_staged_routing_on_large_catalog():
+    """Only the chosen department/category is scored, not the whole catalog"""
+    snapshot = catalog_service._build_snapshot(_big_catalog(), "test:big")
+    router = snapshot.indexes["catalog_router"]
+    assert len(snapshot.specs) == 120
+
+    result = router.route("please review my hotel booking for the trip")
+    assert result.departments[0][0] == "Travel"
+    assert result.categories[0][0] == ("Travel", "Hotel Requests")
+    assert result.ticket_types[0][0] == ("Travel", "Hotel Requests", "Hotel Review")
+    assert result.confident_stages == ["department", "category"]
+    assert result.scored == 4
+
+    # Cached per catalog version and normalized text
+    metrics.reset()
+    assert router.route("  Please review my HOTEL booking for the trip ") is result
+    assert metrics.get_counter("planner_route.cache_hit") == 1
+    print("✅ PASS")
+
+def test_unclear_requests_keep_several_branches():
+    """Without a clear winner a stage keeps the close runners-up instead of guessing"""
+    snapshot = catalog_service._build_snapshot(_big_catalog(), "test:big")
+    result = snapshot.indexes["catalog_router"].route("cancel my vpn and my flight")
+    departments = [d for d, _ in result.departments]
+    assert "Networking" in departments and "Travel" in departments
+    assert "department" not in result.confident_stages
+    kept_types = {key[2] for key, _ in result.ticket_types}
+    assert {"Vpn Cancel", "Flight Cancel"} <= kept_types
+    print("✅ PASS")
+
+def test_vague_requests_get_the_whole_catalog():
+    """A request no department matches is not cut down to the first branches in catalog order"""
+    result = route_catalog("production is down, urgent")
+    assert result.full_catalog and result.confident_stages == []
+    kept_types = {key[2] for key, _ in result.ticket_types}
+    assert "Open an incident here" in kept_types
+    assert sum(len(specs) for specs in result.catalog_slice()["SRE/Production Support"].values()) == len(catalog_service.get_catalog_snapshot().specs)
+    print("✅ PASS")
+
+def test_fallback_routes_are_not_cached():
+    """While provider embeddings are down, local routes are not cached for when it is back"""
+    snapshot = catalog_service._build_snapshot(_big_catalog(), "test:big")
+    router = snapshot.indexes["catalog_router"]
+    router.retrieval.provider = SimpleNamespace(name="ollama")
+    router.retrieval.provider_down_until = time.monotonic() + 60
+
+    metrics.reset()
+    router.route("please review my hotel booking for the trip")
+    router.route("please review my hotel booking for the trip")
+    assert metrics.get_counter("planner_route.cache_hit") == 0
+    assert metrics.get_counter("planner_route.routed") == 2
+    print("✅ PASS")
+
+def test_builtin_catalog_slice():
+    """The live catalog routes datadog requests to IT Service Requests"""
+    result = route_catalog("high urgency datadog monitoring")
+    assert result.categories[0][0] == ("SRE/Production Support", "IT Service Requests")
+    sliced = result.catalog_slice()
+    assert sliced["SRE/Production Support"]["IT Service Requests"][0]["ticket_type"] == "Datadog Monitors and Dashboards"
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_staged_routing_on_large_catalog()
+    test_unclear_requests_keep_several_branches()
+    test_vague_requests_get_the_whole_catalog()
+    test_fallback_routes_are_not_cached()
+    test_builtin_catalog_slice()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for local fuzzy matching of choice answers
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import (
+    ENVIRONMENTS,
+    FROM_INVESTORS_MANUAL_LOAN_VERIFICATIONS,
+    INVESTORS_SFTP_REQUESTS,
+    SERVICE_FIELDS,
+    VENDORS_LOAN_TAPE,
+)
+from app.models.ticket_agent import FieldDef
+from app.services.choice_matcher import ChoiceMatcher, match_choice
+from app.services.field_processor import FieldProcessor
+from app.utils import metrics
+
+def test_local_matches():
+    """Typos, abbreviations and partial names resolve without the LLM"""
+    cases = [
+        ("pimco", INVESTORS_SFTP_REQUESTS, "Pimco"),
+        ("morgan stanly", FROM_INVESTORS_MANUAL_LOAN_VERIFICATIONS, "Morgan Stanley Standard"),
+        ("MS", INVESTORS_SFTP_REQUESTS, "Morgan Stanley"),
+        ("goldmn", INVESTORS_SFTP_REQUESTS, "Goldman"),
+        ("production", ENVIRONMENTS, "prd"),
+        ("cloudwatch logs", SERVICE_FIELDS, "cloud watch logs"),
+        ("stoneridge", VENDORS_LOAN_TAPE, "Stone Ridge Final Loan Tape"),
+    ]
+    for text, options, expected in cases:
+        result = match_choice(text, options)
+        print(f"'{text}' -> {result.option} ({result.source}, {result.score:.2f})")
+        assert result.option == expected, f"{text!r} matched {result.option!r}"
+    print("✅ PASS")
+
+def test_ambiguous_and_unknown_answers():
+    """Close calls return candidates for the LLM; nonsense returns nothing"""
+    matcher = ChoiceMatcher(FROM_INVESTORS_MANUAL_LOAN_VERIFICATIONS)
+    result = matcher.match("stoneridge 2022")
+    assert result.source == "ambiguous" and result.option is None
+    assert set(result.candidates[:2]) == {"Stoneridge 2022-1 v2", "Stoneridge 2022-2 v2"}
+
+    result = matcher.match("banana")
+    assert result.source == "none" and result.candidates == []
+    print("✅ PASS")
+
+def test_sync_processor_uses_matcher():
+    """The sync processor resolves fuzzy answers and counts how they were matched"""
+    field = FieldDef(name="from_investor", type="choice", options=INVESTORS_SFTP_REQUESTS)
+    before = metrics.get_counter("choice_match.local")
+    assert FieldProcessor.process_field_value("wilmington", field) == "Wilmington Trust"
+    assert metrics.get_counter("choice_match.local") == before + 1
+    try:
+        FieldProcessor.process_field_value("banana", field)
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Rejected: {str(e)[:60]}...")
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_local_matches()
+    test_ambiguous_and_unknown_answers()
+    test_sync_processor_uses_matcher()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the local date/time grammar used by field processing
+"""
+
+import os
+import sys
+from datetime import date
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.ticket_agent import FieldDef
+from app.services.date_parser import parse_date, parse_date_range, parse_time
+from app.services.field_processor import FieldProcessor
+
+MONDAY = date(2026, 10, 19)
+
+def test_date_grammar():
+    """Absolute formats, relative words, weekdays and business days parse without the LLM"""
+    cases = [
+        ("2024-01-15", "2024-01-15"),
+        ("01/15/2024", "2024-01-15"),
+        ("15/01/2024", "2024-01-15"),
+        ("January 15, 2024", "2024-01-15"),
+        ("15 Jan 2024", "2024-01-15"),
+        ("tomorrow", "2026-10-20"),
+        ("next friday", "2026-10-23"),
+        ("this monday", "2026-10-19"),
+        ("last friday", "2026-10-16"),
+        ("in 3 days", "2026-10-22"),
+        ("a week from now", "2026-10-26"),
+        ("july 18th", "2026-07-18"),
+        ("12/25", "2026-12-25"),
+        ("in 5 business days", "2026-10-26"),
+        ("end of month", "2026-10-31"),
+        ("beginning of next month", "2026-11-01"),
+        ("can you run it next tue please", "2026-10-20"),
+    ]
+    for text, expected in cases:
+        result = parse_date(text, today=MONDAY)
+        print(f"'{text}' -> {result}")
+        assert result == expected, f"{text!r}: {result} != {expected}"
+    assert parse_date("whenever works", today=MONDAY) is None
+    assert parse_date("eod", today=MONDAY) == "2026-10-19"
+    assert parse_date("need it asap", today=MONDAY) is None
+    print("✅ PASS")
+
+def test_ranges_and_times():
+    """Ranges give start/end, times normalize to 24h HH:MM"""
+    assert parse_date_range("from july 18 to tomorrow", today=MONDAY) == (date(2026, 7, 18), date(2026, 10, 20))
+    assert parse_date_range("between oct 1 and oct 5", today=MONDAY) == (date(2026, 10, 1), date(2026, 10, 5))
+    assert parse_date("oct 20 - oct 22", today=MONDAY, prefer_end=True) == "2026-10-22"
+    assert parse_date_range("3/4 to 3/8", today=MONDAY) == (date(2027, 3, 4), date(2027, 3, 8))
+
+    assert parse_time("2:30 PM") == "14:30"
+    assert parse_time("9am") == "09:00"
+    assert parse_time("noon") == "12:00"
+    assert parse_time("25:00") is None
+    print("✅ PASS")
+
+def test_weekday_ranges():
+    """The end of a weekday range is the next such day after its start"""
+    work_week = (date(2026, 10, 26), date(2026, 10, 30))
+    assert parse_date_range("monday - friday", today=MONDAY) == work_week
+    assert parse_date_range("between monday and friday", today=MONDAY) == work_week
+    assert parse_date_range("friday to monday", today=MONDAY) == (date(2026, 10, 23), date(2026, 10, 26))
+    assert parse_date_range("from wednesday until tuesday", today=MONDAY) == (date(2026, 10, 21), date(2026, 10, 27))
+    assert parse_date_range("this monday to friday", today=MONDAY) == (date(2026, 10, 19), date(2026, 10, 23))
+    print("✅ PASS")
+
+def test_bare_numbers_in_free_text_are_not_dates():
+    """m/d only parses as a standalone answer"""
+    assert parse_date("3/4", today=MONDAY) == "2027-03-04"
+    assert parse_date("due 12/25", today=MONDAY) == "2026-12-25"
+    assert parse_date("deploy version 3/4 of the service", today=MONDAY) is None
+    assert parse_date("split it 50/50 please", today=MONDAY) is None
+    print("✅ PASS")
+
+def test_end_fields_take_range_end():
+    """An end_* date field answered with a range keeps the end of it"""
+    start = FieldDef(name="start_date", type="date")
+    end = FieldDef(name="end_date", type="date")
+    assert FieldProcessor.process_field_value("2024-03-01 to 2024-03-05", start) == "2024-03-01"
+    assert FieldProcessor.process_field_value("2024-03-01 to 2024-03-05", end) == "2024-03-05"
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_date_grammar()
+    test_ranges_and_times()
+    test_weekday_ranges()
+    test_bare_numbers_in_free_text_are_not_dates()
+    test_end_fields_take_range_end()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate request detection
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.config import settings
+from app.models.ticket_agent import TicketItem, TicketPlan
+from app.services.catalog_service import get_catalog_version
+from app.services.duplicate_detector import DuplicateIndex, DuplicateMatch, describe_duplicate, parse_confirmation
+from app.routes import endpoints
+from app.services import agent_completion
+from app.utils.session_store import delete, get
+
+def _plan():
+    item = TicketItem(
+        service_area="SRE/Production Support", category="Financial Service Request", ticket_type="Loan Tape",
+        title="AAA loan tape", description="Final loan tape for AAA",
+        form={"vendor_name": "AAA Final Loan Tape", "urgency": "Medium"},
+    )
+    return TicketPlan(items=[item], meta={"request_text": "final loan tape for AAA"}, catalog_version=get_catalog_version())
+
+def _complete_plan():
+    plan = _plan()
+    plan.items[0].form.update({
+        "email": "a@example.com", "description": "Final loan tape for AAA",
+        "request_date": "2025-07-18", "type_of_rerun": "final",
+    })
+    return plan
+
+TICKETS = [{"pseudo_id": "T-1", "ticket_type": "Loan Tape", "title": "AAA loan tape"}]
+
+def test_near_duplicate_is_found():
+    """Rephrasings of a completed request match it; unrelated requests don't"""
+    index = DuplicateIndex(window_seconds=900)
+    index.add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+
+    match = index.find("a@example.com", "Final loan tape for AAA!", threshold=0.5)
+    assert match and match.similarity == 1.0
+    assert index.find("a@example.com", "can you send the final loan tape for AAA", threshold=0.5)
+    assert index.find("a@example.com", "reset my vpn password", threshold=0.5) is None
+    assert "AAA loan tape (T-1)" in describe_duplicate(match)
+    print("✅ PASS")
+
+def test_different_key_values_are_not_duplicates():
+    """Same wording with a different vendor is a new request"""
+    index = DuplicateIndex(window_seconds=900)
+    index.add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+    assert index.find("a@example.com", "final loan tape for Pimco", threshold=0.5) is None
+    print("✅ PASS")
+
+def test_window_and_users():
+    """Entries are per user and expire after the window"""
+    index = DuplicateIndex(window_seconds=900)
+    entry = index.add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+    assert index.find("b@example.com", "final loan tape for AAA", threshold=0.5) is None
+
+    entry.created_at -= 901
+    assert index.find("a@example.com", "final loan tape for AAA", threshold=0.5) is None
+    assert len(index) == 0
+    print("✅ PASS")
+
+def test_default_window_follows_settings(monkeypatch):
+    """The shared index reads DUPLICATE_WINDOW_SECONDS when used, so a config reload applies"""
+    index = DuplicateIndex()
+    entry = index.add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+    entry.created_at -= 120
+    monkeypatch.setattr(settings, "duplicate_window_seconds", 900)
+    assert index.find("a@example.com", "final loan tape for AAA", threshold=0.5)
+    monkeypatch.setattr(settings, "duplicate_window_seconds", 60)
+    assert index.find("a@example.com", "final loan tape for AAA", threshold=0.5) is None
+    print("✅ PASS")
+
+def test_parse_confirmation():
+    assert parse_confirmation("yes please") is True
+    assert parse_confirmation("Create another one") is True
+    assert parse_confirmation("no, keep it") is False
+    assert parse_confirmation("what?") is None
+    print("✅ PASS")
+
+def test_declined_duplicate_does_not_leak_into_next_request(monkeypatch):
+    """After "no", the next request is planned fresh; after "yes", the matched request is planned"""
+    planned = []
+    async def plan_from_text_async(text, email=None):
+        planned.append(text)
+        return _plan()
+    entry = DuplicateIndex(900).add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+    matches = {"please rerun the final loan tape for AAA": DuplicateMatch(entry, 0.9)}
+    monkeypatch.setattr(endpoints, "plan_from_text_async", plan_from_text_async)
+    monkeypatch.setattr(endpoints, "find_duplicate_request", lambda user, text: matches.get(text))
+    monkeypatch.setattr(endpoints, "start_early_summaries", lambda plan, missing: None)
+
+    run = lambda text: asyncio.run(endpoints.handle_agentic_ticket_creation(text, 555111, "a@example.com"))
+    assert run("please rerun the final loan tape for AAA")["type"] == "agent_duplicate"
+    assert run("no")["type"] == "agent_duplicate"
+    assert get("conv_555111") is None
+    run("create a datadog log setup ticket for service foo")
+    assert planned == ["create a datadog log setup ticket for service foo"]
+
+    delete("conv_555111")
+    run("please rerun the final loan tape for AAA")
+    run("yes, create it")
+    assert planned[-1] == "please rerun the final loan tape for AAA"
+    delete("conv_555111")
+    print("✅ PASS")
+
+class _Request:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+def test_completed_session_is_not_reused(monkeypatch):
+    """Repeating a completed request in the same conversation goes through the duplicate check"""
+    recorded = []
+    async def plan_from_text_async(text, email=None):
+        plan = _complete_plan()
+        plan.meta["request_text"] = text
+        return plan
+    async def summaries(plan):
+        return plan
+    entry = DuplicateIndex(900).add("a@example.com", "final loan tape for AAA", _plan(), TICKETS)
+    monkeypatch.setattr(endpoints, "plan_from_text_async", plan_from_text_async)
+    monkeypatch.setattr(endpoints, "find_duplicate_request", lambda user, text: DuplicateMatch(entry, 1.0) if recorded else None)
+    monkeypatch.setattr(endpoints, "start_early_summaries", lambda plan, missing: None)
+    monkeypatch.setattr(agent_completion, "generate_summaries_for_plan", summaries)
+    monkeypatch.setattr(agent_completion, "persist_final_plan", lambda state, db=None: None)
+    monkeypatch.setattr(agent_completion, "record_completed_request", lambda *args: recorded.append(args))
+
+    run = lambda text: asyncio.run(endpoints.handle_agentic_ticket_creation(text, 555222, "a@example.com"))
+    assert run("final loan tape for AAA")["type"] == "agent_complete"
+    assert len(recorded) == 1
+    assert run("final loan tape for AAA")["type"] == "agent_duplicate"
+    assert len(recorded) == 1
+    delete("conv_555222")
+    print("✅ PASS")
+
+def test_agent_answer_completion_is_recorded(monkeypatch):
+    """Completing through /agent-answer indexes the request for the duplicate check"""
+    recorded = []
+    async def summaries(plan):
+        return plan
+    monkeypatch.setattr(agent_completion, "generate_summaries_for_plan", summaries)
+    monkeypatch.setattr(agent_completion, "persist_final_plan", lambda state, db=None: None)
+    monkeypatch.setattr(agent_completion, "record_completed_request", lambda *args: recorded.append(args))
+
+    plan = _complete_plan()
+    plan.items[0].form.pop("urgency")
+    state = agent_completion.open_agent_session("agent_555333")
+    state.plan = plan
+    state.pending = endpoints.find_missing_fields(plan)
+    assert [m.field.name for m in state.pending] == ["urgency"]
+
+    body = {"session_id": "agent_555333", "question": "Urgency?", "answer": "Medium"}
+    user = SimpleNamespace(email="a@example.com")
+    reply = asyncio.run(endpoints.answer_agent_question(_Request(body), db=None, current_user=user))
+    assert reply["type"] == "agent_complete"
+    assert recorded and recorded[0][0] == "a@example.com"
+    assert recorded[0][1] == "final loan tape for AAA"
+    delete("agent_555333")
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
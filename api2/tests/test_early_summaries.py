@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent and early (background) ticket summaries
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.models.ticket_agent import TicketItem, TicketPlan
+from app.routes import endpoints
+from app.services import agent_completion, summary_service
+from app.services.validator_service import find_missing_fields
+from app.services.summary_service import generate_summaries_for_plan, start_early_summaries
+from app.utils import metrics
+
+def _incident(description):
+    # No summary_template: always summarized by the LLM
+    return TicketItem(
+        service_area="SRE/Production Support", category="Report an Incident", ticket_type="Open an incident here",
+        title="Incident", description=description, form={"description": description, "urgency": "high"},
+    )
+
+def _fake_llm(monkeypatch, delay=0.2):
+    calls = []
+
+    class Response:
+        def __init__(self, content):
+            self.content = content
+
+    async def generate(messages, **kwargs):
+        calls.append(messages[-1].content)
+        await asyncio.sleep(delay)
+        return Response(f"Summary {len(calls)}")
+
+    monkeypatch.setattr(summary_service.llm_service, "generate_non_streaming_response", generate)
+    return calls
+
+def test_items_are_summarized_concurrently(monkeypatch):
+    calls = _fake_llm(monkeypatch)
+    plan = TicketPlan(items=[_incident(f"outage {i}") for i in range(3)], meta={})
+
+    started = time.perf_counter()
+    asyncio.run(generate_summaries_for_plan(plan))
+    elapsed = time.perf_counter() - started
+
+    assert len(calls) == 3
+    assert elapsed < 0.5, elapsed
+    assert all(item.form["summary"].startswith("Summary") for item in plan.items)
+    print("✅ PASS")
+
+def test_early_summary_is_reused(monkeypatch):
+    """A summary started while other questions are pending is used at completion"""
+    calls = _fake_llm(monkeypatch, delay=0.05)
+    plan = TicketPlan(items=[_incident("payments api is down")], meta={})
+    used = metrics.get_counter("summary.early_used")
+
+    async def flow():
+        start_early_summaries(plan, missing=[])
+        await asyncio.sleep(0.1)          # the user answers another question meanwhile
+        start_early_summaries(plan, missing=[])
+        assert plan.items[0].summary_draft["text"] == "Summary 1"
+        started = time.perf_counter()
+        await generate_summaries_for_plan(plan)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(flow())
+    assert len(calls) == 1
+    assert elapsed < 0.05
+    assert plan.items[0].form["summary"] == "Summary 1"
+    assert plan.items[0].field_sources["summary"] == {"source": "llm"}
+    assert metrics.get_counter("summary.early_used") == used + 1
+    print("✅ PASS")
+
+def test_changed_input_discards_the_early_summary(monkeypatch):
+    calls = _fake_llm(monkeypatch, delay=0.01)
+    plan = TicketPlan(items=[_incident("payments api is down")], meta={})
+
+    async def flow():
+        start_early_summaries(plan, missing=[])
+        await asyncio.sleep(0.05)
+        start_early_summaries(plan, missing=[])
+        plan.items[0].form["description"] = "checkout api is down"
+        await generate_summaries_for_plan(plan)
+
+    asyncio.run(flow())
+    assert len(calls) == 2
+    assert "checkout" in calls[-1]
+    assert plan.items[0].form["summary"] == "Summary 2"
+    print("✅ PASS")
+
+def test_superseded_and_evicted_tasks_are_cancelled(monkeypatch):
+    """Background summaries nobody will use are cancelled instead of left running"""
+    _fake_llm(monkeypatch, delay=1.0)
+    monkeypatch.setattr(summary_service, "_MAX_EARLY_TASKS", 1)
+    plan = TicketPlan(items=[_incident("payments api is down")], meta={})
+    other = TicketPlan(items=[_incident("vpn is down")], meta={})
+    cancelled = metrics.get_counter("summary.early_cancelled")
+
+    async def flow():
+        start_early_summaries(plan, missing=[])
+        first = summary_service._early_tasks[plan.items[0].summary_draft["fingerprint"]]
+        plan.items[0].form["description"] = "checkout api is down"
+        start_early_summaries(plan, missing=[])      # inputs changed: the first summary is useless
+        await asyncio.sleep(0)
+        assert first.cancelled()
+
+        second = summary_service._early_tasks[plan.items[0].summary_draft["fingerprint"]]
+        start_early_summaries(other, missing=[])     # over the limit: the oldest task is evicted
+        await asyncio.sleep(0)
+        assert second.cancelled()
+
+        # Completing a session releases the task it no longer needs
+        third = summary_service._early_tasks[other.items[0].summary_draft["fingerprint"]]
+        other.items[0].form["summary"] = "written by the user"
+        await generate_summaries_for_plan(other)
+        await asyncio.sleep(0)
+        assert third.cancelled()
+        assert summary_service._early_tasks == {}
+
+    asyncio.run(flow())
+    assert metrics.get_counter("summary.early_cancelled") == cancelled + 3
+    print("✅ PASS")
+
+def test_items_with_missing_fields_wait(monkeypatch):
+    from app.models.ticket_agent import FieldDef, MissingField
+    calls = _fake_llm(monkeypatch, delay=0.01)
+    plan = TicketPlan(items=[_incident("db is slow")], meta={})
+
+    async def flow():
+        start_early_summaries(plan, [MissingField(item_index=0, field=FieldDef(name="urgency", type="choice"))])
+        await asyncio.sleep(0.02)
+
+    asyncio.run(flow())
+    assert calls == []
+    print("✅ PASS")
+
+class _Request:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+def test_answer_endpoint_starts_and_uses_early_summaries(monkeypatch):
+    """/agent-answer starts summaries for finished items and completion reuses them"""
+    calls = _fake_llm(monkeypatch, delay=0.01)
+    monkeypatch.setattr(agent_completion, "persist_final_plan", lambda state, db=None: None)
+    monkeypatch.setattr(agent_completion, "record_completed_request", lambda *args: None)
+    done = _incident("payments api is down")
+    done.form.update({"email": "a@example.com", "attachments": "none"})
+    plan = TicketPlan(items=[done, _incident("vpn is down")], meta={})
+    state = agent_completion.open_agent_session("agent_778899")
+    state.plan = plan
+    state.pending = find_missing_fields(plan)
+    used = metrics.get_counter("summary.early_used")
+    user = SimpleNamespace(email="a@example.com")
+
+    async def flow():
+        answer = lambda text: endpoints.answer_agent_question(
+            _Request({"session_id": "agent_778899", "question": "?", "answer": text}), db=None, current_user=user)
+        assert (await answer("a@example.com"))["type"] == "agent_question"
+        assert plan.items[0].summary_draft is not None
+        await asyncio.sleep(0.05)
+        return await answer("screenshot.png")
+
+    assert asyncio.run(flow())["type"] == "agent_complete"
+    assert len(calls) == 2
+    assert metrics.get_counter("summary.early_used") == used + 1
+    assert summary_service._early_tasks == {}
+    agent_completion.drop_agent_session("agent_778899")
+    print("✅ PASS")
+
+def test_dropped_session_releases_its_early_summaries(monkeypatch):
+    _fake_llm(monkeypatch, delay=1.0)
+    plan = TicketPlan(items=[_incident("payments api is down")], meta={})
+
+    async def flow():
+        state = agent_completion.open_agent_session("agent_778800")
+        state.plan = plan
+        start_early_summaries(plan, missing=[])
+        task = summary_service._early_tasks[plan.items[0].summary_draft["fingerprint"]]
+        agent_completion.drop_agent_session("agent_778800")
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert summary_service._early_tasks == {}
+
+    asyncio.run(flow())
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
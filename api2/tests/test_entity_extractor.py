@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script for single-pass extraction of vendor/investor mentions during prefill
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import FROM_INVESTORS_MANUAL_LOAN_VERIFICATIONS, INVESTORS_SFTP_REQUESTS, VENDORS_LOAN_TAPE
+from app.services.entity_extractor import get_entity_extractor
+from app.services.field_prefiller_service import post_process_form_data
+
+def test_distinctive_mentions():
+    """Company names are found; generic words like "final" or "loan" never decide"""
+    vendors = get_entity_extractor(VENDORS_LOAN_TAPE)
+    assert vendors.best("Create a final loan tape for AAA vendor").option == "AAA Final Loan Tape"
+    assert vendors.best("estimated tape for colchis").option == "Colchis Estimated Loan Tape"
+    assert vendors.best("final loan tape for stoneridge").option == "Stone Ridge Final Loan Tape"
+    assert vendors.best("I need a final loan tape") is None
+    # Final and Estimated variants tie without a hint
+    assert vendors.best("colchis loan tape") is None
+
+    investors = get_entity_extractor(INVESTORS_SFTP_REQUESTS)
+    assert investors.best("sftp for citi securitization").option == "Citi Securitization"
+    # Two different companies named: don't guess
+    assert investors.best("move files from pimco to citi") is None
+    print("✅ PASS")
+
+def test_post_process_uses_extractor():
+    """Prefill post-processing no longer fills vendors from generic words"""
+    spec = {"fields": [{"name": "vendor_name", "type": "choice", "options": VENDORS_LOAN_TAPE}]}
+    assert post_process_form_data({}, "please rerun the final loan tape", spec) == {}
+    form = post_process_form_data({}, "rerun the Pimco final loan tape", spec)
+    assert form == {"vendor_name": "Pimco Final Loan Tape"}
+
+    spec = {"fields": [{"name": "from_investor", "type": "choice", "options": FROM_INVESTORS_MANUAL_LOAN_VERIFICATIONS}]}
+    assert post_process_form_data({}, "there is an issue at this point", spec) == {}
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_distinctive_mentions()
+    test_post_process_uses_extractor()
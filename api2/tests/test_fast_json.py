@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the JSON encoders used by responses and SSE frames
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse, SSEFrame, sse_event, use_json_backend
+from app.utils.response_utils import ApiResponse
+
+PAYLOAD = {
+    "messageId": "abc", "text": "Zeilenumbruch\nund “Anführungszeichen” ✅", "unfinished": True,
+    "createdAt": datetime(2026, 1, 2, 3, 4, 5), "messages": ["a", "b"], "count": 3, "ratio": 0.5, "none": None,
+}
+
+def _parse_frame(frame: bytes) -> dict:
+    head, data = frame.decode("utf-8").split("\n", 1)
+    assert head == "event: message" and data.startswith("data: ") and frame.endswith(b"\n\n")
+    return json.loads(data[len("data: "):])
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def backend(request):
+    name = use_json_backend(request.param)
+    if name != request.param:
+        pytest.skip(f"{request.param} is not installed")
+    yield name
+    use_json_backend("auto")
+
+def test_backends_agree(backend):
+    """Both encoders write the same JSON, including datetimes and Pydantic models"""
+    expected = {**PAYLOAD, "createdAt": "2026-01-02T03:04:05"}
+    assert json.loads(fast_json.dumps(PAYLOAD)) == expected
+    assert b"\n" not in fast_json.dumps(PAYLOAD)
+
+    response = FastJSONResponse(ApiResponse.create_success(data={"ok": True}, message="Done"))
+    body = json.loads(response.body)
+    assert body["success"] is True and body["data"] == {"ok": True} and isinstance(body["timestamp"], str)
+    print("✅ PASS")
+
+def test_precompiled_frames(backend):
+    """SSEFrame output equals the frame of the merged payload"""
+    fixed = {k: v for k, v in PAYLOAD.items() if k not in ("text", "count")}
+    frame = SSEFrame(fixed, changing=("text", "count"))
+    rendered = _parse_frame(frame.render(PAYLOAD["text"], 3))
+    assert rendered == _parse_frame(sse_event(PAYLOAD))
+    assert _parse_frame(SSEFrame({}, changing=("text",)).render("x")) == {"text": "x"}
+    assert _parse_frame(SSEFrame(fixed, changing=()).render()) == json.loads(fast_json.dumps(fixed))
+    with pytest.raises(ValueError):
+        frame.render("only text")
+    print("✅ PASS")
+
+def test_unknown_backend_falls_back():
+    assert use_json_backend("simdjson") == "stdlib"
+    assert fast_json.json_backend() == "stdlib"
+    use_json_backend("auto")
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
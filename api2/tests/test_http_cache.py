@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for precomputed config responses
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routes.catalog import require_admin
+from app.utils import metrics
+from app.utils.http_cache import invalidate_http_cache
+from main import app
+
+client = TestClient(app)
+
+def test_etag_and_conditional_requests():
+    """Config responses are built once, carry an ETag and answer If-None-Match with 304"""
+    invalidate_http_cache()
+    misses = metrics.get_counter("http_cache.miss")
+    first = client.get("/api/config")
+    second = client.get("/api/config")
+    assert first.status_code == 200 and first.json()["data"]["appTitle"] == "Ticket Orchestration Chat"
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == f"max-age={settings.http_cache_max_age_seconds}"
+    assert metrics.get_counter("http_cache.miss") == misses + 1
+
+    not_modified = client.get("/api/config", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get("/api/config", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    endpoints = client.get("/api/endpoints")
+    assert endpoints.json()["custom"]["models"] == [settings.llm_model]
+    assert client.get("/api/banner").json()["data"]["enabled"] is False
+    assert client.get("/api/files/config").json()["data"]["maxSize"] == settings.max_file_size
+
+    # Per-user endpoints are never shared through the cache
+    for path in ("/api/files", "/api/keys", "/api/roles/user", "/api/agents/tools/calls?conversationId=1"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert "etag" not in response.headers and "cache-control" not in response.headers
+    print("✅ PASS")
+
+def test_config_reload_invalidates(monkeypatch):
+    """POST /api/config/reload re-reads settings and rebuilds the cached bodies"""
+    invalidate_http_cache()
+    before = client.get("/api/files/config")
+    monkeypatch.setenv("MAX_FILE_SIZE", "1234")
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        assert client.post("/api/config/reload").status_code == 200
+        after = client.get("/api/files/config")
+        assert after.json()["data"]["maxSize"] == 1234
+        assert after.headers["etag"] != before.headers["etag"]
+    finally:
+        app.dependency_overrides.clear()
+        monkeypatch.delenv("MAX_FILE_SIZE")
+        from app.config import reload_settings
+        reload_settings()
+        invalidate_http_cache()
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
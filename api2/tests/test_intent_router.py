@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the ticket intent router
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.config import settings
+from app.routes import endpoints
+from app.services.catalog_service import get_catalog_snapshot
+from app.services.intent_router import IntentClassifier, classify_intent, load_intent_examples
+from app.utils.session_store import get
+
+def test_requests_and_chit_chat():
+    """Confident requests start the agent; casual mentions of catalog words don't"""
+    for text in ["create a ticket", "final loan tape for AAA", "I need the datadog logs from last week rehydrated",
+                 "set up an sftp connection for Pimco", "we need a new monitor on checkout latency"]:
+        assert classify_intent(text).label == "ticket", text
+    for text in ["hi", "thanks!", "lol that alert sound is so annoying", "what does a loan tape contain",
+                 "explain sftp", "how do I write a for loop in python"]:
+        assert classify_intent(text).label == "chat", text
+    result = classify_intent("please open a new ticket for the vpn")
+    assert result.confidence >= 0.95 and "open a new ticket" in result.matched
+    print("✅ PASS")
+
+def test_logged_traffic_is_used(tmp_path):
+    """Labeled examples shift the classifier"""
+    path = tmp_path / "intents.jsonl"
+    text = "zorblax is acting up again"
+    path.write_text("\n".join(json.dumps({"text": text, "label": "ticket"}) for _ in range(5)) + "\nnot json\n")
+    assert len(load_intent_examples(str(path))) == 5
+
+    snapshot = get_catalog_snapshot()
+    before = IntentClassifier(snapshot).probability(text)
+    after = IntentClassifier(snapshot, load_intent_examples(str(path))).probability(text)
+    assert after > before + 0.2
+    print("✅ PASS")
+
+def test_clarifying_turn(monkeypatch, tmp_path):
+    """Ambiguous messages get a yes/no turn; the answer is logged and "yes" plans the original message"""
+    path = tmp_path / "intents.jsonl"
+    monkeypatch.setattr(settings, "intent_examples_path", str(path))
+    monkeypatch.setattr(settings, "intent_ticket_threshold", 0.99)
+    monkeypatch.setattr(settings, "intent_clarify_threshold", 0.01)
+
+    intent, text = endpoints.route_ticket_intent("our reports service keeps crashing", 424242)
+    assert intent == "clarify"
+    response = endpoints.ask_ticket_clarification(text, 424242)
+    assert response["type"] == "agent_clarify"
+    assert get("conv_424242").clarify_text == text
+
+    assert endpoints.route_ticket_intent("yes please", 424242) == ("agent", "our reports service keeps crashing")
+    assert get("conv_424242") is None
+    assert json.loads(path.read_text()) == {"text": "our reports service keeps crashing", "label": "ticket"}
+
+    endpoints.ask_ticket_clarification("the dashboard looks nice", 424242)
+    assert endpoints.route_ticket_intent("no", 424242) == ("chat", "no")
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for JSON Patch plan deltas
+"""
+
+import asyncio
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.models import Base
+from app.models.conversation import Conversation
+from app.models.user import User
+from app.models.ticket_agent import ConversationState, TicketItem, TicketPlan
+from app.routes.endpoints import get_final_plan
+from app.services.agent_completion import completion_content
+from app.services.plan_versions import get_plan_version, persist_final_plan, plan_update
+from app.utils.auth_utils import AuthUser
+from app.utils.json_patch import JsonPatchError, apply_patch, make_patch
+
+def test_make_and_apply_round_trip():
+    old = {"items": [{"form": {"a": 1, "b/c": 2}}, {"form": {}}], "meta": {"x": "y"}}
+    new = {"items": [{"form": {"a": 3, "d": [1, 2]}}], "meta": {"x": "y"}, "extra": None}
+    patch = make_patch(old, new)
+    assert apply_patch(old, patch) == new
+    assert {"op": "remove", "path": "/items/0/form/b~1c"} in patch
+    assert make_patch(new, new) == []
+    assert apply_patch(new, make_patch(new, old)) == old
+    print("✅ PASS")
+
+def test_rfc_operations():
+    doc = {"foo": ["bar", "baz"], "qux": {"baz": 1}}
+    patched = apply_patch(doc, [
+        {"op": "add", "path": "/foo/1", "value": "qux"},
+        {"op": "move", "from": "/qux/baz", "path": "/moved"},
+        {"op": "copy", "from": "/foo/0", "path": "/foo/-"},
+        {"op": "test", "path": "/moved", "value": 1},
+    ])
+    assert patched == {"foo": ["bar", "qux", "baz", "bar"], "qux": {}, "moved": 1}
+    assert doc == {"foo": ["bar", "baz"], "qux": {"baz": 1}}     # input untouched
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc, [{"op": "test", "path": "/foo/0", "value": "nope"}])
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc, [{"op": "remove", "path": "/missing"}])
+    print("✅ PASS")
+
+def _state():
+    item = TicketItem(service_area="SRE/Production Support", category="Financial Service Request",
+                      ticket_type="Loan Tape", title="Loan tape", description="rerun", form={"urgency": "high"})
+    return ConversationState(session_id="s1", plan=TicketPlan(items=[item], meta={}))
+
+def test_turns_send_patches_against_the_known_version():
+    state = _state()
+    first = plan_update(state)
+    assert first["plan_version"] == 1 and first["plan_preview"]["items"][0]["form"] == {"urgency": "high"}
+
+    state.plan.items[0].form["vendor_name"] = "AAA Final Loan Tape"
+    second = plan_update(state)
+    assert second["plan_base_version"] == 1
+    assert second["plan_patch"] == [{"op": "add", "path": "/items/0/form/vendor_name", "value": "AAA Final Loan Tape"}]
+    assert apply_patch(first["plan_preview"], second["plan_patch"]) == get_plan_version(state)
+
+    # Unchanged plan: same version, empty patch
+    assert plan_update(state) == {"plan_version": 2, "plan_base_version": 2, "plan_patch": []}
+    # A client on an unknown version gets the full plan
+    assert "plan_preview" in plan_update(state, known_version=99)
+    print("✅ PASS")
+
+def test_history_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "plan_history_size", 3)
+    state = _state()
+    for i in range(6):
+        state.plan.items[0].form["n"] = i
+        plan_update(state)
+    assert sorted(state.plan_snapshots) == [4, 5, 6]
+    assert get_plan_version(state, 1) is None
+    assert "plan_preview" in plan_update(state, known_version=1)
+    print("✅ PASS")
+
+def test_completion_content_references_the_plan():
+    created = [{"pseudo_id": "SRE-1000", "service_area": "SRE/Production Support", "category": "c",
+                "ticket_type": "Loan Tape", "title": "Loan tape", "form": {"vendor_name": "AAA Final Loan Tape"}}]
+    content = completion_content(created, "conv_1", 3)
+    assert "```json" not in content and "AAA Final Loan Tape" not in content
+    assert "/api/agent-sessions/conv_1/plan?version=3" in content
+    assert "/api/plans/abc123" in completion_content(created, "conv_1", 3, "abc123")
+    print("✅ PASS")
+
+def test_final_plan_survives_the_session():
+    """The linked final plan is read from the database, not the session, and ids never repeat"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="plans@example.com", password="not-a-hash", role="USER")
+    other = User(email="other@example.com", password="not-a-hash", role="USER")
+    db.add_all([owner, other])
+    db.commit()
+    conversation = Conversation(title="t", user_id=owner.id)
+    db.add(conversation)
+    db.commit()
+
+    state = _state()
+    state.session_id = f"conv_{conversation.id}"
+    first_id = persist_final_plan(state, db)
+    first_plan = get_plan_version(state)
+
+    # The session id is reused for the next request and its versions restart at 1
+    state = _state()
+    state.session_id = f"conv_{conversation.id}"
+    state.plan.items[0].form["vendor_name"] = "Another Vendor"
+    second_id = persist_final_plan(state, db)
+    assert first_id and second_id and first_id != second_id
+
+    user = AuthUser(id=owner.id, email=owner.email, role="USER", token_version=0)
+    response = asyncio.run(get_final_plan(first_id, db=db, current_user=user))
+    assert response["plan"] == first_plan and response["plan_version"] == 1
+
+    stranger = AuthUser(id=other.id, email=other.email, role="USER", token_version=0)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(get_final_plan(first_id, db=db, current_user=stranger))
+    assert e.value.status_code == 404
+    db.close()
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Test script for access to the /api/metrics endpoint
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.routes.auth import get_current_user
+from app.utils.auth_utils import AuthUser
+from main import app
+
+client = TestClient(app)
+
+def test_metrics_require_an_admin():
+    """Anonymous callers and regular users can't read the metrics"""
+    assert client.get("/api/metrics").status_code in (401, 403)
+    try:
+        app.dependency_overrides[get_current_user] = lambda: AuthUser(id=1, email="u@example.com", role="USER", token_version=0)
+        assert client.get("/api/metrics").status_code == 403
+        app.dependency_overrides[get_current_user] = lambda: AuthUser(id=2, email="a@example.com", role="ADMIN", token_version=0)
+        response = client.get("/api/metrics")
+        assert response.status_code == 200 and isinstance(response.json(), dict)
+    finally:
+        app.dependency_overrides.clear()
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for index-coded choice options in the prefill prompt
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import VENDORS_LOAN_TAPE
+from app.config import settings
+from app.services import field_prefiller_service
+from app.services.option_codes import decode_option_codes, render_coded_options
+
+SPEC = {
+    "ticket_type": "Loan Tape",
+    "fields": [
+        {"name": "vendor_name", "type": "choice", "options": VENDORS_LOAN_TAPE},
+        {"name": "environments", "type": "multi_choice", "options": ["prd", "sbx", "uat"]},
+        {"name": "details", "type": "string"},
+    ],
+}
+
+def test_render_factors_out_shared_words():
+    """Shared trailing words are written once and every option gets a number"""
+    header, listing = render_coded_options(["AAA Final Loan Tape", "Pimco Estimated Loan Tape"])
+    assert header == 'Options (every option ends with "Loan Tape"):'
+    assert listing == "1: AAA Final; 2: Pimco Estimated"
+    assert render_coded_options(["Loan Tape", "Final Loan Tape"])[0] == 'Options (every option ends with "Tape"):'
+    assert render_coded_options(["prd", "sbx"]) == ["Options:", "1: prd; 2: sbx"]
+    print("✅ PASS")
+
+def test_decode_maps_and_validates_codes():
+    """Codes map back to option text; out-of-range codes and invented values are dropped"""
+    pimco = VENDORS_LOAN_TAPE.index("Pimco Final Loan Tape") + 1
+    decoded = decode_option_codes({"vendor_name": str(pimco), "environments": [1, "3", 9], "details": "7"}, SPEC)
+    assert decoded == {"vendor_name": "Pimco Final Loan Tape", "environments": ["prd", "uat"], "details": "7"}
+
+    assert decode_option_codes({"vendor_name": 999}, SPEC) == {}
+    assert decode_option_codes({"vendor_name": "Totally Made Up Capital"}, SPEC) == {}
+    # Text answers still work when the model ignores the codes
+    assert decode_option_codes({"vendor_name": "AAA Final Loan Tape"}, SPEC) == {"vendor_name": "AAA Final Loan Tape"}
+    print("✅ PASS")
+
+def test_prefill_with_index_encoding(monkeypatch):
+    """The prompt carries codes instead of option text and the answer is decoded locally"""
+    monkeypatch.setattr(settings, "prefill_option_encoding", "index")
+    prompts = []
+    systems = []
+
+    async def fake_generate(messages, **kwargs):
+        prompts.append(messages[-1].content)
+        systems.append(messages[0].content)
+        return SimpleNamespace(content='{"vendor_name": 1, "environments": [2]}')
+    monkeypatch.setattr(field_prefiller_service.llm_service, "generate_non_streaming_response", fake_generate)
+
+    item = SimpleNamespace(ticket_type="Loan Tape", service_area="SRE/Production Support", category="Financial Service Request")
+    form = asyncio.run(field_prefiller_service._llm_prefill_fields(item, "aaa tape in sandbox", None, SPEC))
+    assert form == {"vendor_name": VENDORS_LOAN_TAPE[0], "environments": ["sbx"]}
+    assert "OPTION CODES" in prompts[0]
+    assert "  • AAA Final Loan Tape" not in prompts[0]
+    # The few-shot examples answer with numbers too, never with option text
+    assert '"vendor_name": 1' in systems[0]
+    assert '"AAA Final Loan Tape"' not in systems[0] and '"urgency": "high"' not in systems[0]
+    print("✅ PASS")
+
+def test_text_encoding_keeps_text_examples(monkeypatch):
+    monkeypatch.setattr(settings, "prefill_option_encoding", "text")
+    systems = []
+
+    async def fake_generate(messages, **kwargs):
+        systems.append(messages[0].content)
+        return SimpleNamespace(content='{"vendor_name": "AAA Final Loan Tape"}')
+    monkeypatch.setattr(field_prefiller_service.llm_service, "generate_non_streaming_response", fake_generate)
+
+    item = SimpleNamespace(ticket_type="Loan Tape", service_area="SRE/Production Support", category="Financial Service Request")
+    form = asyncio.run(field_prefiller_service._llm_prefill_fields(item, "aaa tape", None, SPEC))
+    assert form["vendor_name"] == "AAA Final Loan Tape"
+    assert systems[0] == field_prefiller_service.SYSTEM_PREFILL + field_prefiller_service.PREFILL_INSTRUCTIONS
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for cached options_source resolution
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import VENDORS_LOAN_TAPE
+from app.config import settings
+from app.services.catalog_service import resolve_field_options
+from app.services.option_providers import CachedOptionSource, OptionProvider, get_option_source, load_field_options_async
+
+class CountingProvider(OptionProvider):
+    """Provider that records how often it was called"""
+    def __init__(self, options):
+        super().__init__("counting")
+        self.options = options
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        return list(self.options)
+
+def test_catalog_and_file_sources():
+    """catalog: and file: sources resolve to their option lists"""
+    field = {"name": "vendor_name", "type": "choice", "options_source": "catalog:VENDORS_LOAN_TAPE"}
+    assert resolve_field_options(field) == VENDORS_LOAN_TAPE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "investors.json")
+        with open(path, "w") as f:
+            json.dump({"options": ["Pimco", "Goldman"]}, f)
+        field = {"name": "investor", "type": "choice", "options_source": f"file:{path}"}
+        assert resolve_field_options(field) == ["Pimco", "Goldman"]
+        assert get_option_source(f"file:{path}").stats["cold"] == 1
+
+    # Unknown schemes fall back to inline options
+    field = {"name": "x", "type": "choice", "options": ["a"], "options_source": "nope:thing"}
+    assert resolve_field_options(field) == ["a"]
+    print("✅ PASS")
+
+def test_stale_while_revalidate():
+    """Stale values are served immediately while one background refresh runs"""
+    provider = CountingProvider(["one"])
+    cached = CachedOptionSource("counting", provider, ttl=0.05)
+
+    assert cached.get() == ["one"]            # cold, no fallback: single blocking load
+    assert provider.calls == 1
+    assert cached.get() == ["one"]            # fresh hit
+    assert provider.calls == 1
+
+    provider.options = ["one", "two"]
+    time.sleep(0.1)
+    assert cached.get() == ["one"]            # stale value served without waiting
+    for _ in range(50):
+        if cached.value == ["one", "two"]:
+            break
+        time.sleep(0.01)
+    assert cached.value == ["one", "two"]
+    assert provider.calls == 2
+
+    # Cold with an inline fallback never blocks
+    slow = CachedOptionSource("slow", CountingProvider(["x"]), ttl=60)
+    assert slow.get(fallback=["inline"]) == ["inline"]
+    print("✅ PASS")
+
+def test_provider_base_is_abstract():
+    """Providers must implement fetch()"""
+    class Incomplete(OptionProvider):
+        pass
+    try:
+        Incomplete("x")
+        assert False, "OptionProvider subclasses without fetch() must not instantiate"
+    except TypeError:
+        pass
+    print("✅ PASS")
+
+def test_refresh_and_load_are_single_flight():
+    """A background refresh and a blocking load on a cold cache fetch only once"""
+    class SlowProvider(CountingProvider):
+        def fetch(self):
+            time.sleep(0.1)
+            return super().fetch()
+
+    provider = SlowProvider(["one"])
+    cached = CachedOptionSource("slow", provider, ttl=60)
+    future = cached.refresh_in_background()
+    assert future is not None
+    assert cached.refresh_in_background() is None     # already running
+
+    loaders = [threading.Thread(target=cached.load) for _ in range(4)]
+    for t in loaders:
+        t.start()
+    for t in loaders:
+        t.join()
+    future.result()
+    assert cached.value == ["one"]
+    assert provider.calls == 1
+    print("✅ PASS")
+
+def test_failed_cold_load_backs_off(monkeypatch):
+    """A source that fails with nothing cached is not fetched again on every request"""
+    class FailingProvider(CountingProvider):
+        def fetch(self):
+            super().fetch()
+            raise OSError("reference data service is down")
+
+    provider = FailingProvider([])
+    cached = CachedOptionSource("failing", provider, ttl=60)
+    assert cached.get() == []
+    assert cached.get() == [] and cached.get(fallback=["inline"]) == ["inline"]
+    assert asyncio.run(cached.load_async()) == []
+    assert provider.calls == 1
+    assert cached.stats["backoff"] == 3
+
+    # After the retry interval the source is fetched again
+    monkeypatch.setattr(settings, "options_retry_seconds", 0)
+    provider.fetch = lambda: ["back"]
+    assert cached.get() == ["back"] and cached.failed_at is None
+    print("✅ PASS")
+
+def test_async_load_runs_off_the_event_loop():
+    """load_field_options_async fills cold sources without inline options"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "desks.json")
+        with open(path, "w") as f:
+            json.dump(["Rates", "Credit"], f)
+        fields = [
+            {"name": "desk", "type": "choice", "options_source": f"file:{path}"},
+            {"name": "other", "type": "choice", "options": ["a"], "options_source": "file:/does/not/exist.json"},
+        ]
+        asyncio.run(load_field_options_async(fields))
+        assert get_option_source(f"file:{path}").value == ["Rates", "Credit"]
+        assert get_option_source(f"file:{path}").stats["cold"] == 0
+        # Fields with an inline fallback are left to the background refresh
+        assert get_option_source("file:/does/not/exist.json").value is None
+        assert resolve_field_options(fields[0]) == ["Rates", "Credit"]
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_catalog_and_file_sources()
+    test_stale_while_revalidate()
+    test_provider_base_is_abstract()
+    test_refresh_and_load_are_single_flight()
+    test_async_load_runs_off_the_event_loop()
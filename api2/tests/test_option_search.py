@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for typeahead option search and truncated choice questions
+"""
+
+import os
+import subprocess
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from app.models.ticket_agent import FieldDef, MissingField, TicketItem, TicketPlan
+from app.services.option_index import OptionIndex, find_field_option_index
+from app.services.validator_service import render_question
+
+TICKET = "Manual Loan Verifications"
+
+def test_option_index_search():
+    """Prefix, multi-word and typo queries rank the right options first"""
+    index = OptionIndex(["Stoneridge 2020-1 v2", "Stoneridge 2022-1 v2", "The Phoenix", "Pimco"])
+    assert index.search("pim") == (["Pimco"], 1)
+    assert index.search("stone 2022")[0] == ["Stoneridge 2022-1 v2"]
+    assert index.search("stonridge")[1] == 2, "trigrams catch typos"
+    assert index.search("phoenix")[0] == ["The Phoenix"]
+    assert index.search("zzz") == ([], 0)
+    assert index.search("", limit=2) == (["Stoneridge 2020-1 v2", "Stoneridge 2022-1 v2"], 4)
+    print("✅ PASS")
+
+def test_render_question_truncates_large_option_sets():
+    """Big option sets ship a top-k list plus a search URL instead of every option"""
+    full = find_field_option_index(TICKET, "from_investor")
+    field = FieldDef(name="from_investor", type="choice", options=full.options)
+    plan = TicketPlan(items=[TicketItem(
+        service_area="SRE/Production Support", category="Financial Service Request",
+        ticket_type=TICKET, title="Verify loans", description="Verify loans",
+    )], meta={})
+    question = render_question(MissingField(item_index=0, field=field), plan)
+    assert question["options_total"] == len(full)
+    assert len(question["options"]) < len(full)
+    assert question["options_search"].endswith("/from_investor/options")
+
+    small = FieldDef(name="urgency", type="choice", options=["Low", "High"])
+    question = render_question(MissingField(item_index=0, field=small), plan)
+    assert question["options"] == ["Low", "High"] and question["options_search"] is None
+    print("✅ PASS")
+
+def test_options_endpoint():
+    """The search URL from a question answers typeahead queries"""
+    from main import app
+    client = TestClient(app)
+    response = client.get(f"/api/catalog/fields/{TICKET}/from_investor/options", params={"q": "pagaya 2023", "limit": 3})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data["options"]) == 3 and data["total"] > 3
+    assert all(o.startswith("Pagaya 2023") for o in data["options"])
+
+    # Ticket types may contain slashes
+    response = client.get("/api/catalog/fields/Datadog Log Setup/Troubleshooting/source/options")
+    assert response.status_code == 200 and response.json()["data"]["total"] == 3
+    assert client.get(f"/api/catalog/fields/{TICKET}/nope/options").status_code == 404
+    print("✅ PASS")
+
+def test_option_index_imports_on_its_own():
+    """option_index (OptionSetCache) can be the first module imported, as the choice matcher does"""
+    root = os.path.join(os.path.dirname(__file__), '..')
+    result = subprocess.run([sys.executable, "-c", "from app.services.option_index import OptionSetCache"], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_option_index_search()
+    test_option_index_imports_on_its_own()
+    test_render_question_truncates_large_option_sets()
+    test_options_endpoint()
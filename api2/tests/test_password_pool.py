@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for password hashing off the event loop
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.utils import auth_utils, metrics
+
+@pytest.fixture
+def pool(monkeypatch):
+    # pbkdf2 keeps the test fast; the pool doesn't care which scheme it runs
+    monkeypatch.setattr(auth_utils, "pwd_context", CryptContext(
+        schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=2000, pbkdf2_sha256__min_rounds=2000
+    ))
+    auth_utils.shutdown_password_executor()
+    yield
+    auth_utils.shutdown_password_executor()
+
+def test_hashing_runs_on_the_pool(pool):
+    """Hash and verify run on the password threads, not the event loop's"""
+    seen = []
+    original = auth_utils.pwd_context.hash
+    def recording_hash(password):
+        seen.append(threading.current_thread().name)
+        return original(password)
+    auth_utils.pwd_context.hash = recording_hash
+
+    async def run():
+        hashed = await auth_utils.get_password_hash_async("s3cret")
+        assert await auth_utils.verify_password_async("s3cret", hashed)
+        assert not await auth_utils.verify_password_async("wrong", hashed)
+    asyncio.run(run())
+    assert seen and seen[0].startswith("password-hash")
+    print("✅ PASS")
+
+def test_outdated_hash_is_upgraded(pool):
+    """verify_and_update returns a new hash for a hash below the configured rounds"""
+    weak = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=1000).hash("s3cret")
+    valid, new_hash = asyncio.run(auth_utils.verify_and_update_password("s3cret", weak))
+    assert valid and new_hash and new_hash != weak
+    assert asyncio.run(auth_utils.verify_and_update_password("s3cret", new_hash)) == (True, None)
+    assert asyncio.run(auth_utils.verify_and_update_password("wrong", weak)) == (False, None)
+    print("✅ PASS")
+
+def test_queue_limit(pool, monkeypatch):
+    """Jobs beyond workers + queue are rejected with 503 while the loop stays responsive"""
+    monkeypatch.setattr(settings, "password_hash_workers", 1)
+    monkeypatch.setattr(settings, "password_hash_max_queue", 1)
+    release = threading.Event()
+    monkeypatch.setattr(auth_utils.pwd_context, "hash", lambda password: release.wait(5) and "hashed")
+    rejected = metrics.get_counter("password_hash.rejected")
+
+    async def run():
+        first = asyncio.ensure_future(auth_utils.get_password_hash_async("a"))
+        second = asyncio.ensure_future(auth_utils.get_password_hash_async("b"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as error:
+            await auth_utils.get_password_hash_async("c")
+        assert error.value.status_code == 503
+
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)              # the loop isn't blocked by the running hash
+        assert time.perf_counter() - started < 0.5
+        release.set()
+        assert await asyncio.gather(first, second) == ["hashed", "hashed"]
+    asyncio.run(run())
+    assert metrics.get_counter("password_hash.rejected") == rejected + 1
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for memoized plans of repeat requests
+"""
+
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.models.ticket_agent import TicketItem, TicketPlan
+from app.services import plan_cache, planner_service
+from app.services.plan_cache import PlanCache, normalize_request, plan_cache_key
+
+def _plan(email="a@example.com"):
+    item = TicketItem(
+        service_area="SRE/Production Support", category="Financial Service Request", ticket_type="Loan Tape",
+        title="AAA loan tape", description="Final loan tape for AAA",
+        form={"email": email, "vendor_name": "AAA Final Loan Tape"},
+        field_sources={"email": {"source": "rule"}, "vendor_name": {"source": "rule"}},
+    )
+    return TicketPlan(items=[item], meta={"request_text": "final loan tape for AAA"}, catalog_version="v1")
+
+def test_key_normalization_and_date_bucket():
+    """Case and punctuation are ignored; only dated requests are bucketed by day"""
+    assert normalize_request("  Final loan tape, for AAA!! ") == "final loan tape for aaa"
+    assert plan_cache_key("Final loan tape for AAA", "v1") == plan_cache_key("final loan tape for aaa.", "v1")
+    assert plan_cache_key("final loan tape for AAA", "v1")[2] == ""
+    assert plan_cache_key("investor report rerun from july 18 to tomorrow", "v1")[2] != ""
+    assert plan_cache_key("final loan tape for AAA", "v1") != plan_cache_key("final loan tape for AAA", "v2")
+    print("✅ PASS")
+
+def test_hits_reapply_the_requesters_email():
+    """Cached plans drop the first user's email and get the next user's instead"""
+    cache = PlanCache(max_entries=2, ttl_seconds=60)
+    key = plan_cache_key("final loan tape for AAA", "v1")
+    cache.put(key, _plan(), "a@example.com")
+
+    hit = cache.get(key, "Final loan tape for AAA", "b@example.com")
+    assert hit.items[0].form == {"vendor_name": "AAA Final Loan Tape", "email": "b@example.com"}
+    assert hit.meta["request_text"] == "Final loan tape for AAA"
+    # Each hit is a fresh copy
+    hit.items[0].form["vendor_name"] = "changed"
+    assert cache.get(key, "x", None).items[0].form == {"vendor_name": "AAA Final Loan Tape"}
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get(key, "x", None) is None
+    print("✅ PASS")
+
+def test_planner_skips_llm_on_repeat(monkeypatch):
+    """The second identical request returns without touching the slice, planner or prefiller"""
+    plan_cache.clear_plan_cache()
+    calls = []
+
+    async def fake_slice(user_text, version):
+        calls.append(user_text)
+        raise RuntimeError("planner pipeline should not run on a cache hit")
+    monkeypatch.setattr(planner_service, "slice_catalog_for_prompt_async", fake_slice)
+    monkeypatch.setattr(planner_service, "get_catalog_version", lambda: "v1")
+
+    plan_cache.store_plan("final loan tape for AAA", _plan(), "a@example.com")
+    plan = asyncio.run(planner_service.plan_from_text_async("Final loan tape for AAA", "c@example.com"))
+    assert plan.items[0].form["email"] == "c@example.com"
+    assert calls == []
+    print("✅ PASS")
+
+def test_shared_cache_follows_reloaded_settings(monkeypatch):
+    """The module cache reads its limits when used, so a config reload applies without a restart"""
+    plan_cache.clear_plan_cache()
+    monkeypatch.setattr(settings, "plan_cache_max_entries", 1)
+    plan_cache.store_plan("final loan tape for AAA", _plan(), "a@example.com")
+    plan_cache.store_plan("final loan tape for BBB", _plan(), "a@example.com")
+    assert len(plan_cache._plan_cache) == 1
+
+    monkeypatch.setattr(settings, "plan_cache_ttl_seconds", 0.001)
+    time.sleep(0.01)
+    assert plan_cache._plan_cache.get(plan_cache_key("final loan tape for BBB", "v1"), "x", None) is None
+    plan_cache.clear_plan_cache()
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for cached, compact prompt fragments (planner catalog view, prefill field context)
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.catalog_service import find_ticket_spec, get_catalog_version, slice_catalog_for_prompt
+from app.services.field_prefiller_service import build_field_context
+from app.services.prompt_fragments import clear_prompt_fragments, estimate_tokens, get_prompt_fragment_stats, planner_catalog_json
+
+AREA, CATEGORY = "SRE/Production Support", "Financial Service Request"
+
+def test_planner_view_is_compact_and_cached():
+    """The planner sees ticket types and field names, never option lists, and it is serialized once"""
+    clear_prompt_fragments()
+    before = get_prompt_fragment_stats()["planner_catalog"]
+    cat_slice = slice_catalog_for_prompt("I need a final loan tape for AAA")
+    text = planner_catalog_json(cat_slice)
+    assert planner_catalog_json(cat_slice) is text
+
+    view = json.loads(text)["catalog"]
+    loan_tape = view[AREA][CATEGORY][0]
+    assert loan_tape["ticket_type"] == "Loan Tape"
+    assert "vendor_name" in loan_tape["fields"]
+    assert "AAA Final Loan Tape" not in text
+    assert estimate_tokens(text) < estimate_tokens(json.dumps({"catalog": cat_slice})) / 2
+
+    stats = get_prompt_fragment_stats()["planner_catalog"]
+    assert stats["hits"] - before["hits"] == 1 and stats["misses"] - before["misses"] == 1
+    assert stats["cached_tokens"] == estimate_tokens(text)
+    print("✅ PASS")
+
+def test_field_context_blocks_are_reused():
+    """Field context renders each field once per catalog version, also for narrowed specs"""
+    clear_prompt_fragments()
+    before = get_prompt_fragment_stats()["field_context"]
+    spec = find_ticket_spec(AREA, CATEGORY, "Loan Tape")
+    full = build_field_context(spec)
+    assert "Field: vendor_name" in full and "AAA Final Loan Tape" in full
+    misses = get_prompt_fragment_stats()["field_context"]["misses"]
+    assert misses - before["misses"] == len(spec["fields"])
+
+    narrowed = build_field_context({**spec, "fields": spec["fields"][:2]}, get_catalog_version())
+    assert full.startswith(narrowed)
+    stats = get_prompt_fragment_stats()["field_context"]
+    assert stats["misses"] == misses and stats["hits"] - before["hits"] == 2
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    test_planner_view_is_compact_and_cached()
+    test_field_context_blocks_are_reused()
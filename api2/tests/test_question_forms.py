@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for form question mode (several missing fields per turn)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.config import settings
+from app.models.ticket_agent import TicketItem, TicketPlan
+from app.routes import endpoints
+from app.services import agent_completion
+from app.services.async_field_processor import async_field_processor
+from app.services.catalog_service import get_catalog_version
+from app.services.validator_service import (
+    apply_answers_async,
+    find_missing_fields,
+    parse_form_answer,
+    question_group,
+    render_form,
+)
+from app.utils.session_store import get
+
+def _plan():
+    items = [
+        TicketItem(service_area="SRE/Production Support", category="Financial Service Request", ticket_type="Loan Tape",
+                   title="Loan tape", description="Loan tape rerun", form={"email": "a@example.com", "description": "rerun"}),
+        TicketItem(service_area="SRE/Production Support", category="Report an Incident", ticket_type="Open an incident here",
+                   title="Incident", description="Outage", form={"email": "a@example.com", "description": "api down", "urgency": "high"}),
+    ]
+    return TicketPlan(items=items, meta={}, catalog_version=get_catalog_version())
+
+def test_group_and_render(monkeypatch):
+    """A form holds the first ticket's missing fields, capped by the group size"""
+    plan = _plan()
+    missing = find_missing_fields(plan)
+    group = question_group(missing)
+    assert {m.item_index for m in group} == {0}
+    assert [m.field.name for m in group] == ["urgency", "request_date", "vendor_name", "type_of_rerun"]
+
+    form = render_form(group, plan)
+    assert form["type"] == "form" and len(form["fields"]) == 4
+    assert "**type of rerun** (choice): final / estimated" in form["text"]
+    assert form["fields"][2]["options_search"]          # long vendor list is truncated for typeahead
+
+    monkeypatch.setattr(settings, "question_form_group_size", 2)
+    assert len(question_group(missing)) == 2
+    print("✅ PASS")
+
+def test_parse_form_answer():
+    group = question_group(find_missing_fields(_plan()))
+    answers = parse_form_answer("Urgency: high\n- **vendor name**: Pimco\ntype_of_rerun = final; nonsense", group)
+    assert answers == {"urgency": "high", "vendor_name": "Pimco", "type_of_rerun": "final"}
+    assert parse_form_answer("tomorrow", group[1:2]) == {"request_date": "tomorrow"}
+    print("✅ PASS")
+
+def test_answers_are_processed_concurrently(monkeypatch):
+    original = async_field_processor.process_field_value
+
+    async def slow(user_input, field_def):
+        await asyncio.sleep(0.1)
+        return await original(user_input, field_def)
+    monkeypatch.setattr(async_field_processor, "process_field_value", slow)
+
+    plan = _plan()
+    started = time.perf_counter()
+    asyncio.run(apply_answers_async(plan, [(0, "urgency", "high"), (0, "type_of_rerun", "final"), (1, "summary", "x")]))
+    assert time.perf_counter() - started < 0.25
+    assert plan.items[0].form["urgency"] == "high" and plan.items[0].form["type_of_rerun"] == "final"
+    print("✅ PASS")
+
+def test_agent_loop_in_form_mode(monkeypatch):
+    """Each turn asks one ticket's fields together and accepts all of them at once"""
+    monkeypatch.setattr(settings, "question_mode", "form")
+
+    async def plan_from_text_async(text, email=None):
+        return _plan()
+
+    async def summaries(plan):
+        for item in plan.items:
+            item.form["summary"] = "summary"
+        return plan
+    monkeypatch.setattr(endpoints, "plan_from_text_async", plan_from_text_async)
+    monkeypatch.setattr(agent_completion, "generate_summaries_for_plan", summaries)
+    monkeypatch.setattr(endpoints, "find_duplicate_request", lambda user, text: None)
+
+    first = asyncio.run(endpoints.handle_agentic_ticket_creation("loan tape rerun and an incident", 987654, "a@example.com"))
+    assert first["type"] == "agent_form"
+    assert len(first["form"]["fields"]) == 4
+
+    answer = "urgency: high\nrequest date: 2025-07-18\nvendor name: Pimco Final Loan Tape\ntype of rerun: final"
+    second = asyncio.run(endpoints.handle_agentic_ticket_creation(answer, 987654, "a@example.com"))
+    assert second["type"] == "agent_form"
+    assert second["form"]["item_index"] == 1
+    assert get("conv_987654").plan.items[0].form["vendor_name"] == "Pimco Final Loan Tape"
+
+    # A one-field form takes the whole message as the answer
+    third = asyncio.run(endpoints.handle_agentic_ticket_creation("screenshot.png", 987654, "a@example.com"))
+    assert third["type"] == "agent_complete", third.get("content")
+    print("✅ PASS")
+
+class _Request:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+def test_batch_answers_complete_through_the_shared_helper(monkeypatch):
+    """/agent-answer/batch completion generates summaries and records the request"""
+    summarized, recorded = [], []
+    async def summaries(plan):
+        summarized.extend(item.ticket_type for item in plan.items)
+        return plan
+    monkeypatch.setattr(agent_completion, "generate_summaries_for_plan", summaries)
+    monkeypatch.setattr(agent_completion, "persist_final_plan", lambda state, db=None: None)
+    monkeypatch.setattr(agent_completion, "record_completed_request", lambda *args: recorded.append(args))
+
+    plan = _plan()
+    plan.items[1].form["attachments"] = "none"
+    plan.meta["request_text"] = "loan tape rerun and an incident"
+    state = agent_completion.open_agent_session("agent_246810")
+    state.plan = plan
+    state.pending = find_missing_fields(plan)
+    answers = {"urgency": "high", "request_date": "2025-07-18", "vendor_name": "Pimco Final Loan Tape", "type_of_rerun": "final"}
+
+    reply = asyncio.run(endpoints.answer_agent_questions_batch(
+        _Request({"session_id": "agent_246810", "answers": answers}), db=None, current_user=SimpleNamespace(email="a@example.com")))
+    assert reply["type"] == "agent_complete", reply.get("content")
+    assert summarized == ["Loan Tape", "Open an incident here"]
+    assert recorded == [("a@example.com", "loan tape rerun and an incident", plan, reply["tickets"])]
+    agent_completion.drop_agent_session("agent_246810")
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the rule-based prefill stage that runs before the LLM prefiller
+"""
+
+import asyncio
+import os
+import sys
+from datetime import date
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.catalog import VENDORS_LOAN_TAPE
+from app.models.ticket_agent import TicketItem
+from app.services import field_prefiller_service
+from app.services.rule_prefill import apply_prefill_rules
+
+TODAY = date(2025, 7, 16)  # a Wednesday
+
+SPEC = {
+    "fields": [
+        {"name": "summary", "type": "text"},
+        {"name": "email", "type": "text"},
+        {"name": "urgency", "type": "choice", "options": ["critical", "high", "medium", "low"]},
+        {"name": "environment", "type": "choice", "options": ["prd", "sbx", "uat"]},
+        {"name": "tool", "type": "choice", "options": ["Datadog", "Grafana", "Other"]},
+        {"name": "vendor_name", "type": "choice", "options": VENDORS_LOAN_TAPE},
+        {"name": "start_date", "type": "date"},
+        {"name": "end_date", "type": "date"},
+    ]
+}
+
+def test_rules_fill_obvious_fields():
+    """Urgency, environment, exact option mentions, vendors and date ranges need no LLM"""
+    values = apply_prefill_rules(
+        SPEC,
+        "High urgency: Datadog access in production for the Pimco final loan tape from july 18 to july 25",
+        "me@example.com",
+        TODAY,
+    )
+    assert values["email"].value == "me@example.com" and values["email"].confidence == 1.0
+    assert values["urgency"].value == "high"
+    assert values["environment"].value == "prd"
+    assert values["tool"].value == "Datadog"
+    assert values["vendor_name"].value == "Pimco Final Loan Tape"
+    assert values["start_date"].value == "2025-07-18"
+    assert values["end_date"].value == "2025-07-25"
+    assert "summary" not in values
+    print("✅ PASS")
+
+def test_rules_leave_unclear_fields_alone():
+    """Two environments, vague options and priority words below the threshold stay open"""
+    values = apply_prefill_rules(SPEC, "copy it from sbx to uat, other than that no rush", None, TODAY)
+    assert "environment" not in values
+    assert "tool" not in values
+    assert values["urgency"].value == "low" and values["urgency"].confidence < 0.9
+    assert "email" not in values
+
+    values = apply_prefill_rules({"fields": [{"name": "run_date", "type": "date"}]}, "deploy version 3/4 of the loader", None, TODAY)
+    assert "run_date" not in values
+
+    # "asap" is an urgency; the date stays for the user or the LLM
+    values = apply_prefill_rules(SPEC, "need datadog access asap", None, TODAY)
+    assert values["urgency"].value == "high"
+    assert "start_date" not in values and "end_date" not in values
+    print("✅ PASS")
+
+def _item() -> TicketItem:
+    return TicketItem(
+        title="Tool access", service_area="Platform", category="Access", ticket_type="Tool Access",
+        description="tool access", form={}, labels=[],
+    )
+
+def test_llm_skipped_when_rules_fill_everything(monkeypatch):
+    """No LLM call when the rules already filled every field the LLM could fill"""
+    spec = {"fields": SPEC["fields"][:4]}
+    monkeypatch.setattr(field_prefiller_service, "find_ticket_spec", lambda *args: spec)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("LLM should not be called")
+    monkeypatch.setattr(field_prefiller_service, "_llm_prefill_fields", fail)
+
+    sources = {}
+    form = asyncio.run(field_prefiller_service.prefill_ticket_fields_async(
+        _item(), "urgent: prod is down", "me@example.com", None, sources,
+    ))
+    assert form == {"email": "me@example.com", "urgency": "high", "environment": "prd"}
+    assert sources["urgency"]["source"] == "rule" and sources["urgency"]["rule"] == "urgency"
+    print("✅ PASS")
+
+def test_llm_gets_only_remaining_fields(monkeypatch):
+    """The LLM sees just the fields the rules left open and cannot overwrite rule values"""
+    monkeypatch.setattr(field_prefiller_service, "find_ticket_spec", lambda *args: SPEC)
+    seen = {}
+
+    async def fake_llm(ticket_item, user_text, user_email, spec, catalog_version=None):
+        seen["fields"] = [f["name"] for f in spec["fields"]]
+        return {"tool": "Grafana", "urgency": "low"}
+    monkeypatch.setattr(field_prefiller_service, "_llm_prefill_fields", fake_llm)
+
+    sources = {}
+    form = asyncio.run(field_prefiller_service.prefill_ticket_fields_async(
+        _item(), "high priority dashboard access in sbx", "me@example.com", None, sources,
+    ))
+    assert seen["fields"] == ["tool", "vendor_name", "start_date", "end_date"]
+    assert form["urgency"] == "high" and form["tool"] == "Grafana"
+    assert sources["tool"] == {"source": "llm"}
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for in-memory frontend serving
+"""
+
+import gzip
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from app.config import settings
+from app.utils.static_assets import IMMUTABLE, REVALIDATE, StaticAssets
+
+def _build(root):
+    (root / "assets").mkdir()
+    (root / "index.html").write_text("<html><body>" + "app " * 200 + "</body></html>")
+    (root / "assets" / "index-3f9a1c2b.js").write_text("console.log('bundle');" * 100)
+    (root / "favicon.ico").write_bytes(b"\x00\x01" * 10)
+    (root / "big.bin").write_bytes(b"x" * 4096)
+
+def test_serving_from_memory(tmp_path, monkeypatch):
+    """Assets and SPA routes come from memory, gzipped when the client accepts it"""
+    monkeypatch.setattr(settings, "static_cache_max_bytes", 3000)
+    _build(tmp_path)
+    assets = StaticAssets(str(tmp_path))
+    os.remove(tmp_path / "index.html")          # nothing is read from disk after indexing
+
+    bundle = assets.lookup("assets/index-3f9a1c2b.js")
+    response = assets.respond(bundle, None, "gzip, deflate, br;q=0")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert gzip.decompress(response.body) == bundle.body
+
+    page = assets.lookup("chat/123")
+    assert page is assets.index and page.cache_control == REVALIDATE
+    response = assets.respond(page, None, None)
+    assert response.body.startswith(b"<html>") and "content-encoding" not in response.headers
+    assert response.headers["content-type"].startswith("text/html")
+
+    assert assets.lookup("favicon.ico").encoded == {}
+    assert assets.lookup("big.bin").body is None
+    assert assets.lookup("../secrets.txt") is assets.index
+    print("✅ PASS")
+
+def test_etag_revalidation(tmp_path):
+    """If-None-Match with the current ETag gets a 304 without a body"""
+    _build(tmp_path)
+    assets = StaticAssets(str(tmp_path))
+    page = assets.index
+    assert page.etag.startswith('"') and page.etag.endswith('"')
+
+    response = assets.respond(page, f'"stale", W/{page.etag}', "gzip")
+    assert response.status_code == 304 and response.body == b""
+    assert response.headers["etag"] == page.etag[:-1] + '-gzip"'
+    assert assets.respond(page, '"stale"', "gzip").status_code == 200
+    print("✅ PASS")
+
+def test_each_encoding_has_its_own_etag(tmp_path):
+    """gzip, br and identity bodies differ, so caches must not mix them up under one ETag"""
+    _build(tmp_path)
+    (tmp_path / "index.html.br").write_bytes(b"brotli-bytes")
+    assets = StaticAssets(str(tmp_path))
+    page = assets.index
+    tags = {assets.respond(page, None, accept).headers["etag"] for accept in ("gzip", "br", None)}
+    assert tags == {page.etag, page.etag[:-1] + '-gzip"', page.etag[:-1] + '-br"'}
+
+    # Any variant's tag revalidates: the content is the same whatever the encoding
+    gzip_tag = assets.respond(page, None, "gzip").headers["etag"]
+    response = assets.respond(page, gzip_tag, "br")
+    assert response.status_code == 304 and response.headers["etag"] == page.etag[:-1] + '-br"'
+    assert assets.respond(page, gzip_tag, None).status_code == 304
+    print("✅ PASS")
+
+def test_prebuilt_variants_and_missing_frontend(tmp_path):
+    """Precompressed files from the build are used; no build means no index"""
+    _build(tmp_path)
+    (tmp_path / "index.html.br").write_bytes(b"brotli-bytes")
+    assets = StaticAssets(str(tmp_path))
+    assert "index.html.br" not in assets.assets
+    response = assets.respond(assets.index, None, "gzip;q=0.5, br")
+    assert response.headers["content-encoding"] == "br" and response.body == b"brotli-bytes"
+
+    empty = StaticAssets(str(tmp_path / "missing"))
+    assert empty.lookup("chat") is None
+    print("✅ PASS")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])